@@ -0,0 +1,41 @@
+"""add transaction and account indexes
+
+Revision ID: 3f9a1c2b7d4e
+Revises: dbe4680883eb
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9a1c2b7d4e"
+down_revision: Union[str, None] = "dbe4680883eb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Every account lookup filters on the owning user
+    op.create_index("ix_accounts_user_id", "accounts", ["user_id"])
+
+    # Leading account_id column also serves plain account_id lookups and the
+    # ON DELETE CASCADE from accounts, so no standalone account_id index
+    op.create_index(
+        "ix_transactions_account_id_date",
+        "transactions",
+        ["account_id", "date", "id"],
+    )
+    op.create_index(
+        "ix_transactions_account_id_symbol",
+        "transactions",
+        ["account_id", "symbol"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_account_id_symbol", table_name="transactions")
+    op.drop_index("ix_transactions_account_id_date", table_name="transactions")
+    op.drop_index("ix_accounts_user_id", table_name="accounts")
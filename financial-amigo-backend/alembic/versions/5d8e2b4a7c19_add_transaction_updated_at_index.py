@@ -0,0 +1,30 @@
+"""add transaction updated_at index
+
+Revision ID: 5d8e2b4a7c19
+Revises: e7a3f1c95d20
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d8e2b4a7c19"
+down_revision: Union[str, None] = "e7a3f1c95d20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lets the list ETag fingerprint run as an index-only scan
+    op.create_index(
+        "ix_transactions_account_id_updated_at",
+        "transactions",
+        ["account_id", "updated_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_account_id_updated_at", table_name="transactions")
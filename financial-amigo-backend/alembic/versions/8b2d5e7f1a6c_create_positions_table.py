@@ -0,0 +1,117 @@
+"""create positions table
+
+Revision ID: 8b2d5e7f1a6c
+Revises: 3f9a1c2b7d4e
+Create Date: 2026-10-17 10:00:00.000000
+
+Snapshots are built here from the existing transactions, with the same
+average cost engine the application uses.
+
+"""
+
+from typing import Sequence, Union
+from uuid import uuid4
+
+import sqlalchemy as sa
+from alembic import op
+from app.models.account import Currency
+from app.services.holdings import (
+    POSITION_SOURCE_COLUMNS,
+    POSITION_SOURCE_ORDER,
+    positions_from_rows,
+)
+from sqlalchemy.dialects.postgresql import ENUM, UUID
+
+# revision identifiers, used by Alembic.
+revision: str = "8b2d5e7f1a6c"
+down_revision: Union[str, None] = "3f9a1c2b7d4e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "positions",
+        sa.Column(
+            "id", UUID, primary_key=True, server_default=sa.text("uuid_generate_v4()")
+        ),
+        sa.Column(
+            "account_id",
+            UUID,
+            sa.ForeignKey("accounts.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("symbol", sa.String(), nullable=False),
+        sa.Column(
+            "currency",
+            ENUM(name="currency", create_type=False),
+            nullable=False,
+            server_default="CAD",
+        ),
+        sa.Column("quantity", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("cost_basis", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("realized_pl", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("dividends", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("last_transaction_date", sa.Date(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.UniqueConstraint("account_id", "symbol", name="uq_positions_account_symbol"),
+    )
+    # An offline --sql run cannot read the transactions; it only creates the table
+    if not op.get_context().as_sql:
+        backfill_positions(op.get_bind())
+
+
+def backfill_positions(connection: sa.Connection) -> None:
+    """Insert one snapshot per (account, symbol) group of transactions."""
+    rows = connection.execute(
+        sa.select(*POSITION_SOURCE_COLUMNS).order_by(*POSITION_SOURCE_ORDER)
+    ).all()
+    snapshots = positions_from_rows(rows)
+    if not snapshots:
+        return
+
+    # Only the columns that exist at this revision
+    positions = sa.table(
+        "positions",
+        sa.column("id", UUID(as_uuid=True)),
+        sa.column("account_id", UUID(as_uuid=True)),
+        sa.column("symbol", sa.String()),
+        sa.column("currency", sa.Enum(Currency, name="currency")),
+        sa.column("quantity", sa.Float()),
+        sa.column("cost_basis", sa.Float()),
+        sa.column("realized_pl", sa.Float()),
+        sa.column("dividends", sa.Float()),
+        sa.column("last_transaction_date", sa.Date()),
+    )
+    connection.execute(
+        positions.insert(),
+        [
+            {
+                "id": uuid4(),
+                "account_id": snapshot["account_id"],
+                "symbol": snapshot["symbol"],
+                "currency": snapshot["currency"],
+                "quantity": snapshot["quantity"],
+                "cost_basis": snapshot["cost_basis"],
+                "realized_pl": snapshot["realized_pl"],
+                "dividends": snapshot["dividends"],
+                "last_transaction_date": snapshot["last_transaction_date"],
+            }
+            for snapshot in snapshots
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("positions")
@@ -0,0 +1,34 @@
+"""add dividend partial index
+
+Revision ID: a2c6f8e1b347
+Revises: 5d8e2b4a7c19
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a2c6f8e1b347"
+down_revision: Union[str, None] = "5d8e2b4a7c19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Dividends are a small fraction of transactions; index only those rows
+    op.create_index(
+        "ix_transactions_dividends_account_id_date",
+        "transactions",
+        ["account_id", "date"],
+        postgresql_where=sa.text("type = 'DIVIDEND'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_transactions_dividends_account_id_date", table_name="transactions"
+    )
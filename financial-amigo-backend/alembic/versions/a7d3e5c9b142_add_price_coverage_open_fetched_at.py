@@ -0,0 +1,29 @@
+"""add price coverage open_fetched_at
+
+Revision ID: a7d3e5c9b142
+Revises: f2c7a9d4e816
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d3e5c9b142"
+down_revision: Union[str, None] = "f2c7a9d4e816"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "price_history_coverage",
+        sa.Column("open_fetched_at", sa.TIMESTAMP(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("price_history_coverage", "open_fetched_at")
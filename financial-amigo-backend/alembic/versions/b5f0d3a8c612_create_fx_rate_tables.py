@@ -0,0 +1,56 @@
+"""create fx rate tables
+
+Revision ID: b5f0d3a8c612
+Revises: a2c6f8e1b347
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b5f0d3a8c612"
+down_revision: Union[str, None] = "a2c6f8e1b347"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "fx_rates",
+        sa.Column("pair", sa.String(), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("rate", sa.Float(), nullable=False),
+    )
+
+    op.create_table(
+        "fx_rate_coverage",
+        sa.Column("pair", sa.String(), primary_key=True),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+
+    # Rates were previously stored as the USDCAD=X symbol in the price store
+    op.execute(
+        "INSERT INTO fx_rates (pair, date, rate) "
+        "SELECT 'USDCAD', date, close FROM price_history WHERE symbol = 'USDCAD=X'"
+    )
+    op.execute(
+        "INSERT INTO fx_rate_coverage (pair, start_date, end_date) "
+        "SELECT 'USDCAD', start_date, end_date FROM price_history_coverage "
+        "WHERE symbol = 'USDCAD=X'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("fx_rate_coverage")
+    op.drop_table("fx_rates")
@@ -0,0 +1,45 @@
+"""create price history tables
+
+Revision ID: c41e9a07b3d2
+Revises: 8b2d5e7f1a6c
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c41e9a07b3d2"
+down_revision: Union[str, None] = "8b2d5e7f1a6c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "price_history",
+        sa.Column("symbol", sa.String(), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("close", sa.Float(), nullable=False),
+    )
+
+    op.create_table(
+        "price_history_coverage",
+        sa.Column("symbol", sa.String(), primary_key=True),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("price_history_coverage")
+    op.drop_table("price_history")
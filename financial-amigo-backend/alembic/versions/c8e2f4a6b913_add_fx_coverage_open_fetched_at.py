@@ -0,0 +1,29 @@
+"""add fx coverage open_fetched_at
+
+Revision ID: c8e2f4a6b913
+Revises: a7d3e5c9b142
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c8e2f4a6b913"
+down_revision: Union[str, None] = "a7d3e5c9b142"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "fx_rate_coverage",
+        sa.Column("open_fetched_at", sa.TIMESTAMP(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("fx_rate_coverage", "open_fetched_at")
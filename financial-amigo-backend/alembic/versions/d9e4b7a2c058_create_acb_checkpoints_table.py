@@ -0,0 +1,81 @@
+"""create acb checkpoints table
+
+Revision ID: d9e4b7a2c058
+Revises: b5f0d3a8c612
+Create Date: 2026-10-17 17:00:00.000000
+
+Every existing position is marked stale from its first transaction, so
+checkpoints are built on the first realized gains read.
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision: str = "d9e4b7a2c058"
+down_revision: Union[str, None] = "b5f0d3a8c612"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("positions", sa.Column("acb_stale_from", sa.Date(), nullable=True))
+    op.execute("""
+        UPDATE positions SET acb_stale_from = (
+            SELECT min(t.date) FROM transactions t
+            WHERE t.account_id = positions.account_id
+              AND t.symbol = positions.symbol
+        )
+        """)
+
+    op.create_table(
+        "acb_checkpoints",
+        sa.Column(
+            "id", UUID, primary_key=True, server_default=sa.text("uuid_generate_v4()")
+        ),
+        sa.Column(
+            "account_id",
+            UUID,
+            sa.ForeignKey("accounts.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("symbol", sa.String(), nullable=False),
+        sa.Column(
+            "transaction_id",
+            UUID,
+            sa.ForeignKey("transactions.id", ondelete="CASCADE"),
+            nullable=False,
+            unique=True,
+        ),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("sequence", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Float(), nullable=False),
+        sa.Column("acb", sa.Float(), nullable=False),
+        sa.Column("sold_quantity", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("proceeds", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("cost", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("gain", sa.Float(), nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "ix_acb_checkpoints_account_id_symbol_date",
+        "acb_checkpoints",
+        ["account_id", "symbol", "date", "sequence"],
+    )
+    op.create_index(
+        "ix_acb_checkpoints_account_id_date",
+        "acb_checkpoints",
+        ["account_id", "date"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_acb_checkpoints_account_id_date", table_name="acb_checkpoints")
+    op.drop_index(
+        "ix_acb_checkpoints_account_id_symbol_date", table_name="acb_checkpoints"
+    )
+    op.drop_table("acb_checkpoints")
+    op.drop_column("positions", "acb_stale_from")
@@ -0,0 +1,38 @@
+"""create oauth states table
+
+Revision ID: e7a3f1c95d20
+Revises: c41e9a07b3d2
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7a3f1c95d20"
+down_revision: Union[str, None] = "c41e9a07b3d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "oauth_states",
+        sa.Column("state", sa.String(), primary_key=True),
+        sa.Column("code_verifier", sa.String(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+    op.create_index("ix_oauth_states_created_at", "oauth_states", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_oauth_states_created_at", table_name="oauth_states")
+    op.drop_table("oauth_states")
@@ -0,0 +1,64 @@
+"""create cash flow days table
+
+Revision ID: f2c7a9d4e816
+Revises: d9e4b7a2c058
+Create Date: 2026-10-17 18:00:00.000000
+
+Running totals are built here from the existing transactions.
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c7a9d4e816"
+down_revision: Union[str, None] = "d9e4b7a2c058"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cash_flow_days",
+        sa.Column(
+            "account_id",
+            UUID,
+            sa.ForeignKey("accounts.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("symbol", sa.String(), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("quantity", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("contributions", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("withdrawals", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("dividends", sa.Float(), nullable=False, server_default="0"),
+    )
+
+    op.execute("""
+        INSERT INTO cash_flow_days (
+            account_id, symbol, date,
+            quantity, contributions, withdrawals, dividends
+        )
+        SELECT
+            account_id, symbol, date,
+            sum(sum(CASE type
+                WHEN 'BUY' THEN quantity
+                WHEN 'SELL' THEN -quantity
+                ELSE 0 END)) OVER w,
+            sum(sum(CASE WHEN type = 'BUY'
+                THEN quantity * price_native + commission_native
+                ELSE 0 END)) OVER w,
+            sum(sum(CASE WHEN type = 'SELL' THEN total_native ELSE 0 END)) OVER w,
+            sum(sum(CASE WHEN type = 'DIVIDEND' THEN total_native ELSE 0 END)) OVER w
+        FROM transactions
+        GROUP BY account_id, symbol, date
+        WINDOW w AS (PARTITION BY account_id, symbol ORDER BY date)
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table("cash_flow_days")
@@ -1,12 +1,19 @@
+from datetime import date
 from typing import List
+from uuid import UUID
 
 from app.core.auth import get_current_user
 from app.core.database import get_db
-from app.models.account import Account
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+from app.models.account import Account, AccountType, Currency
 from app.models.user import User
 from app.schemas.account import AccountCreate, AccountResponse, AccountUpdate
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from app.schemas.capital_gains import Disposition, RealizedGainsResponse
+from app.services.acb import get_dispositions, refresh_acb
+from app.services.fx import FxProvider, FxRateError, get_fx_provider
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
@@ -15,60 +22,138 @@ router = APIRouter()
 async def create_account(
     account_data: AccountCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> AccountResponse:
     """Create a new account."""
     account = Account(**account_data.dict(), user_id=current_user.id)
     db.add(account)
     try:
-        db.commit()
-        db.refresh(account)
+        await db.commit()
+        await db.refresh(account)
         return AccountResponse.from_orm(account)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("")
 async def list_accounts(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> List[AccountResponse]:
     """List all accounts for the current user."""
-    accounts = db.query(Account).filter(Account.user_id == current_user.id).all()
+    result = await db.execute(
+        select(func.max(Account.updated_at), func.count(Account.id)).where(
+            Account.user_id == current_user.id
+        )
+    )
+    etag = make_etag("accounts", current_user.id, *result.one())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    result = await db.execute(select(Account).where(Account.user_id == current_user.id))
+    accounts = result.scalars().all()
     return [AccountResponse.from_orm(account) for account in accounts]
 
 
 @router.get("/{account_id}")
 async def get_account(
     account_id: str,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> AccountResponse:
     """Get a specific account."""
-    account = (
-        db.query(Account)
-        .filter(Account.id == account_id, Account.user_id == current_user.id)
-        .first()
+    result = await db.execute(
+        select(Account).where(
+            Account.id == account_id, Account.user_id == current_user.id
+        )
     )
+    account = result.scalars().first()
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
+
+    etag = make_etag("account", account.id, account.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return AccountResponse.from_orm(account)
 
 
+@router.get("/{account_id}/realized-gains")
+async def get_realized_gains(
+    account_id: UUID,
+    year: int = Query(..., ge=1900, le=9999),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    fx_provider: FxProvider = Depends(get_fx_provider),
+) -> RealizedGainsResponse:
+    """Capital gains realized in a non-registered account during a year."""
+    result = await db.execute(
+        select(Account).where(
+            Account.id == account_id, Account.user_id == current_user.id
+        )
+    )
+    account = result.scalars().first()
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+    if account.type != AccountType.NON_REGISTERED:
+        raise HTTPException(
+            status_code=400,
+            detail="Capital gains are only tracked for non-registered accounts",
+        )
+
+    try:
+        # Replay whatever earlier writes left stale, then keep the result
+        await refresh_acb(db, fx_provider, account.id)
+        await db.commit()
+    except FxRateError:
+        await db.rollback()
+        raise HTTPException(status_code=502, detail="Failed to load exchange rates")
+
+    checkpoints = await get_dispositions(
+        db, account.id, date(year, 1, 1), date(year, 12, 31)
+    )
+    dispositions = [
+        Disposition(
+            date=checkpoint.date,
+            symbol=checkpoint.symbol,
+            quantity=checkpoint.sold_quantity,
+            proceeds=checkpoint.proceeds,
+            cost=checkpoint.cost,
+            gain=checkpoint.gain,
+        )
+        for checkpoint in checkpoints
+    ]
+    return RealizedGainsResponse(
+        account_id=account.id,
+        year=year,
+        currency=Currency.CAD.value,
+        proceeds=sum(item.proceeds for item in dispositions),
+        cost=sum(item.cost for item in dispositions),
+        gain=sum(item.gain for item in dispositions),
+        dispositions=dispositions,
+    )
+
+
 @router.patch("/{account_id}")
 async def update_account(
     account_id: str,
     account_data: AccountUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> AccountResponse:
     """Update an account."""
-    account = (
-        db.query(Account)
-        .filter(Account.id == account_id, Account.user_id == current_user.id)
-        .first()
+    result = await db.execute(
+        select(Account).where(
+            Account.id == account_id, Account.user_id == current_user.id
+        )
     )
+    account = result.scalars().first()
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
 
@@ -76,11 +161,11 @@ async def update_account(
         setattr(account, key, value)
 
     try:
-        db.commit()
-        db.refresh(account)
+        await db.commit()
+        await db.refresh(account)
         return AccountResponse.from_orm(account)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 
@@ -88,21 +173,22 @@ async def update_account(
 async def delete_account(
     account_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
     """Delete an account."""
-    account = (
-        db.query(Account)
-        .filter(Account.id == account_id, Account.user_id == current_user.id)
-        .first()
+    result = await db.execute(
+        select(Account).where(
+            Account.id == account_id, Account.user_id == current_user.id
+        )
     )
+    account = result.scalars().first()
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
 
     try:
-        db.delete(account)
-        db.commit()
+        await db.delete(account)
+        await db.commit()
         return {"status": "success", "message": "Account deleted successfully"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,59 @@
+from datetime import date
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_current_user
+from app.core.database import get_db
+from app.models.user import User
+from app.schemas.analysis import AnalysisResponse
+from app.services.cash_flows import get_analysis
+from app.services.fx import FxProvider, FxRateError, get_fx_provider
+from app.services.market_data import (
+    PriceHistoryError,
+    PriceProvider,
+    get_price_provider,
+)
+
+router = APIRouter()
+
+
+@router.get("", response_model=AnalysisResponse)
+async def analysis(
+    start: date,
+    end: date,
+    account_id: UUID = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    provider: PriceProvider = Depends(get_price_provider),
+    fx_provider: FxProvider = Depends(get_fx_provider),
+) -> AnalysisResponse:
+    """Contributions, withdrawals, dividends and value change over a range."""
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be on or before end",
+        )
+
+    try:
+        summary = await get_analysis(
+            db,
+            provider,
+            fx_provider,
+            current_user.id,
+            current_user.default_currency,
+            start,
+            end,
+            account_id,
+        )
+        # Keep any prices and rates fetched while valuing
+        await db.commit()
+    except (FxRateError, PriceHistoryError):
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to load price history",
+        )
+
+    return summary
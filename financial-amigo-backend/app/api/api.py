@@ -1,6 +1,16 @@
 from fastapi import APIRouter
 
-from app.api import accounts, auth, transactions, users
+from app.api import (
+    accounts,
+    analysis,
+    auth,
+    dividends,
+    holdings,
+    market_data,
+    portfolio,
+    transactions,
+    users,
+)
 
 api_router = APIRouter()
 
@@ -11,3 +21,8 @@ api_router.include_router(accounts.router, prefix="/accounts", tags=["accounts"]
 api_router.include_router(
     transactions.router, prefix="/transactions", tags=["transactions"]
 )
+api_router.include_router(analysis.router, prefix="/analysis", tags=["analysis"])
+api_router.include_router(dividends.router, prefix="/dividends", tags=["dividends"])
+api_router.include_router(holdings.router, prefix="/holdings", tags=["holdings"])
+api_router.include_router(market_data.router, prefix="/market", tags=["market"])
+api_router.include_router(portfolio.router, prefix="/portfolio", tags=["portfolio"])
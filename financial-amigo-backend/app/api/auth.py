@@ -1,13 +1,18 @@
 import logging
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.auth import (
+    create_oauth_flow,
     create_token,
     get_current_user,
-    oauth_flow,
+    invalidate_cached_user,
+    pop_oauth_state,
+    save_oauth_state,
     verify_google_token,
     verify_token,
 )
@@ -21,14 +26,18 @@ router = APIRouter()
 
 
 @router.get("/google")
-async def google_login():
+async def google_login(db: AsyncSession = Depends(get_db)):
     """Start the Google OAuth flow"""
     try:
-        authorization_url, _ = oauth_flow.authorization_url(
+        oauth_flow = create_oauth_flow()
+        authorization_url, state = oauth_flow.authorization_url(
             access_type="offline",
             include_granted_scopes="true",
             prompt="consent",
         )
+        # The callback may land on another worker, so keep the PKCE
+        # verifier server-side under the state Google will echo back
+        await save_oauth_state(db, state, oauth_flow.code_verifier)
         return RedirectResponse(authorization_url)
     except Exception as e:
         logger.error(f"Failed to start OAuth flow: {str(e)}")
@@ -42,17 +51,28 @@ async def google_login():
 async def google_callback(
     request: Request,
     code: str = Query(...),
-    db: Session = Depends(get_db),
+    state: str = Query(...),
+    db: AsyncSession = Depends(get_db),
 ):
     """Handle the OAuth callback from Google"""
     try:
+        code_verifier = await pop_oauth_state(db, state)
+        if code_verifier is None:
+            return RedirectResponse(
+                url=f"{settings.FRONTEND_URL}/login?error=invalid_state",
+                status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+            )
+        oauth_flow = create_oauth_flow(state=state, code_verifier=code_verifier)
+
         # Get the full URL but replace http with https if needed
         callback_url = str(request.url)
         if settings.USE_HTTPS and callback_url.startswith("http://"):
             callback_url = "https://" + callback_url[7:]
 
-        # Exchange code for tokens
-        oauth_flow.fetch_token(authorization_response=callback_url)
+        # Exchange code for tokens; this is a blocking HTTP call to Google
+        await run_in_threadpool(
+            oauth_flow.fetch_token, authorization_response=callback_url
+        )
 
         try:
             # Get user info from Google
@@ -67,7 +87,8 @@ async def google_callback(
             raise
 
         # Get or create user
-        user = db.query(User).filter(User.email == user_info["email"]).first()
+        result = await db.execute(select(User).where(User.email == user_info["email"]))
+        user = result.scalars().first()
         if user:
             # Update existing user
             user.name = user_info["name"]
@@ -84,7 +105,8 @@ async def google_callback(
             )
             db.add(user)
 
-        db.commit()
+        await db.commit()
+        invalidate_cached_user(user.email)
 
         # Create tokens
         access_token = create_token(user.email, "access")
@@ -98,7 +120,7 @@ async def google_callback(
 
     except Exception as e:
         logger.error(f"OAuth callback error: {str(e)}")
-        db.rollback()
+        await db.rollback()
         # Redirect with error details
         error_message = (
             str(e) if isinstance(e, HTTPException) else "Authentication failed"
@@ -112,7 +134,7 @@ async def google_callback(
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(
     refresh_token: str = Body(..., embed=True),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> TokenResponse:
     """Get a new access token using a refresh token"""
     if not refresh_token:
@@ -128,7 +150,8 @@ async def refresh_token(
             detail="Invalid or expired refresh token",
         )
 
-    user = db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,53 @@
+from datetime import date
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_current_user
+from app.core.database import get_db
+from app.models.user import User
+from app.schemas.dividend import DividendSummaryResponse
+from app.services.dividends import get_dividend_summary
+from app.services.fx import FxProvider, FxRateError, get_fx_provider
+
+router = APIRouter()
+
+
+@router.get("/summary", response_model=DividendSummaryResponse)
+async def dividend_summary(
+    account_id: UUID = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    fx_provider: FxProvider = Depends(get_fx_provider),
+) -> DividendSummaryResponse:
+    """Dividend history and totals per symbol, month and year."""
+    if start and end and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be on or before end",
+        )
+
+    try:
+        summary = await get_dividend_summary(
+            db,
+            fx_provider,
+            current_user.id,
+            current_user.default_currency,
+            account_id,
+            start,
+            end,
+        )
+        # Keep any exchange rates fetched while converting
+        await db.commit()
+    except FxRateError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to load exchange rates",
+        )
+
+    return summary
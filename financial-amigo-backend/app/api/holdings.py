@@ -0,0 +1,30 @@
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_current_user
+from app.core.database import get_db
+from app.models.user import User
+from app.schemas.holding import HoldingResponse
+from app.services.fx import FxProvider, get_fx_provider
+from app.services.holdings import get_holdings
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[HoldingResponse])
+async def list_holdings(
+    account_id: UUID = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    fx_provider: FxProvider = Depends(get_fx_provider),
+) -> List[HoldingResponse]:
+    """List positions per account and symbol, optionally filtered by account."""
+    holdings = await get_holdings(
+        db, fx_provider, current_user.id, current_user.default_currency, account_id
+    )
+    # Keep any exchange rates fetched while converting
+    await db.commit()
+    return holdings
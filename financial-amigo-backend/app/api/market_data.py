@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.core.auth import get_current_user
+from app.models.user import User
+from app.schemas.market_data import PricesResponse
+from app.services.market_data import PriceCache, get_price_cache
+
+router = APIRouter()
+
+# Upper bound on symbols per request
+MAX_SYMBOLS = 100
+
+
+@router.get("/prices", response_model=PricesResponse)
+async def get_prices(
+    symbols: str = Query(..., description="Comma-separated symbols"),
+    current_user: User = Depends(get_current_user),
+    cache: PriceCache = Depends(get_price_cache),
+) -> PricesResponse:
+    """Get the latest price for each requested symbol."""
+    requested = [s.strip() for s in symbols.split(",") if s.strip()]
+    if not requested or len(requested) > MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Provide between 1 and {MAX_SYMBOLS} symbols",
+        )
+
+    try:
+        prices = await cache.get_prices(requested)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Market data provider unavailable",
+        )
+    return PricesResponse(prices=prices)
@@ -0,0 +1,161 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.user import User
+from app.schemas.portfolio import (
+    BenchmarkResponse,
+    PortfolioHistoryResponse,
+    PortfolioReturnsResponse,
+)
+from app.services.benchmark import UnknownBenchmarkError, get_benchmark_comparison
+from app.services.fx import FxProvider, FxRateError, get_fx_provider
+from app.services.market_data import (
+    PriceHistoryError,
+    PriceProvider,
+    get_price_provider,
+)
+from app.services.portfolio import get_portfolio_history
+from app.services.returns import get_returns
+
+router = APIRouter()
+
+
+def check_range(start: Optional[date], end: Optional[date]) -> None:
+    """Reject ranges that are reversed, run past today or are too long.
+
+    Every day in the range is a row of the (days x symbols) valuation, so
+    its length is capped at HISTORY_MAX_DAYS.
+    """
+    today = date.today()
+    if end and end > today:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must not be after today",
+        )
+    if start and end and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be on or before end",
+        )
+    if start and (end or today) - start >= timedelta(days=settings.HISTORY_MAX_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The range may span at most {settings.HISTORY_MAX_DAYS} days",
+        )
+
+
+@router.get("/history", response_model=PortfolioHistoryResponse)
+async def portfolio_history(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    provider: PriceProvider = Depends(get_price_provider),
+    fx_provider: FxProvider = Depends(get_fx_provider),
+) -> PortfolioHistoryResponse:
+    """Daily value of the user's portfolio across all accounts."""
+    check_range(start, end)
+
+    try:
+        dates, values = await get_portfolio_history(
+            db,
+            provider,
+            fx_provider,
+            current_user.id,
+            current_user.default_currency,
+            start,
+            end,
+        )
+        # Keep any prices fetched while valuing
+        await db.commit()
+    except (FxRateError, PriceHistoryError):
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to load price history",
+        )
+
+    return PortfolioHistoryResponse(
+        currency=current_user.default_currency.value,
+        dates=dates.tolist(),
+        values=values.tolist(),
+    )
+
+
+@router.get("/returns", response_model=PortfolioReturnsResponse)
+async def portfolio_returns(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    provider: PriceProvider = Depends(get_price_provider),
+    fx_provider: FxProvider = Depends(get_fx_provider),
+) -> PortfolioReturnsResponse:
+    """Time- and money-weighted returns of the portfolio and each account."""
+    check_range(start, end)
+
+    try:
+        returns = await get_returns(
+            db,
+            provider,
+            fx_provider,
+            current_user.id,
+            current_user.default_currency,
+            start,
+            end,
+        )
+        # Keep any prices and rates fetched while valuing
+        await db.commit()
+    except (FxRateError, PriceHistoryError):
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to load price history",
+        )
+
+    return returns
+
+
+@router.get("/benchmark", response_model=BenchmarkResponse)
+async def portfolio_benchmark(
+    symbol: str = Query(..., min_length=1, description="Benchmark, e.g. ^GSPC"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    provider: PriceProvider = Depends(get_price_provider),
+    fx_provider: FxProvider = Depends(get_fx_provider),
+) -> BenchmarkResponse:
+    """Portfolio value against a benchmark bought with the same cash flows."""
+    check_range(start, end)
+
+    try:
+        comparison = await get_benchmark_comparison(
+            db,
+            provider,
+            fx_provider,
+            current_user.id,
+            current_user.default_currency,
+            symbol,
+            start,
+            end,
+        )
+        # Keep any prices and rates fetched while valuing
+        await db.commit()
+    except UnknownBenchmarkError as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (FxRateError, PriceHistoryError):
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to load price history",
+        )
+
+    return comparison
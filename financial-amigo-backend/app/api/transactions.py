@@ -1,39 +1,92 @@
-from typing import List
+from typing import Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.auth import get_current_user
 from app.core.database import get_db
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import FastJSONResponse
 from app.models.account import Account
 from app.models.transaction import Transaction
 from app.models.user import User
 from app.schemas.transaction import (
     TransactionCreate,
+    TransactionImportResult,
+    TransactionPage,
     TransactionResponse,
     TransactionUpdate,
 )
+from app.services.export import EXPORT_MEDIA_TYPES, stream_export
+from app.services.importer import TransactionImportError, import_transactions_csv
+from app.services.positions import (
+    apply_transaction,
+    position_key,
+    recompute_positions,
+)
 
 router = APIRouter()
 
+# Columns behind TransactionResponse, selected directly for list pages
+RESPONSE_COLUMNS = [
+    getattr(Transaction, field) for field in TransactionResponse.model_fields
+]
+
+
+async def get_user_transaction(
+    db: AsyncSession, transaction_id: UUID, user: User
+) -> Transaction:
+    """Load a transaction owned by the user or raise 404."""
+    result = await db.execute(
+        select(Transaction)
+        .join(Account)
+        .where(Transaction.id == transaction_id, Account.user_id == user.id)
+    )
+    transaction = result.scalars().first()
+
+    if not transaction:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+
+    return transaction
+
+
+def scope_to_user(query: Select, user: User, account_id: Optional[UUID]) -> Select:
+    """Restrict a transactions query to the user's accounts, or one of them."""
+    query = query.join(Account).where(Account.user_id == user.id)
+    if account_id:
+        query = query.where(Transaction.account_id == account_id)
+    return query
+
 
 @router.post("", response_model=TransactionResponse)
 async def create_transaction(
     transaction_data: TransactionCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> TransactionResponse:
     """Create a new transaction."""
     # Verify account belongs to user
-    account = (
-        db.query(Account)
-        .filter(
+    result = await db.execute(
+        select(Account).where(
             Account.id == transaction_data.account_id,
             Account.user_id == current_user.id,
         )
-        .first()
     )
+    account = result.scalars().first()
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
 
@@ -42,49 +95,136 @@ async def create_transaction(
     db.add(transaction)
 
     try:
-        db.commit()
-        db.refresh(transaction)
+        await apply_transaction(db, transaction)
+        await db.commit()
+        await db.refresh(transaction)
         return TransactionResponse.from_orm(transaction)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("", response_model=List[TransactionResponse])
+@router.post("/bulk", response_model=TransactionImportResult)
+async def import_transactions(
+    file: UploadFile = File(..., description="CSV with a header row"),
+    account_id: Optional[UUID] = Form(
+        None, description="Account for rows without an account_id column"
+    ),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> TransactionImportResult:
+    """Import many transactions from a CSV file in one request.
+
+    Columns match the transaction fields (date, symbol, quantity, price_native,
+    commission_native, currency, type, description, account_id). The import is
+    all-or-nothing: any invalid row rejects the whole file.
+    """
+    try:
+        imported = await import_transactions_csv(
+            db, current_user.id, file.file, account_id
+        )
+        await db.commit()
+        return TransactionImportResult(imported=imported)
+    except TransactionImportError as e:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail=e.errors)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("", response_model=TransactionPage)
 async def list_transactions(
+    request: Request,
     account_id: UUID = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> List[TransactionResponse]:
-    """List all transactions for the current user, optionally filtered by account."""
-    query = (
-        db.query(Transaction).join(Account).filter(Account.user_id == current_user.id)
+    db: AsyncSession = Depends(get_db),
+) -> TransactionPage:
+    """List the current user's transactions, newest first, one page at a time.
+
+    Pages are keyed on (date, id) so each page is an index range scan
+    regardless of how far back the user has paged. Rows are read as plain
+    tuples and encoded with orjson, skipping ORM and per-row model overhead.
+    """
+    query = scope_to_user(select(*RESPONSE_COLUMNS), current_user, account_id)
+    fingerprint = scope_to_user(
+        select(func.max(Transaction.updated_at), func.count(Transaction.id)),
+        current_user,
+        account_id,
     )
 
-    if account_id:
-        query = query.filter(Transaction.account_id == account_id)
+    # Any insert, edit or delete in scope changes the latest update or count
+    result = await db.execute(fingerprint)
+    etag = make_etag(
+        "transactions", current_user.id, account_id, cursor, limit, *result.one()
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(Transaction.date, Transaction.id) < (cursor_date, cursor_id)
+        )
 
-    transactions = query.order_by(Transaction.date.desc()).all()
-    return [TransactionResponse.from_orm(t) for t in transactions]
+    # Fetch one extra row to know whether another page exists
+    query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+    result = await db.execute(query.limit(limit + 1))
+    transactions = result.all()
+
+    next_cursor = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        next_cursor = encode_cursor(last.date, last.id)
+
+    page = FastJSONResponse(
+        {"items": [t._asdict() for t in transactions], "next_cursor": next_cursor}
+    )
+    set_etag(page, etag)
+    return page
+
+
+@router.get("/export")
+async def export_transactions(
+    format: Literal["csv", "ndjson"] = "csv",
+    account_id: UUID = None,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Download the current user's full transaction history, oldest first.
+
+    The body is streamed from a server-side cursor, so any history size is
+    exported in constant memory.
+    """
+    query = scope_to_user(select(*RESPONSE_COLUMNS), current_user, account_id).order_by(
+        Transaction.date, Transaction.id
+    )
+    return StreamingResponse(
+        stream_export(query, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="transactions.{format}"'
+        },
+    )
 
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(
     transaction_id: UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> TransactionResponse:
     """Get a specific transaction."""
-    transaction = (
-        db.query(Transaction)
-        .join(Account)
-        .filter(Transaction.id == transaction_id, Account.user_id == current_user.id)
-        .first()
-    )
-
-    if not transaction:
-        raise HTTPException(status_code=404, detail="Transaction not found")
+    transaction = await get_user_transaction(db, transaction_id, current_user)
 
+    etag = make_etag("transaction", transaction.id, transaction.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return TransactionResponse.from_orm(transaction)
 
 
@@ -93,36 +233,31 @@ async def update_transaction(
     transaction_id: UUID,
     transaction_data: TransactionUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> TransactionResponse:
     """Update a transaction."""
-    transaction = (
-        db.query(Transaction)
-        .join(Account)
-        .filter(Transaction.id == transaction_id, Account.user_id == current_user.id)
-        .first()
-    )
-
-    if not transaction:
-        raise HTTPException(status_code=404, detail="Transaction not found")
+    transaction = await get_user_transaction(db, transaction_id, current_user)
+    previous_key, previous_date = position_key(transaction), transaction.date
 
     # Update fields
     for key, value in transaction_data.dict(exclude_unset=True).items():
         setattr(transaction, key, value)
 
     # Recalculate total
-    transaction.total = (
-        transaction.price
-        if transaction.type.value == "Dividend"
-        else transaction.quantity * transaction.price
-    )
+    transaction.total_native = transaction.calculated_total_native
 
     try:
-        db.commit()
-        db.refresh(transaction)
+        # Edits can rewrite history, so rebuild the affected snapshots; ACB
+        # is stale from the earlier of the old and new dates
+        changes = {previous_key: previous_date}
+        key = position_key(transaction)
+        changes[key] = min(changes.get(key, transaction.date), transaction.date)
+        await recompute_positions(db, changes)
+        await db.commit()
+        await db.refresh(transaction)
         return TransactionResponse.from_orm(transaction)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 
@@ -130,23 +265,16 @@ async def update_transaction(
 async def delete_transaction(
     transaction_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
     """Delete a transaction."""
-    transaction = (
-        db.query(Transaction)
-        .join(Account)
-        .filter(Transaction.id == transaction_id, Account.user_id == current_user.id)
-        .first()
-    )
-
-    if not transaction:
-        raise HTTPException(status_code=404, detail="Transaction not found")
+    transaction = await get_user_transaction(db, transaction_id, current_user)
 
     try:
-        db.delete(transaction)
-        db.commit()
+        await db.delete(transaction)
+        await recompute_positions(db, {position_key(transaction): transaction.date})
+        await db.commit()
         return {"status": "success", "message": "Transaction deleted successfully"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
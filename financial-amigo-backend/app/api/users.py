@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, invalidate_cached_user
 from app.core.database import get_db
 from app.models.user import User
 from app.schemas.user import UserResponse, UserSettingsUpdate
@@ -19,11 +19,12 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 async def update_user_settings(
     settings: UserSettingsUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update the current user's settings."""
     # Update user settings
     current_user.default_currency = settings.default_currency
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    invalidate_cached_user(current_user.email)
+    await db.refresh(current_user)
     return current_user
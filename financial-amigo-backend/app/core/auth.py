@@ -1,17 +1,24 @@
 import os
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Literal, Optional
 
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from google.auth.transport import requests
 from google.oauth2 import id_token
 from google_auth_oauthlib.flow import Flow
-from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from jose import JWTError
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.google_certs import CachingRequest
+from app.core.keys import keysets
+from app.models.oauth_state import OAuthState
 from app.models.user import User
 
 # Allow HTTP for development
@@ -19,40 +26,119 @@ if not settings.USE_HTTPS:
     os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
 
 # OAuth configuration
-oauth_flow = Flow.from_client_config(
-    client_config={
-        "web": {
-            "client_id": settings.GOOGLE_CLIENT_ID,
-            "client_secret": settings.GOOGLE_CLIENT_SECRET,
-            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
-            "redirect_uris": [settings.GOOGLE_REDIRECT_URI],
-        }
-    },
-    scopes=[
-        "openid",
-        "https://www.googleapis.com/auth/userinfo.email",
-        "https://www.googleapis.com/auth/userinfo.profile",
-    ],
-)
-oauth_flow.redirect_uri = settings.GOOGLE_REDIRECT_URI
+OAUTH_CLIENT_CONFIG = {
+    "web": {
+        "client_id": settings.GOOGLE_CLIENT_ID,
+        "client_secret": settings.GOOGLE_CLIENT_SECRET,
+        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "redirect_uris": [settings.GOOGLE_REDIRECT_URI],
+    }
+}
+OAUTH_SCOPES = [
+    "openid",
+    "https://www.googleapis.com/auth/userinfo.email",
+    "https://www.googleapis.com/auth/userinfo.profile",
+]
+
+
+def create_oauth_flow(
+    state: Optional[str] = None, code_verifier: Optional[str] = None
+) -> Flow:
+    """Build a fresh OAuth flow; each login gets its own, never shared."""
+    return Flow.from_client_config(
+        client_config=OAUTH_CLIENT_CONFIG,
+        scopes=OAUTH_SCOPES,
+        redirect_uri=settings.GOOGLE_REDIRECT_URI,
+        state=state,
+        code_verifier=code_verifier,
+    )
+
+
+async def save_oauth_state(db: AsyncSession, state: str, code_verifier: str) -> None:
+    """Record a pending login and clear out ones that were never completed."""
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.OAUTH_STATE_TTL_SECONDS
+    )
+    await db.execute(delete(OAuthState).where(OAuthState.created_at < cutoff))
+    db.add(OAuthState(state=state, code_verifier=code_verifier))
+    await db.commit()
+
+
+async def pop_oauth_state(db: AsyncSession, state: str) -> Optional[str]:
+    """Consume a pending login, returning its PKCE code verifier.
+
+    Deleting the row is what claims it, so a state can only be used once
+    even if callbacks for it race on different workers.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.OAUTH_STATE_TTL_SECONDS
+    )
+    result = await db.execute(
+        delete(OAuthState)
+        .where(OAuthState.state == state, OAuthState.created_at >= cutoff)
+        .returning(OAuthState.code_verifier)
+    )
+    code_verifier = result.scalar_one_or_none()
+    await db.commit()
+    return code_verifier
+
+
+# Shared transport so Google's signing certs are fetched once per max-age
+google_request = CachingRequest()
 
 # JWT configuration
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
+# Subject of already-verified tokens, each held until the token expires
+verified_tokens: TTLCache[str] = TTLCache(
+    maxsize=settings.JWT_VERIFY_CACHE_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+# Column values of recently authenticated users, keyed by token subject (email)
+user_cache: TTLCache[dict] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_cached_user(email: str) -> None:
+    """Drop a user from the auth cache after changing their row."""
+    user_cache.invalidate(email)
+
+
+def cached_user(db: AsyncSession, email: str) -> Optional[User]:
+    """Attach a cached user to the session without querying, if present.
+
+    The instance is rebuilt from cached column values on every hit, so
+    changes made during one request never leak into the cache.
+    """
+    values = user_cache.get(email)
+    if values is None:
+        return None
+    user = User(**values)
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
+def cache_user(user: User) -> None:
+    user_cache.set(
+        user.email,
+        {column.key: getattr(user, column.key) for column in User.__table__.columns},
+    )
+
 
 def create_token(email: str, token_type: Literal["access", "refresh"]) -> str:
     """Create a JWT token (access or refresh)"""
     if token_type == "access":
         expire_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        secret = settings.JWT_SECRET_KEY
     else:  # refresh
         expire_delta = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-        secret = settings.JWT_REFRESH_SECRET_KEY
 
     expire = datetime.utcnow() + expire_delta
     to_encode = {"sub": email, "exp": expire, "type": token_type}
-    return jwt.encode(to_encode, secret, algorithm=settings.JWT_ALGORITHM)
+    return keysets[token_type].sign(to_encode)
 
 
 async def verify_token(
@@ -62,26 +148,35 @@ async def verify_token(
     if not token:
         return None
 
+    cache_key = (token_type, token)
+    email = verified_tokens.get(cache_key)
+    if email:
+        return email
+
     try:
-        secret = (
-            settings.JWT_SECRET_KEY
-            if token_type == "access"
-            else settings.JWT_REFRESH_SECRET_KEY
-        )
-        payload = jwt.decode(token, secret, algorithms=[settings.JWT_ALGORITHM])
-        if payload.get("type") != token_type:
-            return None
-        return payload.get("sub")
+        payload = keysets[token_type].verify(token)
     except JWTError:
         return None
+    if payload.get("type") != token_type:
+        return None
+
+    email = payload.get("sub")
+    if email:
+        # Only hold the result while the token itself is still valid
+        remaining = payload["exp"] - time.time()
+        if remaining > 0:
+            verified_tokens.set(cache_key, email, ttl=remaining)
+    return email
 
 
 async def verify_google_token(token: str) -> dict:
     """Verify Google OAuth token and return user info"""
     try:
-        return id_token.verify_oauth2_token(
+        # Signature checks (and a cold cert fetch) block, so keep them off the loop
+        return await run_in_threadpool(
+            id_token.verify_oauth2_token,
             token,
-            requests.Request(),
+            google_request,
             settings.GOOGLE_CLIENT_ID,
             clock_skew_in_seconds=2,  # Allow 2 seconds of clock skew
         )
@@ -94,7 +189,7 @@ async def verify_google_token(token: str) -> dict:
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> User:
     """Get the current authenticated user"""
     if not token:
@@ -112,11 +207,17 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.email == email).first()
+    user = cached_user(db, email)
+    if user:
+        return user
+
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found. Please log in again.",
         )
 
+    cache_user(user)
     return user
@@ -0,0 +1,9 @@
+from starlette.middleware.gzip import GZipMiddleware
+
+from app.core.config import settings
+
+
+def setup_compression(app):
+    """Configure gzip compression for the FastAPI application"""
+    # Small bodies cost more to compress than they save on the wire
+    app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
@@ -12,17 +12,49 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     DATABASE_URL: Optional[str] = None
 
+    # Connection pool (per worker process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
     # Security
     JWT_SECRET_KEY: str
     JWT_REFRESH_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
+    # Asymmetric algorithms (RS256, ES256, ...) sign with a private key and
+    # verify against <kid>.pem public keys, allowing key rotation
+    JWT_PRIVATE_KEY_FILE: Optional[str] = None
+    JWT_KEY_ID: Optional[str] = None
+    JWT_PUBLIC_KEYS_DIR: Optional[str] = None
+    JWT_VERIFY_CACHE_SIZE: int = 10000
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    USER_CACHE_TTL_SECONDS: float = 30
+    USER_CACHE_MAX_SIZE: int = 10000
 
     # OAuth
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
     GOOGLE_REDIRECT_URI: str
+    # How long a login may take between redirect and callback
+    OAUTH_STATE_TTL_SECONDS: int = 600
+
+    # Market data
+    PRICE_CACHE_TTL_SECONDS: float = 60
+    PRICE_CACHE_MAX_SYMBOLS: int = 10000
+    # How long a loaded exchange-rate series is reused before reloading
+    FX_CACHE_TTL_SECONDS: float = 3600
+    # Longest range a portfolio history, returns or benchmark request may span
+    HISTORY_MAX_DAYS: int = 366 * 50
+
+    # Rate limiting; set RATE_LIMIT_REDIS_URL to share limits across nodes
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+
+    # Responses smaller than this many bytes are sent uncompressed
+    GZIP_MINIMUM_SIZE: int = 1000
 
     # Application
     FRONTEND_URL: str
@@ -38,5 +70,14 @@ class Settings(BaseSettings):
             return self.DATABASE_URL
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def async_database_url(self) -> str:
+        """Same database as `database_url`, addressed through the asyncpg driver."""
+        url = self.database_url
+        for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+            if url.startswith(prefix):
+                return "postgresql+asyncpg://" + url[len(prefix) :]
+        return url
+
 
 settings = Settings()
@@ -1,19 +1,97 @@
-from sqlalchemy import create_engine
+import logging
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
-engine = create_engine(settings.database_url)
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Running counters for connection checkouts from the engine pool."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_checkout(self, wait: float, overflowed: bool) -> None:
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        if overflowed:
+            self.overflow_checkouts += 1
+
+    def record_timeout(self, wait: float) -> None:
+        self.timeouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+pool_stats = PoolStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout wait time, overflow and timeouts."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            pool_stats.record_timeout(time.perf_counter() - start)
+            logger.warning(f"Database pool exhausted: {self.status()}")
+            raise
+        pool_stats.record_checkout(
+            time.perf_counter() - start, self.checkedout() > self.size()
+        )
+        return connection
+
+
+engine = create_async_engine(
+    settings.async_database_url,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+SessionLocal = async_sessionmaker(
+    bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def get_pool_stats() -> dict:
+    """Snapshot of the current pool state and cumulative checkout counters."""
+    pool = engine.pool
+    checkouts = pool_stats.checkouts
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": checkouts,
+        "overflow_checkouts": pool_stats.overflow_checkouts,
+        "timeouts": pool_stats.timeouts,
+        "avg_wait_ms": (pool_stats.total_wait / checkouts * 1000) if checkouts else 0.0,
+        "max_wait_ms": pool_stats.max_wait * 1000,
+    }
@@ -0,0 +1,48 @@
+"""
+Conditional GET support.
+
+Read endpoints derive an ETag from a cheap fingerprint of the rows behind
+the response (latest `updated_at` plus row count) instead of from the
+serialized body, so an unchanged resource is answered with 304 after one
+small aggregate query and without loading or serializing any rows.
+
+The tags are weak: the same tag goes out on the identity and the gzipped
+body, which are equivalent but not byte-for-byte identical.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Browsers may keep the response but must revalidate it on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag for the given fingerprint values."""
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names `etag`."""
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,143 @@
+"""
+Cached transport for Google's public signing certificates.
+
+`id_token.verify_oauth2_token` fetches Google's certs on every call through
+the transport it is given. `CachingRequest` answers those GETs from memory
+for as long as the response's Cache-Control max-age allows, and refreshes
+an entry in a background thread shortly before it expires, so logins only
+wait on Google when the cache is cold.
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+from google.auth import transport
+from google.auth.transport import requests
+
+logger = logging.getLogger(__name__)
+
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+# Start refreshing an entry this many seconds before it expires
+REFRESH_MARGIN_SECONDS = 60
+
+
+class CachedResponse(transport.Response):
+    """Snapshot of a response that can be served repeatedly."""
+
+    def __init__(self, status: int, headers: Mapping[str, str], data: bytes):
+        self._status = status
+        self._headers = dict(headers)
+        self._data = data
+
+    @property
+    def status(self) -> int:
+        return self._status
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        return self._headers
+
+    @property
+    def data(self) -> bytes:
+        return self._data
+
+
+def max_age(headers: Mapping[str, str]) -> int:
+    """Seconds a response may be cached for, per its Cache-Control header."""
+    cache_control = {key.lower(): value for key, value in headers.items()}.get(
+        "cache-control", ""
+    )
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = MAX_AGE.search(cache_control)
+    return int(match.group(1)) if match else 0
+
+
+class CachingRequest(transport.Request):
+    """google-auth transport that caches successful GET responses.
+
+    Thread-safe: verification runs in the threadpool, so concurrent cold
+    misses for the same URL are collapsed into one fetch.
+    """
+
+    def __init__(self, refresh_margin: float = REFRESH_MARGIN_SECONDS):
+        self.refresh_margin = refresh_margin
+        self._request = requests.Request()
+        # url -> (expires_at, response)
+        self._entries: Dict[str, Tuple[float, CachedResponse]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._refreshing: set = set()
+        self._guard = threading.Lock()
+
+    def __call__(
+        self, url, method="GET", body=None, headers=None, timeout=None, **kwargs
+    ):
+        if method != "GET" or body is not None:
+            return self._request(
+                url,
+                method=method,
+                body=body,
+                headers=headers,
+                timeout=timeout,
+                **kwargs,
+            )
+
+        cached = self._fresh(url)
+        if cached is not None:
+            return cached
+
+        with self._lock_for(url):
+            # Another thread may have fetched it while we waited
+            cached = self._fresh(url)
+            if cached is not None:
+                return cached
+            return self._fetch(url, headers, timeout)
+
+    def _lock_for(self, url: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(url, threading.Lock())
+
+    def _fresh(self, url: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            return None
+        if remaining <= self.refresh_margin:
+            self._refresh_in_background(url)
+        return response
+
+    def _fetch(
+        self, url: str, headers: Optional[Mapping[str, str]], timeout: Optional[float]
+    ) -> CachedResponse:
+        response = self._request(url, method="GET", headers=headers, timeout=timeout)
+        cached = CachedResponse(response.status, response.headers, response.data)
+        ttl = max_age(cached.headers) if cached.status == 200 else 0
+        if ttl > 0:
+            self._entries[url] = (time.monotonic() + ttl, cached)
+        return cached
+
+    def _refresh_in_background(self, url: str) -> None:
+        with self._guard:
+            if url in self._refreshing:
+                return
+            self._refreshing.add(url)
+
+        def refresh():
+            try:
+                with self._lock_for(url):
+                    self._fetch(url, None, None)
+            except Exception as e:
+                # The current entry is still served until it expires
+                logger.warning(f"Failed to refresh {url}: {str(e)}")
+            finally:
+                with self._guard:
+                    self._refreshing.discard(url)
+
+        threading.Thread(target=refresh, daemon=True).start()
@@ -0,0 +1,97 @@
+"""
+JWT signing keys.
+
+With an HMAC algorithm (the default HS256) access and refresh tokens are
+signed with their own shared secrets, as before. With an asymmetric algorithm
+(RS*/ES*) tokens are signed with one private key and carry its `kid` in the
+header; verification looks the `kid` up in a directory of public keys.
+Rotating keys without downtime is then:
+
+1. Add the new public key as `<kid>.pem` to JWT_PUBLIC_KEYS_DIR everywhere.
+2. Point JWT_PRIVATE_KEY_FILE / JWT_KEY_ID at the new key.
+3. Remove the old public key once tokens signed with it have expired.
+"""
+
+from pathlib import Path
+from typing import Dict, Literal, Optional
+
+from jose import JWTError, jwt
+
+from app.core.config import settings
+
+TokenType = Literal["access", "refresh"]
+
+HMAC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+
+
+class KeySet:
+    """Signing key plus every key currently accepted for verification."""
+
+    def __init__(
+        self,
+        algorithm: str,
+        signing_key: Optional[str],
+        verification_keys: Dict[Optional[str], str],
+        signing_kid: Optional[str] = None,
+    ):
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.signing_kid = signing_kid
+        self.verification_keys = verification_keys
+
+    def sign(self, claims: dict) -> str:
+        if self.signing_key is None:
+            raise RuntimeError("No JWT signing key configured")
+        headers = {"kid": self.signing_kid} if self.signing_kid else None
+        return jwt.encode(
+            claims, self.signing_key, algorithm=self.algorithm, headers=headers
+        )
+
+    def verify(self, token: str) -> dict:
+        """Decode a token, raising JWTError if it is invalid, expired or lacks exp."""
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.verification_keys.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown signing key: {kid}")
+        return jwt.decode(
+            token, key, algorithms=[self.algorithm], options={"require_exp": True}
+        )
+
+
+def load_public_keys(directory: str) -> Dict[Optional[str], str]:
+    """Read `<kid>.pem` public keys from a directory."""
+    return {path.stem: path.read_text() for path in Path(directory).glob("*.pem")}
+
+
+def load_keysets() -> Dict[TokenType, KeySet]:
+    algorithm = settings.JWT_ALGORITHM
+    if algorithm in HMAC_ALGORITHMS:
+        return {
+            "access": KeySet(
+                algorithm, settings.JWT_SECRET_KEY, {None: settings.JWT_SECRET_KEY}
+            ),
+            "refresh": KeySet(
+                algorithm,
+                settings.JWT_REFRESH_SECRET_KEY,
+                {None: settings.JWT_REFRESH_SECRET_KEY},
+            ),
+        }
+
+    # Asymmetric: one keyset for both token types, told apart by the
+    # `type` claim. Replicas that only verify need no private key.
+    if not settings.JWT_PUBLIC_KEYS_DIR:
+        raise RuntimeError(f"JWT_PUBLIC_KEYS_DIR is required for {algorithm}")
+    if settings.JWT_PRIVATE_KEY_FILE and not settings.JWT_KEY_ID:
+        raise RuntimeError("JWT_KEY_ID is required with JWT_PRIVATE_KEY_FILE")
+
+    private_key = (
+        Path(settings.JWT_PRIVATE_KEY_FILE).read_text()
+        if settings.JWT_PRIVATE_KEY_FILE
+        else None
+    )
+    public_keys = load_public_keys(settings.JWT_PUBLIC_KEYS_DIR)
+    keyset = KeySet(algorithm, private_key, public_keys, settings.JWT_KEY_ID)
+    return {"access": keyset, "refresh": keyset}
+
+
+keysets = load_keysets()
@@ -0,0 +1,216 @@
+"""
+Token-bucket rate limiting for auth and write endpoints.
+
+Each (policy, client) pair owns a bucket holding up to `burst` tokens that
+refills at `rate` tokens per second; a request spends one token or is
+answered with 429 and a Retry-After header. Buckets live in a pluggable
+backend: `MemoryBackend` for a single node, `RedisBackend` when several
+nodes must share limits.
+"""
+
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitPolicy:
+    """Limit for requests whose method and path match."""
+
+    def __init__(
+        self,
+        name: str,
+        path_prefix: str,
+        rate: float,
+        burst: int,
+        methods: Optional[Iterable[str]] = None,
+    ):
+        self.name = name
+        self.path_prefix = path_prefix
+        self.rate = rate
+        self.burst = burst
+        self.methods = set(methods) if methods else None
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods is not None and method not in self.methods:
+            return False
+        return path.startswith(self.path_prefix)
+
+
+# First matching policy wins, so more specific prefixes come first
+POLICIES: List[RateLimitPolicy] = [
+    RateLimitPolicy("auth-refresh", "/api/auth/refresh", rate=10 / 60, burst=10),
+    # The OAuth login and callback; reads such as /api/auth/me are not limited
+    RateLimitPolicy("auth", "/api/auth/google", rate=30 / 60, burst=30),
+    RateLimitPolicy(
+        "transactions-bulk",
+        "/api/transactions/bulk",
+        rate=5 / 60,
+        burst=5,
+        methods={"POST"},
+    ),
+    RateLimitPolicy(
+        "transactions-write",
+        "/api/transactions",
+        rate=1,
+        burst=60,
+        methods={"POST", "PUT", "PATCH", "DELETE"},
+    ),
+]
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets."""
+
+    @abstractmethod
+    async def consume(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        """Take one token from the bucket at `key`.
+
+        Returns (allowed, seconds until a token is available).
+        """
+
+
+class MemoryBackend(RateLimitBackend):
+    """Buckets held in this process, least recently used evicted first."""
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        # key -> (tokens, last refill time)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def consume(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+# Refill and spend atomically on the server, using its clock so nodes with
+# skewed clocks still agree. Idle buckets expire once they would be full.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisBackend(RateLimitBackend):
+    """Buckets shared by every node through Redis.
+
+    `client` is a `redis.asyncio.Redis`, or anything with a compatible
+    async `eval`.
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def consume(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        allowed, retry_after = await self.client.eval(
+            TOKEN_BUCKET_SCRIPT, 1, self.prefix + key, rate, burst
+        )
+        return bool(int(allowed)), float(retry_after)
+
+
+def create_backend() -> RateLimitBackend:
+    if not settings.RATE_LIMIT_REDIS_URL:
+        return MemoryBackend()
+    # Only needed for multi-node deployments
+    from redis.asyncio import Redis
+
+    return RedisBackend(Redis.from_url(settings.RATE_LIMIT_REDIS_URL))
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying the first matching policy to each request."""
+
+    def __init__(
+        self,
+        app,
+        backend: RateLimitBackend,
+        policies: List[RateLimitPolicy] = POLICIES,
+    ):
+        self.app = app
+        self.backend = backend
+        self.policies = policies
+
+    def policy_for(self, method: str, path: str) -> Optional[RateLimitPolicy]:
+        for policy in self.policies:
+            if policy.matches(method, path):
+                return policy
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        policy = self.policy_for(scope["method"], scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        key = f"{policy.name}:{client[0] if client else 'unknown'}"
+        try:
+            allowed, retry_after = await self.backend.consume(
+                key, policy.rate, policy.burst
+            )
+        except Exception as e:
+            # A limiter outage should not take the API down with it
+            logger.warning(f"Rate limit backend error: {str(e)}")
+            allowed, retry_after = True, 0.0
+
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        body = b'{"detail":"Too many requests"}'
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(math.ceil(retry_after)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def setup_rate_limit(app):
+    """Configure rate limiting for the FastAPI application"""
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware, backend=create_backend())
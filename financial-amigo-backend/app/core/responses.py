@@ -0,0 +1,18 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, skipping response-model validation.
+
+    Opt-in for large payloads built from trusted database values: return it
+    directly from a route and FastAPI sends it as-is. UUIDs, dates, enums
+    and NumPy arrays are encoded natively.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
@@ -3,30 +3,59 @@ from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 from app.core.config import settings
 
 
+def security_headers():
+    """Header pairs added to every response, encoded once at startup."""
+    headers = {
+        "X-Content-Type-Options": "nosniff",
+        "X-Frame-Options": "DENY",
+        "X-XSS-Protection": "1; mode=block",
+        "Referrer-Policy": "strict-origin-when-cross-origin",
+    }
+
+    # Add HSTS only if HTTPS is enabled
+    if settings.USE_HTTPS:
+        headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+
+    return [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+
+
+class SecurityHeadersMiddleware:
+    """Pure ASGI middleware adding security headers to each response.
+
+    Only the `http.response.start` message is touched, so streaming bodies
+    pass straight through without the extra task and buffering of
+    `BaseHTTPMiddleware`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.headers = security_headers()
+        self.names = {name for name, _ in self.headers}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                # Ours replace any the route set, as before
+                headers = [
+                    header
+                    for header in message.get("headers", [])
+                    if header[0].lower() not in self.names
+                ]
+                headers.extend(self.headers)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
 def setup_security_headers(app):
     """Configure security headers for the FastAPI application"""
     # Force HTTPS in production
     if settings.USE_HTTPS:
         app.add_middleware(HTTPSRedirectMiddleware)
 
-    @app.middleware("http")
-    async def add_security_headers(request, call_next):
-        response = await call_next(request)
-
-        # Security headers
-        response.headers.update(
-            {
-                "X-Content-Type-Options": "nosniff",
-                "X-Frame-Options": "DENY",
-                "X-XSS-Protection": "1; mode=block",
-                "Referrer-Policy": "strict-origin-when-cross-origin",
-            }
-        )
-
-        # Add HSTS only if HTTPS is enabled
-        if settings.USE_HTTPS:
-            response.headers["Strict-Transport-Security"] = (
-                "max-age=31536000; includeSubDomains"
-            )
-
-        return response
+    app.add_middleware(SecurityHeadersMiddleware)
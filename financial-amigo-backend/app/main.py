@@ -1,12 +1,21 @@
 from fastapi import FastAPI
 
 from app.api.api import api_router
+from app.core.auth import user_cache, verified_tokens
+from app.core.compression import setup_compression
 from app.core.cors import setup_cors
+from app.core.database import get_pool_stats
+from app.core.rate_limit import setup_rate_limit
 from app.core.security_headers import setup_security_headers
+from app.services.fx import rate_cache
+from app.services.market_data import price_cache
 
 # Create FastAPI app
 app = FastAPI(title="FinancialAmigo API")
 
+# Setup rate limiting inside CORS so 429 responses still carry CORS headers
+setup_rate_limit(app)
+
 # Setup CORS before adding routes
 setup_cors(app)
 
@@ -16,7 +25,27 @@ app.include_router(api_router, prefix="/api")
 # Setup security headers
 setup_security_headers(app)
 
+# Compress large responses
+setup_compression(app)
+
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to FinancialAmigo API"}
+
+
+@app.get("/health/db")
+async def database_pool_health():
+    """Report connection pool usage for this worker."""
+    return get_pool_stats()
+
+
+@app.get("/health/caches")
+async def cache_health():
+    """Report size and hit counts of this worker's in-process caches."""
+    return {
+        "user_cache": user_cache.stats(),
+        "verified_tokens": verified_tokens.stats(),
+        "price_cache": price_cache.stats(),
+        "fx_rates": rate_cache.stats(),
+    }
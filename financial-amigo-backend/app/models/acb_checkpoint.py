@@ -0,0 +1,55 @@
+from uuid import uuid4
+
+from sqlalchemy import Column, Date, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class AcbCheckpoint(Base):
+    """Adjusted cost base state after one buy or sell, in CAD.
+
+    One row per transaction of an (account, symbol) group, numbered by
+    `sequence` in chronological order. Replaying from a date only needs the
+    last checkpoint before it. Sells also record the disposition.
+    """
+
+    __tablename__ = "acb_checkpoints"
+    __table_args__ = (
+        # Latest checkpoint before a date within a group
+        Index(
+            "ix_acb_checkpoints_account_id_symbol_date",
+            "account_id",
+            "symbol",
+            "date",
+            "sequence",
+        ),
+        # Dispositions per account and tax year
+        Index("ix_acb_checkpoints_account_id_date", "account_id", "date"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    account_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("accounts.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    symbol = Column(String, nullable=False)
+    transaction_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("transactions.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+    date = Column(Date, nullable=False)
+    sequence = Column(Integer, nullable=False)
+
+    # Running state after this transaction
+    quantity = Column(Float, nullable=False)
+    acb = Column(Float, nullable=False)
+
+    # Disposition, for sells only (zero for buys)
+    sold_quantity = Column(Float, nullable=False, server_default="0")
+    proceeds = Column(Float, nullable=False, server_default="0")
+    cost = Column(Float, nullable=False, server_default="0")
+    gain = Column(Float, nullable=False, server_default="0")
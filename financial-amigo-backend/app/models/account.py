@@ -52,7 +52,10 @@ class Account(Base):
 
     # Relationships
     user_id = Column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
     user = relationship("User", back_populates="accounts")
     transactions = relationship(
@@ -5,6 +5,12 @@ This avoids circular import issues.
 
 from app.db.base_class import Base
 from app.models.account import Account
+from app.models.acb_checkpoint import AcbCheckpoint
+from app.models.cash_flow import CashFlowDay
+from app.models.fx_rate import FxRate, FxRateCoverage
+from app.models.oauth_state import OAuthState
+from app.models.position import Position
+from app.models.price_history import PriceHistory, PriceHistoryCoverage
 from app.models.transaction import Transaction
 from app.models.user import User
 
@@ -14,4 +20,12 @@ __all__ = [
     "User",
     "Account",
     "Transaction",
+    "Position",
+    "PriceHistory",
+    "PriceHistoryCoverage",
+    "OAuthState",
+    "FxRate",
+    "FxRateCoverage",
+    "AcbCheckpoint",
+    "CashFlowDay",
 ]
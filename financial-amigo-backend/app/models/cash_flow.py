@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class CashFlowDay(Base):
+    """Running totals of one (account, symbol) group through a day.
+
+    A row exists for each day the group has transactions; totals on any
+    other day are those of the latest row on or before it. Amounts are in
+    the symbol's own currency.
+    """
+
+    __tablename__ = "cash_flow_days"
+
+    account_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("accounts.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    symbol = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+
+    quantity = Column(Float, nullable=False, server_default="0")
+    # Buy costs including commission
+    contributions = Column(Float, nullable=False, server_default="0")
+    # Sale proceeds net of commission
+    withdrawals = Column(Float, nullable=False, server_default="0")
+    dividends = Column(Float, nullable=False, server_default="0")
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Date, DateTime, Float, String, text
+
+from app.core.database import Base
+
+
+class FxRate(Base):
+    """Daily exchange rate: units of the quote currency per unit of the base.
+
+    `pair` is the base and quote codes concatenated, e.g. "USDCAD".
+    """
+
+    __tablename__ = "fx_rates"
+
+    # Composite primary key doubles as the (pair, date) range-scan index
+    pair = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    rate = Column(Float, nullable=False)
+
+
+class FxRateCoverage(Base):
+    """Date range already fetched for a pair, so backfills only ask for gaps."""
+
+    __tablename__ = "fx_rate_coverage"
+
+    pair = Column(String, primary_key=True)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    # When the days after `end_date` whose rate is not final were last fetched
+    open_fetched_at = Column(DateTime(timezone=True), nullable=True)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("now()"),
+        onupdate=text("now()"),
+    )
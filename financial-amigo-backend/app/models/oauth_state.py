@@ -0,0 +1,23 @@
+from sqlalchemy import Column, DateTime, String, text
+
+from app.core.database import Base
+
+
+class OAuthState(Base):
+    """Pending Google sign-in, keyed by the OAuth `state` parameter.
+
+    Stored server-side so the callback can be handled by any worker; each
+    row is consumed by exactly one callback.
+    """
+
+    __tablename__ = "oauth_states"
+
+    state = Column(String, primary_key=True)
+    code_verifier = Column(String, nullable=False)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+        server_default=text("now()"),
+    )
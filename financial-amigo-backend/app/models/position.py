@@ -0,0 +1,63 @@
+from uuid import uuid4
+
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    String,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+from app.models.account import Currency
+
+
+class Position(Base):
+    """Materialized holding per account and symbol, kept in step with transactions."""
+
+    __tablename__ = "positions"
+    __table_args__ = (
+        UniqueConstraint("account_id", "symbol", name="uq_positions_account_symbol"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    account_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("accounts.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    symbol = Column(String, nullable=False)
+    currency = Column(
+        Enum(Currency, name="currency", create_constraint=True, native_enum=True),
+        nullable=False,
+        server_default=Currency.CAD.value,
+    )
+
+    quantity = Column(Float, nullable=False, server_default="0")
+    cost_basis = Column(Float, nullable=False, server_default="0")
+    realized_pl = Column(Float, nullable=False, server_default="0")
+    dividends = Column(Float, nullable=False, server_default="0")
+
+    # Date of the latest transaction folded into this snapshot; writes dated
+    # on or after it can be applied incrementally
+    last_transaction_date = Column(Date, nullable=False)
+
+    # Earliest date whose ACB checkpoints are out of date, if any; they are
+    # replayed from here the next time realized gains are read
+    acb_stale_from = Column(Date, nullable=True)
+
+    # Audit fields
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=text("now()")
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("now()"),
+        onupdate=text("now()"),
+    )
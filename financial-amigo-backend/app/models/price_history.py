@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Date, DateTime, Float, String, text
+
+from app.core.database import Base
+
+
+class PriceHistory(Base):
+    """Daily closing price of a symbol, in the symbol's trading currency."""
+
+    __tablename__ = "price_history"
+
+    # Composite primary key doubles as the (symbol, date) range-scan index
+    symbol = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    close = Column(Float, nullable=False)
+
+
+class PriceHistoryCoverage(Base):
+    """Date range already fetched for a symbol, so backfills only ask for gaps.
+
+    Non-trading days inside the range simply have no `price_history` rows.
+    """
+
+    __tablename__ = "price_history_coverage"
+
+    symbol = Column(String, primary_key=True)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    # When the days after `end_date` that are still trading were last fetched
+    open_fetched_at = Column(DateTime(timezone=True), nullable=True)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("now()"),
+        onupdate=text("now()"),
+    )
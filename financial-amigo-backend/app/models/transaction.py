@@ -1,7 +1,17 @@
 from enum import Enum as PyEnum
 from uuid import uuid4
 
-from sqlalchemy import Column, Date, DateTime, Enum, Float, ForeignKey, String, text
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    String,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
@@ -16,8 +26,36 @@ class TransactionType(str, PyEnum):
     DIVIDEND = "DIVIDEND"
 
 
+def calculate_total_native(
+    type: TransactionType,
+    quantity: float,
+    price_native: float,
+    commission_native: float,
+) -> float:
+    """Total in security's currency including commission."""
+    base_amount = (
+        price_native if type == TransactionType.DIVIDEND else quantity * price_native
+    )
+    return base_amount - commission_native
+
+
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Account-scoped listing, newest first (matches keyset pagination order)
+        Index("ix_transactions_account_id_date", "account_id", "date", "id"),
+        # Per-symbol lookups within an account (holdings, cost basis)
+        Index("ix_transactions_account_id_symbol", "account_id", "symbol"),
+        # Index-only max(updated_at)/count fingerprint for list ETags
+        Index("ix_transactions_account_id_updated_at", "account_id", "updated_at"),
+        # Dividend summaries only ever read dividend rows
+        Index(
+            "ix_transactions_dividends_account_id_date",
+            "account_id",
+            "date",
+            postgresql_where=text("type = 'DIVIDEND'"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     date = Column(Date, nullable=False)
@@ -66,12 +104,9 @@ class Transaction(Base):
     @hybrid_property
     def calculated_total_native(self) -> float:
         """Calculate total in security's currency including commission."""
-        base_amount = (
-            self.price_native
-            if self.type == TransactionType.DIVIDEND
-            else self.quantity * self.price_native
+        return calculate_total_native(
+            self.type, self.quantity, self.price_native, self.commission_native
         )
-        return base_amount - self.commission_native
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
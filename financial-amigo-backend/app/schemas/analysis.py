@@ -0,0 +1,23 @@
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+
+class AnalysisResponse(BaseModel):
+    """Cash flows and change in value over a date range"""
+
+    currency: str = Field(..., description="Currency the amounts are expressed in")
+    start: date
+    end: date
+    contributions: float = Field(..., description="Purchases including commissions")
+    withdrawals: float = Field(..., description="Sale proceeds net of commissions")
+    dividends: float
+    start_value: float = Field(
+        ..., description="Market value at the close before start"
+    )
+    end_value: float = Field(..., description="Market value at the close of end")
+    value_change: float = Field(..., description="end_value minus start_value")
+    investment_gain: float = Field(
+        ...,
+        description="Value change net of contributions, plus withdrawals and dividends",
+    )
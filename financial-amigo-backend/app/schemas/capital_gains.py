@@ -0,0 +1,28 @@
+from datetime import date
+from typing import List
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class Disposition(BaseModel):
+    """One sale and the capital gain it realized, in CAD"""
+
+    date: date
+    symbol: str
+    quantity: float
+    proceeds: float = Field(..., description="Proceeds net of commission")
+    cost: float = Field(..., description="Adjusted cost base of the units sold")
+    gain: float = Field(..., description="Capital gain, negative for a loss")
+
+
+class RealizedGainsResponse(BaseModel):
+    """Capital gains realized in a non-registered account over one tax year"""
+
+    account_id: UUID
+    year: int
+    currency: str = Field(..., description="Currency the amounts are expressed in")
+    proceeds: float
+    cost: float
+    gain: float
+    dispositions: List[Disposition]
@@ -0,0 +1,40 @@
+from datetime import date
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class DividendMonth(BaseModel):
+    """Dividends from one symbol in one month"""
+
+    symbol: str
+    month: date = Field(..., description="First day of the month")
+    amount: float
+    payments: int = Field(..., description="Number of dividend transactions")
+
+
+class SymbolDividends(BaseModel):
+    symbol: str
+    amount: float
+    payments: int
+
+
+class MonthlyDividends(BaseModel):
+    month: date = Field(..., description="First day of the month")
+    amount: float
+
+
+class YearlyDividends(BaseModel):
+    year: int
+    amount: float
+
+
+class DividendSummaryResponse(BaseModel):
+    """Dividend history and totals, converted to the user's currency"""
+
+    currency: str = Field(..., description="Currency the amounts are expressed in")
+    total: float
+    history: List[DividendMonth]
+    by_symbol: List[SymbolDividends]
+    by_month: List[MonthlyDividends]
+    by_year: List[YearlyDividends]
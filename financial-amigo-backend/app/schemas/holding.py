@@ -0,0 +1,26 @@
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class HoldingResponse(BaseModel):
+    """Position in one symbol within one account, derived from transactions."""
+
+    account_id: UUID
+    symbol: str
+    currency: str
+    quantity: float = Field(..., description="Quantity currently held")
+    average_cost: float = Field(
+        ..., description="Average cost per unit, including commissions"
+    )
+    cost_basis: float = Field(..., description="Book cost of the quantity held")
+    realized_pl: float = Field(..., description="Realized profit/loss from sales")
+    dividends: float = Field(..., description="Total dividends received")
+    fx_rate: Optional[float] = Field(
+        None,
+        description="Today's rate from `currency` into the user's default currency",
+    )
+    cost_basis_converted: Optional[float] = Field(
+        None, description="Book cost in the user's default currency"
+    )
@@ -0,0 +1,11 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class PricesResponse(BaseModel):
+    """Latest prices keyed by symbol"""
+
+    prices: Dict[str, Optional[float]] = Field(
+        ..., description="Latest price per symbol, null if unavailable"
+    )
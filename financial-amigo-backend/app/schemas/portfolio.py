@@ -0,0 +1,55 @@
+from datetime import date
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class PortfolioHistoryResponse(BaseModel):
+    """Daily portfolio value series"""
+
+    currency: str = Field(..., description="Currency the values are expressed in")
+    dates: List[date] = Field(..., description="Every calendar day in the range")
+    values: List[float] = Field(..., description="Portfolio value on each date")
+
+
+class AccountReturns(BaseModel):
+    account_id: UUID
+    twr: Optional[float] = Field(
+        None, description="Time-weighted return over the period, as a fraction"
+    )
+    mwr: Optional[float] = Field(
+        None, description="Annualized money-weighted return (XIRR), as a fraction"
+    )
+
+
+class PortfolioReturnsResponse(BaseModel):
+    """Time- and money-weighted returns of the portfolio and each account"""
+
+    currency: str = Field(..., description="Currency the returns are measured in")
+    start: Optional[date] = None
+    end: Optional[date] = None
+    twr: Optional[float] = Field(
+        None, description="Time-weighted return over the period, as a fraction"
+    )
+    mwr: Optional[float] = Field(
+        None, description="Annualized money-weighted return (XIRR), as a fraction"
+    )
+    dates: List[date] = Field(..., description="Every calendar day in the range")
+    cumulative_twr: List[float] = Field(
+        ..., description="Portfolio time-weighted return up to each date"
+    )
+    accounts: List[AccountReturns]
+
+
+class BenchmarkResponse(BaseModel):
+    """Portfolio value next to a benchmark bought with the same cash flows"""
+
+    symbol: str = Field(..., description="Benchmark symbol, e.g. ^GSPC")
+    currency: str = Field(..., description="Currency the values are expressed in")
+    dates: List[date] = Field(..., description="Every calendar day in the range")
+    portfolio: List[float] = Field(..., description="Portfolio value on each date")
+    benchmark: List[float] = Field(
+        ...,
+        description="Value had every purchase and sale traded the benchmark instead",
+    )
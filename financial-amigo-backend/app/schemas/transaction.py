@@ -1,5 +1,5 @@
-from datetime import date
-from typing import Optional
+import datetime
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -10,7 +10,7 @@ from app.models.transaction import TransactionType
 class TransactionBase(BaseModel):
     """Base schema for transaction data."""
 
-    date: date
+    date: datetime.date
     symbol: str
     quantity: float = Field(0, ge=0)
     price_native: float = Field(..., gt=0)
@@ -29,7 +29,7 @@ class TransactionCreate(TransactionBase):
 class TransactionUpdate(BaseModel):
     """Schema for updating an existing transaction."""
 
-    date: Optional[date] = None
+    date: Optional[datetime.date] = None
     symbol: Optional[str] = None
     quantity: Optional[float] = Field(None, ge=0)
     price_native: Optional[float] = Field(None, gt=0)
@@ -39,8 +39,8 @@ class TransactionUpdate(BaseModel):
     description: Optional[str] = None
 
 
-class Transaction(TransactionBase):
-    """Schema for a transaction."""
+class TransactionResponse(TransactionBase):
+    """Schema for a transaction returned by the API."""
 
     id: UUID
     account_id: UUID
@@ -50,3 +50,18 @@ class Transaction(TransactionBase):
         """Pydantic config."""
 
         from_attributes = True
+
+
+class TransactionPage(BaseModel):
+    """A page of transactions plus the cursor for the next page."""
+
+    items: List[TransactionResponse]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to fetch the next page"
+    )
+
+
+class TransactionImportResult(BaseModel):
+    """Outcome of a bulk transaction import."""
+
+    imported: int = Field(..., description="Number of transactions inserted")
@@ -0,0 +1,48 @@
+"""
+Recompute every position snapshot from the transactions table.
+
+Usage:
+    python -m app.scripts.rebuild_positions [--dry-run]
+
+Prints each (account, symbol) snapshot that disagreed with the recomputed
+value and exits with status 1 if any did. Without --dry-run the stored
+snapshots are replaced with the recomputed ones.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.core.database import SessionLocal
+from app.services.positions import rebuild_all_positions
+
+logger = logging.getLogger(__name__)
+
+
+async def main(dry_run: bool) -> int:
+    async with SessionLocal() as db:
+        mismatches = await rebuild_all_positions(db, dry_run=dry_run)
+        if not dry_run:
+            await db.commit()
+
+    for (account_id, symbol), fields in mismatches:
+        logger.warning(f"Position {account_id}/{symbol} differs: {', '.join(fields)}")
+    logger.info(
+        f"{len(mismatches)} mismatched snapshot(s)"
+        + (" (dry run, nothing written)" if dry_run else ", rebuilt")
+    )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only compare snapshots, do not write the recomputed values",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(asyncio.run(main(args.dry_run)))
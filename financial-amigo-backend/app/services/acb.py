@@ -0,0 +1,189 @@
+"""
+Adjusted cost base (ACB) and capital gains for non-registered accounts.
+
+Canadian tax rules pool every share of a security held in an account at one
+average cost, tracked in CAD at the exchange rate of each trade's date. A
+buy adds its cost including commission to the pool; a sell removes
+quantity at the average cost and realizes proceeds net of commission minus
+that cost. Superficial losses and other adjustments are not modelled.
+
+The running state after each buy or sell is stored as an `AcbCheckpoint`.
+Transaction writes only mark the earliest date they affect on the
+position (`Position.acb_stale_from`), so a write stays cheap however long
+the history is. Before gains are read, each stale group is replayed from
+the last checkpoint before that date, touching only the trades after it.
+"""
+
+import logging
+from datetime import date
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.acb_checkpoint import AcbCheckpoint
+from app.models.account import Currency
+from app.models.position import Position
+from app.models.transaction import Transaction, TransactionType
+from app.services.fx import FxProvider, conversion_rates
+from app.services.holdings import EPSILON
+
+logger = logging.getLogger(__name__)
+
+
+async def last_checkpoint(
+    db: AsyncSession, account_id: UUID, symbol: str, before: date
+) -> Optional[AcbCheckpoint]:
+    """Latest checkpoint of a group dated strictly before `before`."""
+    result = await db.execute(
+        select(AcbCheckpoint)
+        .where(
+            AcbCheckpoint.account_id == account_id,
+            AcbCheckpoint.symbol == symbol,
+            AcbCheckpoint.date < before,
+        )
+        .order_by(AcbCheckpoint.date.desc(), AcbCheckpoint.sequence.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def replay(
+    db: AsyncSession,
+    fx_provider: FxProvider,
+    account_id: UUID,
+    symbol: str,
+    since: date,
+) -> int:
+    """Rebuild a group's checkpoints dated on or after `since`.
+
+    Returns the number of checkpoints written.
+    """
+    start = await last_checkpoint(db, account_id, symbol, since)
+    quantity = start.quantity if start else 0.0
+    acb = start.acb if start else 0.0
+    sequence = start.sequence if start else 0
+
+    result = await db.execute(
+        select(
+            Transaction.id,
+            Transaction.type,
+            Transaction.date,
+            Transaction.currency,
+            Transaction.quantity,
+            Transaction.price_native,
+            Transaction.commission_native,
+            Transaction.total_native,
+        )
+        .where(
+            Transaction.account_id == account_id,
+            Transaction.symbol == symbol,
+            Transaction.date >= since,
+            Transaction.type.in_([TransactionType.BUY, TransactionType.SELL]),
+        )
+        .order_by(Transaction.date, Transaction.created_at, Transaction.id)
+    )
+    rows = result.all()
+
+    # Checkpoints of a transaction since moved here from another group are
+    # dropped along with this group's own
+    conditions = [
+        (AcbCheckpoint.account_id == account_id)
+        & (AcbCheckpoint.symbol == symbol)
+        & (AcbCheckpoint.date >= since)
+    ]
+    if rows:
+        conditions.append(AcbCheckpoint.transaction_id.in_([row.id for row in rows]))
+    await db.execute(delete(AcbCheckpoint).where(or_(*conditions)))
+    if not rows:
+        return 0
+
+    rates = await conversion_rates(
+        db,
+        fx_provider,
+        [row.currency for row in rows],
+        [row.date for row in rows],
+        Currency.CAD,
+    )
+
+    checkpoints: List[dict] = []
+    for row, rate in zip(rows, rates.tolist()):
+        sold = proceeds = cost = 0.0
+        if row.type == TransactionType.BUY:
+            quantity += row.quantity
+            acb += (row.quantity * row.price_native + row.commission_native) * rate
+        else:
+            sold = row.quantity
+            cost = acb * row.quantity / quantity if quantity > EPSILON else 0.0
+            proceeds = row.total_native * rate
+            quantity -= row.quantity
+            acb -= cost
+            if abs(quantity) < EPSILON:
+                quantity = 0.0
+            if quantity <= EPSILON:
+                acb = 0.0
+
+        sequence += 1
+        checkpoints.append(
+            {
+                "account_id": account_id,
+                "symbol": symbol,
+                "transaction_id": row.id,
+                "date": row.date,
+                "sequence": sequence,
+                "quantity": quantity,
+                "acb": acb,
+                "sold_quantity": sold,
+                "proceeds": proceeds,
+                "cost": cost,
+                "gain": proceeds - cost,
+            }
+        )
+
+    await db.execute(insert(AcbCheckpoint), checkpoints)
+    return len(checkpoints)
+
+
+async def refresh_acb(
+    db: AsyncSession, fx_provider: FxProvider, account_id: UUID
+) -> None:
+    """Replay every group of an account with stale checkpoints.
+
+    Raises FxRateError if a trade's exchange rate cannot be loaded. The
+    stale positions stay locked until the caller commits, so concurrent
+    reads do not replay the same groups twice.
+    """
+    result = await db.execute(
+        select(Position)
+        .where(Position.account_id == account_id, Position.acb_stale_from.is_not(None))
+        .with_for_update()
+    )
+    for position in result.scalars().all():
+        written = await replay(
+            db, fx_provider, account_id, position.symbol, position.acb_stale_from
+        )
+        logger.info(
+            f"Replayed {written} ACB checkpoints for {position.symbol} "
+            f"from {position.acb_stale_from}"
+        )
+        position.acb_stale_from = None
+
+    await db.flush()
+
+
+async def get_dispositions(
+    db: AsyncSession, account_id: UUID, start: date, end: date
+) -> List[AcbCheckpoint]:
+    """Sell checkpoints of an account dated within [start, end]."""
+    result = await db.execute(
+        select(AcbCheckpoint)
+        .where(
+            AcbCheckpoint.account_id == account_id,
+            AcbCheckpoint.date >= start,
+            AcbCheckpoint.date <= end,
+            AcbCheckpoint.sold_quantity > 0,
+        )
+        .order_by(AcbCheckpoint.date, AcbCheckpoint.sequence)
+    )
+    return list(result.scalars().all())
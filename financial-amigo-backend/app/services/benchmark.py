@@ -0,0 +1,108 @@
+"""
+Benchmark comparison: what the portfolio would be worth in an index.
+
+The portfolio's own cash flows are replayed against the benchmark: the
+opening value and every day's net purchases buy units of the index at that
+day's close, and every net sale sells units. The units held are a
+cumulative sum over the day axis and the benchmark value is units times
+close, so the whole series is a few array operations over closes already in
+the price store.
+"""
+
+from datetime import date, timedelta
+from typing import Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.account import Currency
+from app.schemas.portfolio import BenchmarkResponse
+from app.services.fx import FxProvider, rate_matrix
+from app.services.market_data import PriceProvider, backfill, get_close_matrix
+from app.services.portfolio import get_period_history
+
+# Quote currency of well-known indices; other symbols are assumed to trade in
+# USD unless they carry a Canadian exchange suffix
+BENCHMARK_CURRENCIES = {
+    "^GSPC": Currency.USD,
+    "^DJI": Currency.USD,
+    "^IXIC": Currency.USD,
+    "^GSPTSE": Currency.CAD,
+}
+CANADIAN_SUFFIXES = (".TO", ".V", ".NE", ".CN")
+
+
+class UnknownBenchmarkError(Exception):
+    """The benchmark symbol has no price history."""
+
+
+def benchmark_currency(symbol: str) -> Currency:
+    symbol = symbol.upper()
+    if symbol in BENCHMARK_CURRENCIES:
+        return BENCHMARK_CURRENCIES[symbol]
+    if symbol.endswith(CANADIAN_SUFFIXES):
+        return Currency.CAD
+    return Currency.USD
+
+
+def simulate_benchmark(
+    opening: float, flows: np.ndarray, prices: np.ndarray
+) -> np.ndarray:
+    """Value of an index position fed the same cash flows as the portfolio.
+
+    `prices` has one entry per day starting the day before the first flow,
+    when `opening` is invested.
+    """
+    units = np.cumsum(np.concatenate([[opening], flows]) / prices)
+    return (units * prices)[1:]
+
+
+async def get_benchmark_comparison(
+    db: AsyncSession,
+    provider: PriceProvider,
+    fx_provider: FxProvider,
+    user_id: UUID,
+    target: Currency,
+    symbol: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> BenchmarkResponse:
+    """Daily portfolio value next to the benchmark fed the same cash flows.
+
+    Raises UnknownBenchmarkError if the symbol has no prices, or ValueError
+    if a rate is missing; prices and rates fetched on the way are left for
+    the caller to commit.
+    """
+    symbol = symbol.upper()
+    opening, history = await get_period_history(
+        db, provider, fx_provider, user_id, target, start, end
+    )
+    if not len(history.dates):
+        return BenchmarkResponse(
+            symbol=symbol, currency=target.value, dates=[], portfolio=[], benchmark=[]
+        )
+
+    first, last = history.dates[0].item() - timedelta(days=1), history.dates[-1].item()
+    await backfill(db, provider, [symbol], first, last)
+    _, closes = await get_close_matrix(db, [symbol], first, last)
+    rates = await rate_matrix(
+        db, fx_provider, [benchmark_currency(symbol)], target, first, last
+    )
+    prices = (closes * rates)[:, 0]
+
+    known = np.flatnonzero(~np.isnan(prices))
+    if not len(known):
+        raise UnknownBenchmarkError(f"No price history for {symbol}")
+    # Flows before the first close buy in at that close
+    prices[: known[0]] = prices[known[0]]
+
+    return BenchmarkResponse(
+        symbol=symbol,
+        currency=target.value,
+        dates=history.dates.tolist(),
+        portfolio=history.values.sum(axis=1).tolist(),
+        benchmark=simulate_benchmark(
+            opening.sum(), history.flows.sum(axis=1), prices
+        ).tolist(),
+    )
@@ -0,0 +1,322 @@
+"""
+Prefix-sum index of cash flows for date-range analysis.
+
+`cash_flow_days` holds, per (account, symbol), the running quantity,
+contributions, withdrawals and dividends through every day with activity.
+The totals over any range are the difference of two rows: the latest on or
+before the end, and the latest before the start. Both are primary key
+lookups, so a range costs the same whatever the length of the history.
+
+The index is maintained by `app.services.positions` in the same database
+transaction as the snapshots: an appended transaction updates one row,
+while anything that rewrites history replays the group from the earliest
+date it touched. Callers hold the group's snapshot lock, and the row an
+append builds on is locked too.
+"""
+
+from datetime import date, timedelta
+from typing import Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import and_, case, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.account import Account, Currency
+from app.models.cash_flow import CashFlowDay
+from app.models.position import Position
+from app.models.transaction import Transaction, TransactionType
+from app.schemas.analysis import AnalysisResponse
+from app.services.fx import FxProvider, conversion_rates
+from app.services.market_data import PriceProvider, backfill, get_close_matrix
+
+TOTAL_FIELDS = ("quantity", "contributions", "withdrawals", "dividends")
+
+# Each transaction's contribution to the totals, as SQL expressions
+DELTA_COLUMNS = (
+    case(
+        (Transaction.type == TransactionType.BUY, Transaction.quantity),
+        (Transaction.type == TransactionType.SELL, -Transaction.quantity),
+        else_=0.0,
+    ),
+    case(
+        (
+            Transaction.type == TransactionType.BUY,
+            Transaction.quantity * Transaction.price_native
+            + Transaction.commission_native,
+        ),
+        else_=0.0,
+    ),
+    case(
+        (Transaction.type == TransactionType.SELL, Transaction.total_native),
+        else_=0.0,
+    ),
+    case(
+        (Transaction.type == TransactionType.DIVIDEND, Transaction.total_native),
+        else_=0.0,
+    ),
+)
+
+# Days before a date searched for the last close, to cover weekends and holidays
+PRICE_LOOKBACK_DAYS = 7
+
+
+def transaction_deltas(transaction: Transaction) -> dict:
+    """Change one transaction makes to the running totals."""
+    deltas = dict.fromkeys(TOTAL_FIELDS, 0.0)
+    if transaction.type == TransactionType.BUY:
+        deltas["quantity"] = transaction.quantity
+        deltas["contributions"] = (
+            transaction.quantity * transaction.price_native
+            + transaction.commission_native
+        )
+    elif transaction.type == TransactionType.SELL:
+        deltas["quantity"] = -transaction.quantity
+        deltas["withdrawals"] = transaction.total_native
+    else:
+        deltas["dividends"] = transaction.total_native
+    return deltas
+
+
+async def latest_totals(
+    db: AsyncSession, account_id: UUID, symbol: str, before: date
+) -> Optional[CashFlowDay]:
+    """Row holding a group's totals through the day before `before`, locked."""
+    result = await db.execute(
+        select(CashFlowDay)
+        .where(
+            CashFlowDay.account_id == account_id,
+            CashFlowDay.symbol == symbol,
+            CashFlowDay.date < before,
+        )
+        .order_by(CashFlowDay.date.desc())
+        .limit(1)
+        .with_for_update()
+    )
+    return result.scalars().first()
+
+
+async def append_cash_flow(db: AsyncSession, transaction: Transaction) -> None:
+    """Fold in a transaction dated on or after every other in its group."""
+    base = await latest_totals(
+        db, transaction.account_id, transaction.symbol, transaction.date
+    )
+    deltas = transaction_deltas(transaction)
+    row = {
+        field: (getattr(base, field) if base else 0.0) + deltas[field]
+        for field in TOTAL_FIELDS
+    }
+
+    # A row already on this date is topped up instead, atomically, so an
+    # insert racing this one cannot be lost
+    statement = insert(CashFlowDay).values(
+        account_id=transaction.account_id,
+        symbol=transaction.symbol,
+        date=transaction.date,
+        **row,
+    )
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[
+                CashFlowDay.account_id,
+                CashFlowDay.symbol,
+                CashFlowDay.date,
+            ],
+            set_={
+                field: getattr(CashFlowDay, field) + deltas[field]
+                for field in TOTAL_FIELDS
+            },
+        )
+    )
+
+
+async def rebuild_cash_flows(
+    db: AsyncSession, account_id: UUID, symbol: str, since: date
+) -> None:
+    """Recompute a group's rows dated on or after `since` from its transactions."""
+    await db.execute(
+        delete(CashFlowDay).where(
+            CashFlowDay.account_id == account_id,
+            CashFlowDay.symbol == symbol,
+            CashFlowDay.date >= since,
+        )
+    )
+
+    result = await db.execute(
+        select(Transaction.date, *(func.sum(column) for column in DELTA_COLUMNS))
+        .where(
+            Transaction.account_id == account_id,
+            Transaction.symbol == symbol,
+            Transaction.date >= since,
+        )
+        .group_by(Transaction.date)
+        .order_by(Transaction.date)
+    )
+    rows = result.all()
+    if not rows:
+        return
+
+    days, *daily = zip(*rows)
+    base = await latest_totals(db, account_id, symbol, since)
+    totals = {
+        field: np.cumsum(np.array(values, dtype=float))
+        + (getattr(base, field) if base else 0.0)
+        for field, values in zip(TOTAL_FIELDS, daily)
+    }
+    await db.execute(
+        insert(CashFlowDay),
+        [
+            {
+                "account_id": account_id,
+                "symbol": symbol,
+                "date": day,
+                **{field: float(totals[field][i]) for field in TOTAL_FIELDS},
+            }
+            for i, day in enumerate(days)
+        ],
+    )
+
+
+async def drop_cash_flows(db: AsyncSession, account_id: UUID, symbol: str) -> None:
+    await db.execute(
+        delete(CashFlowDay).where(
+            CashFlowDay.account_id == account_id, CashFlowDay.symbol == symbol
+        )
+    )
+
+
+async def value_on(
+    db: AsyncSession,
+    provider: PriceProvider,
+    fx_provider: FxProvider,
+    symbols: np.ndarray,
+    currencies: np.ndarray,
+    quantities: np.ndarray,
+    day: date,
+    target: Currency,
+) -> float:
+    """Market value of the given holdings at the close of `day`."""
+    held = np.abs(quantities) > 0
+    if not held.any():
+        return 0.0
+
+    # The same symbol may be held in several accounts
+    names, columns = np.unique(symbols[held], return_inverse=True)
+    names = names.tolist()
+    await backfill(db, provider, names, day - timedelta(days=PRICE_LOOKBACK_DAYS), day)
+    _, closes = await get_close_matrix(db, names, day, day)
+    rates = await conversion_rates(
+        db, fx_provider, currencies[held], [day] * len(columns), target
+    )
+    # Symbols without a stored close count as 0, as in the portfolio history
+    return float(np.nansum(quantities[held] * closes[0, columns] * rates))
+
+
+async def get_analysis(
+    db: AsyncSession,
+    provider: PriceProvider,
+    fx_provider: FxProvider,
+    user_id: UUID,
+    target: Currency,
+    start: date,
+    end: date,
+    account_id: Optional[UUID] = None,
+) -> AnalysisResponse:
+    """Cash flows and change in value of a user's holdings over [start, end].
+
+    Flows are converted to `target` at the rate on `end`. Raises FxRateError
+    if a rate is missing or cannot be fetched, or PriceHistoryError if
+    prices cannot be fetched; prices and rates fetched on the way are left
+    for the caller to commit.
+    """
+    opening, closing = aliased(CashFlowDay), aliased(CashFlowDay)
+
+    def latest(row, on_or_before: date):
+        # Correlated max(date): one index probe per group
+        inner = aliased(CashFlowDay)
+        latest_date = (
+            select(func.max(inner.date))
+            .where(
+                inner.account_id == Position.account_id,
+                inner.symbol == Position.symbol,
+                inner.date <= on_or_before,
+            )
+            .correlate(Position)
+            .scalar_subquery()
+        )
+        return and_(
+            row.account_id == Position.account_id,
+            row.symbol == Position.symbol,
+            row.date == latest_date,
+        )
+
+    query = (
+        select(
+            Position.symbol,
+            Position.currency,
+            *(getattr(opening, field) for field in TOTAL_FIELDS),
+            *(getattr(closing, field) for field in TOTAL_FIELDS),
+        )
+        .join(Account, Account.id == Position.account_id)
+        .outerjoin(opening, latest(opening, start - timedelta(days=1)))
+        .outerjoin(closing, latest(closing, end))
+        .where(Account.user_id == user_id)
+    )
+    if account_id:
+        query = query.where(Position.account_id == account_id)
+    result = await db.execute(query)
+    rows = result.all()
+
+    response = AnalysisResponse(
+        currency=target.value,
+        start=start,
+        end=end,
+        contributions=0.0,
+        withdrawals=0.0,
+        dividends=0.0,
+        start_value=0.0,
+        end_value=0.0,
+        value_change=0.0,
+        investment_gain=0.0,
+    )
+    if not rows:
+        return response
+
+    symbols = np.array([row[0] for row in rows])
+    currencies = np.array([row[1].value for row in rows])
+    # Groups without a row yet have all-zero totals
+    totals = np.array(
+        [[value or 0.0 for value in row[2:]] for row in rows], dtype=float
+    )
+    n = len(TOTAL_FIELDS)
+    before, through = totals[:, :n], totals[:, n:]
+
+    rates = await conversion_rates(
+        db, fx_provider, currencies, [end] * len(rows), target
+    )
+    flows = ((through - before)[:, 1:] * rates[:, np.newaxis]).sum(axis=0)
+    response.contributions, response.withdrawals, response.dividends = flows.tolist()
+
+    response.start_value = await value_on(
+        db,
+        provider,
+        fx_provider,
+        symbols,
+        currencies,
+        before[:, 0],
+        start - timedelta(days=1),
+        target,
+    )
+    response.end_value = await value_on(
+        db, provider, fx_provider, symbols, currencies, through[:, 0], end, target
+    )
+    response.value_change = response.end_value - response.start_value
+    response.investment_gain = (
+        response.value_change
+        - response.contributions
+        + response.withdrawals
+        + response.dividends
+    )
+    return response
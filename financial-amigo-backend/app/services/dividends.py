@@ -0,0 +1,126 @@
+"""
+Dividend summaries aggregated in the database.
+
+Dividend rows are summed per (symbol, currency, month) in SQL over a partial
+index that only covers dividends, so the response costs one row per symbol
+and month no matter how long the history is. Each group is converted to the
+user's currency at the FX close on its latest payment date (almost always
+the only one that month) and then rolled up per symbol, month and year.
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.account import Account, Currency
+from app.models.transaction import Transaction, TransactionType
+from app.schemas.dividend import (
+    DividendMonth,
+    DividendSummaryResponse,
+    MonthlyDividends,
+    SymbolDividends,
+    YearlyDividends,
+)
+from app.services.fx import FxProvider, convert
+
+
+async def get_dividend_summary(
+    db: AsyncSession,
+    fx_provider: FxProvider,
+    user_id: UUID,
+    target: Currency,
+    account_id: Optional[UUID] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> DividendSummaryResponse:
+    """Dividends received by a user, grouped by symbol and month.
+
+    Exchange rates missing from the FX store are backfilled; the caller
+    commits them. Raises FxRateError if a rate cannot be loaded.
+    """
+    month = cast(func.date_trunc("month", Transaction.date), Date)
+    query = (
+        select(
+            Transaction.symbol,
+            Transaction.currency,
+            month,
+            func.sum(Transaction.total_native),
+            func.count(Transaction.id),
+            func.max(Transaction.date),
+        )
+        .join(Account)
+        .where(
+            Account.user_id == user_id,
+            Transaction.type == TransactionType.DIVIDEND,
+        )
+        .group_by(Transaction.symbol, Transaction.currency, month)
+        .order_by(month, Transaction.symbol)
+    )
+    if account_id:
+        query = query.where(Transaction.account_id == account_id)
+    if start:
+        query = query.where(Transaction.date >= start)
+    if end:
+        query = query.where(Transaction.date <= end)
+
+    rows = (await db.execute(query)).all()
+    if not rows:
+        return DividendSummaryResponse(
+            currency=target.value,
+            total=0.0,
+            history=[],
+            by_symbol=[],
+            by_month=[],
+            by_year=[],
+        )
+
+    symbols, currencies, months, totals, payments, paid_on = zip(*rows)
+    amounts = await convert(db, fx_provider, totals, currencies, paid_on, target)
+
+    # Rows arrive ordered by month and symbol; a (symbol, month) paid in
+    # several currencies spans adjacent rows and is merged here
+    history: Dict[Tuple[str, date], List[float]] = {}
+    for symbol, month_start, amount, count in zip(symbols, months, amounts, payments):
+        merged = history.setdefault((symbol, month_start), [0.0, 0])
+        merged[0] += amount
+        merged[1] += count
+
+    symbol_names, symbol_idx = np.unique(np.array(symbols), return_inverse=True)
+    month_dates = np.array(months, dtype="datetime64[D]")
+    month_keys, month_idx = np.unique(month_dates, return_inverse=True)
+    years = month_dates.astype("datetime64[Y]").astype(int) + 1970
+    year_keys, year_idx = np.unique(years, return_inverse=True)
+
+    symbol_amounts = np.bincount(symbol_idx, weights=amounts)
+    symbol_payments = np.bincount(symbol_idx, weights=payments)
+    month_amounts = np.bincount(month_idx, weights=amounts)
+    year_amounts = np.bincount(year_idx, weights=amounts)
+
+    return DividendSummaryResponse(
+        currency=target.value,
+        total=float(amounts.sum()),
+        history=[
+            DividendMonth(
+                symbol=symbol, month=month_start, amount=amount, payments=count
+            )
+            for (symbol, month_start), (amount, count) in history.items()
+        ],
+        by_symbol=[
+            SymbolDividends(symbol=symbol, amount=float(amount), payments=int(count))
+            for symbol, amount, count in zip(
+                symbol_names.tolist(), symbol_amounts, symbol_payments
+            )
+        ],
+        by_month=[
+            MonthlyDividends(month=month_key, amount=float(amount))
+            for month_key, amount in zip(month_keys.tolist(), month_amounts)
+        ],
+        by_year=[
+            YearlyDividends(year=int(year), amount=float(amount))
+            for year, amount in zip(year_keys.tolist(), year_amounts)
+        ],
+    )
@@ -0,0 +1,38 @@
+from app.services.fx.base import FxProvider, FxRateError, MissingRateError
+from app.services.fx.rates import (
+    RateSeries,
+    backfill_rates,
+    conversion_rates,
+    convert,
+    get_series,
+    pair_for,
+    rate_cache,
+    rate_matrix,
+)
+from app.services.fx.yahoo_provider import YahooFxProvider
+from app.services.market_data import price_provider
+
+# Shared per-process provider used by the API
+fx_provider = YahooFxProvider(price_provider)
+
+
+def get_fx_provider() -> FxProvider:
+    return fx_provider
+
+
+__all__ = [
+    "FxProvider",
+    "FxRateError",
+    "MissingRateError",
+    "RateSeries",
+    "YahooFxProvider",
+    "fx_provider",
+    "get_fx_provider",
+    "backfill_rates",
+    "conversion_rates",
+    "convert",
+    "get_series",
+    "pair_for",
+    "rate_cache",
+    "rate_matrix",
+]
@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import List, Tuple
+
+
+class FxRateError(Exception):
+    """Raised when the exchange rates a conversion needs cannot be loaded."""
+
+
+class MissingRateError(FxRateError, ValueError):
+    """Raised when a date falls before the first known rate of a pair."""
+
+
+class FxProvider(ABC):
+    """Source of historical daily exchange rates."""
+
+    @abstractmethod
+    async def fetch_rates(
+        self, pair: str, start: date, end: date
+    ) -> List[Tuple[date, float]]:
+        """Return daily (date, rate) pairs for a pair such as "USDCAD".
+
+        The rate is units of the quote currency per unit of the base. Days
+        without a fixing (weekends, holidays) are simply absent.
+        """
@@ -0,0 +1,286 @@
+"""
+Daily exchange rates backed by the `fx_rates` table.
+
+Each currency pair is stored in one canonical direction (USD -> CAD) and
+inverted on the fly. A pair's history is loaded into a date-indexed NumPy
+array, forward-filled over weekends and holidays, and kept in memory, so
+converting N amounts on N dates is a single indexing operation with no
+database round trip once warm.
+"""
+
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, FrozenSet, List, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.account import Currency
+from app.models.fx_rate import FxRate, FxRateCoverage
+from app.services.fx.base import FxProvider, FxRateError, MissingRateError
+from app.services.market_data.history import (
+    INSERT_BATCH_SIZE,
+    last_occurrences,
+    missing_ranges,
+)
+
+logger = logging.getLogger(__name__)
+
+# Stored direction for each supported pair; the other way is the reciprocal
+PAIRS: Dict[FrozenSet[Currency], Tuple[Currency, Currency]] = {
+    frozenset({Currency.USD, Currency.CAD}): (Currency.USD, Currency.CAD),
+}
+
+# Rates this far before a range are loaded so its first days can be filled
+LOOKBACK_DAYS = 14
+
+
+def pair_for(source: Currency, target: Currency) -> Tuple[str, bool]:
+    """Stored pair converting `source` into `target` and whether to invert it."""
+    base, quote = PAIRS[frozenset({source, target})]
+    return f"{base.value}{quote.value}", base != source
+
+
+class RateSeries:
+    """Forward-filled daily rates of one pair, one entry per calendar day."""
+
+    def __init__(self, start: date, rates: np.ndarray):
+        self.start = start
+        self.rates = rates
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=len(self.rates) - 1)
+
+    def covers(self, start: date, end: date) -> bool:
+        return self.start <= start and end <= self.end
+
+    def at(self, days: np.ndarray) -> np.ndarray:
+        """Rates on the given datetime64[D] days, NaN before the first fixing."""
+        offsets = (days - np.datetime64(self.start, "D")).astype(int)
+        return self.rates[offsets]
+
+
+# Loaded series per pair; the TTL bounds how stale today's rate can get
+rate_cache: TTLCache[RateSeries] = TTLCache(
+    maxsize=len(PAIRS) * 2, ttl=settings.FX_CACHE_TTL_SECONDS
+)
+
+
+async def store_rates(
+    db: AsyncSession, pair: str, rates: List[Tuple[date, float]]
+) -> None:
+    """Upsert fetched rates; a re-fetched day replaces the earlier value."""
+    rows = [{"pair": pair, "date": day, "rate": rate} for day, rate in rates]
+    for offset in range(0, len(rows), INSERT_BATCH_SIZE):
+        statement = insert(FxRate).values(rows[offset : offset + INSERT_BATCH_SIZE])
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[FxRate.pair, FxRate.date],
+                set_={"rate": statement.excluded.rate},
+            )
+        )
+
+
+async def record_coverage(
+    db: AsyncSession, pair: str, start: date, end: date, fetched_open: bool
+) -> None:
+    """Widen a pair's coverage to include [start, end].
+
+    Upserted so concurrent backfills only ever grow the range.
+    """
+    statement = insert(FxRateCoverage).values(
+        pair=pair,
+        start_date=start,
+        end_date=end,
+        open_fetched_at=func.now() if fetched_open else None,
+    )
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[FxRateCoverage.pair],
+            set_={
+                "start_date": func.least(
+                    FxRateCoverage.start_date, statement.excluded.start_date
+                ),
+                "end_date": func.greatest(
+                    FxRateCoverage.end_date, statement.excluded.end_date
+                ),
+                "open_fetched_at": func.coalesce(
+                    statement.excluded.open_fetched_at,
+                    FxRateCoverage.open_fetched_at,
+                ),
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+async def backfill_rates(
+    db: AsyncSession, provider: FxProvider, pair: str, start: date, end: date
+) -> None:
+    """Make sure rates for a pair over [start, end] are stored.
+
+    Only dates outside the recorded coverage are fetched. Today is never
+    marked as covered because its rate is not final yet; instead the time
+    it was fetched is recorded, and it is not asked for again within
+    FX_CACHE_TTL_SECONDS. Raises FxRateError if the provider fails.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.FX_CACHE_TTL_SECONDS
+    )
+    result = await db.execute(
+        select(FxRateCoverage, FxRateCoverage.open_fetched_at >= cutoff).where(
+            FxRateCoverage.pair == pair
+        )
+    )
+    coverage, open_fresh = result.first() or (None, False)
+    settled = date.today() - timedelta(days=1)
+
+    for gap_start, gap_end in missing_ranges(start, end, coverage):
+        if gap_start > settled and open_fresh:
+            continue
+        try:
+            rates = await provider.fetch_rates(pair, gap_start, gap_end)
+        except Exception as e:
+            raise FxRateError(f"Failed to fetch {pair} rates: {str(e)}") from e
+        await store_rates(db, pair, rates)
+        logger.info(f"Backfilled {len(rates)} {pair} rates over {gap_start}..{gap_end}")
+
+        covered_end = min(gap_end, settled)
+        fetched_open = gap_end > settled
+        if covered_end >= gap_start:
+            await record_coverage(db, pair, gap_start, covered_end, fetched_open)
+        elif fetched_open:
+            # A pair without settled coverage has nowhere to keep the time
+            await db.execute(
+                update(FxRateCoverage)
+                .where(FxRateCoverage.pair == pair)
+                .values(open_fetched_at=func.now())
+            )
+
+
+async def load_series(
+    db: AsyncSession, pair: str, start: date, end: date
+) -> RateSeries:
+    """Stored rates for [start, end] as a forward-filled daily array."""
+    result = await db.execute(
+        select(FxRate.date, FxRate.rate)
+        .where(
+            FxRate.pair == pair,
+            FxRate.date >= start - timedelta(days=LOOKBACK_DAYS),
+            FxRate.date <= end,
+        )
+        .order_by(FxRate.date)
+    )
+    rows = result.all()
+    rates = np.full((end - start).days + 1, np.nan)
+    if rows:
+        days, values = zip(*rows)
+        offsets = np.array(days, dtype="datetime64[D]") - np.datetime64(start, "D")
+        offsets = np.maximum(offsets.astype(int), 0)
+        # Rows are sorted, so the latest lookback rate is the one kept for day 0
+        last = last_occurrences(offsets)
+        rates[offsets[last]] = np.array(values, dtype=float)[last]
+
+        filled = np.where(~np.isnan(rates), np.arange(len(rates)), 0)
+        np.maximum.accumulate(filled, out=filled)
+        rates = rates[filled]
+    return RateSeries(start, rates)
+
+
+async def get_series(
+    db: AsyncSession, provider: FxProvider, pair: str, start: date, end: date
+) -> RateSeries:
+    """Rates for a pair covering at least [start, end], from memory if possible."""
+    cached = rate_cache.get(pair)
+    if cached is not None:
+        if cached.covers(start, end):
+            return cached
+        # Grow the cached window rather than replacing it
+        start, end = min(start, cached.start), max(end, cached.end)
+
+    # Fetch the lookback too, so a range starting on a weekend has a rate
+    await backfill_rates(db, provider, pair, start - timedelta(days=LOOKBACK_DAYS), end)
+    series = await load_series(db, pair, start, end)
+    rate_cache.set(pair, series)
+    return series
+
+
+def currency_codes(currencies: Sequence[Union[Currency, str]]) -> np.ndarray:
+    return np.array([Currency(currency).value for currency in currencies])
+
+
+async def conversion_rates(
+    db: AsyncSession,
+    provider: FxProvider,
+    currencies: Sequence[Union[Currency, str]],
+    days: Sequence[date],
+    target: Currency,
+) -> np.ndarray:
+    """Rate converting currencies[i] into `target` on days[i], for every i.
+
+    Raises MissingRateError (a ValueError) if a day falls before the first
+    known rate, or FxRateError if rates cannot be fetched.
+    """
+    codes = currency_codes(currencies)
+    day_dates = np.array(days, dtype="datetime64[D]")
+    rates = np.ones(len(codes))
+    if not len(codes):
+        return rates
+
+    start, end = day_dates.min().item(), day_dates.max().item()
+    for code in set(codes.tolist()) - {target.value}:
+        pair, inverted = pair_for(Currency(code), target)
+        series = await get_series(db, provider, pair, start, end)
+        mask = codes == code
+        quotes = series.at(day_dates[mask])
+        rates[mask] = 1.0 / quotes if inverted else quotes
+
+    if np.isnan(rates).any():
+        raise MissingRateError(f"No exchange rate into {target.value} for some dates")
+    return rates
+
+
+async def convert(
+    db: AsyncSession,
+    provider: FxProvider,
+    amounts: Sequence[float],
+    currencies: Sequence[Union[Currency, str]],
+    days: Sequence[date],
+    target: Currency,
+) -> np.ndarray:
+    """Convert amounts[i] from currencies[i] into `target` at the rate on days[i]."""
+    rates = await conversion_rates(db, provider, currencies, days, target)
+    return np.asarray(amounts, dtype=float) * rates
+
+
+async def rate_matrix(
+    db: AsyncSession,
+    provider: FxProvider,
+    currencies: Sequence[Union[Currency, str]],
+    target: Currency,
+    start: date,
+    end: date,
+) -> np.ndarray:
+    """Per (day, column) rate converting each column's currency into `target`.
+
+    Covers every calendar day in [start, end]; days before the first known
+    rate are NaN.
+    """
+    codes = currency_codes(currencies)
+    columns = {target.value: np.ones((end - start).days + 1)}
+    for code in set(codes.tolist()) - {target.value}:
+        pair, inverted = pair_for(Currency(code), target)
+        series = await get_series(db, provider, pair, start, end)
+        offset = (start - series.start).days
+        quotes = series.rates[offset : offset + (end - start).days + 1]
+        columns[code] = 1.0 / quotes if inverted else quotes
+
+    names = list(columns)
+    table = np.column_stack([columns[name] for name in names])
+    index = {name: i for i, name in enumerate(names)}
+    return table[:, [index[code] for code in codes.tolist()]]
@@ -0,0 +1,19 @@
+from datetime import date
+from typing import List, Tuple
+
+from app.services.fx.base import FxProvider
+from app.services.market_data.base import PriceProvider
+
+
+class YahooFxProvider(FxProvider):
+    """Rates from Yahoo's `<PAIR>=X` quotes, fetched through a price provider."""
+
+    def __init__(self, prices: PriceProvider):
+        self.prices = prices
+
+    async def fetch_rates(
+        self, pair: str, start: date, end: date
+    ) -> List[Tuple[date, float]]:
+        symbol = f"{pair}=X"
+        history = await self.prices.fetch_history([symbol], start, end)
+        return history.get(symbol, [])
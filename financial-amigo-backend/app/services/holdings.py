@@ -0,0 +1,286 @@
+"""
+Holdings engine: derive positions from a user's raw transactions.
+
+Positions use the average cost method. Buys add their cost (including
+commission) to the book cost, sells remove quantity at the running average
+cost and realize the difference, and dividends accumulate separately.
+
+All rows are processed as NumPy arrays in one pass. The book cost follows
+the linear recurrence C[t] = r[t] * C[t-1] + b[t], where r is the fraction of
+the position kept by a sell (1 for anything else) and b is the cost of a
+buy. Within a run of rows where the position never goes flat this solves to
+C = P * cumsum(b / P) with P = cumprod(r), which only needs segmented
+cumulative sums. P only shrinks while a position stays open, so it is
+renormalized in blocks before it can underflow.
+"""
+
+import logging
+from datetime import date
+from typing import List, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.account import Account, Currency
+from app.models.position import Position
+from app.models.transaction import Transaction, TransactionType
+from app.schemas.holding import HoldingResponse
+from app.services.fx import FxProvider, FxRateError, conversion_rates
+
+logger = logging.getLogger(__name__)
+
+# Quantities below this are treated as a flat position
+EPSILON = 1e-9
+
+# The cost scale restarts each time its log falls by this much, so buy costs
+# divided by it grow at most e^20-fold and every sum stays precise
+SCALE_BLOCK = 20.0
+
+
+def segmented_cumsum(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Cumulative sum that restarts wherever `starts` is True.
+
+    The first row must be a start. Each segment's total is taken off at the
+    next start, so a large segment cannot swamp the ones after it.
+    """
+    start_idx = np.flatnonzero(starts)
+    lengths = np.diff(np.append(start_idx, len(values)))
+    adjusted = np.array(values, dtype=float)
+    adjusted[start_idx[1:]] -= np.add.reduceat(values, start_idx)[:-1]
+    totals = np.cumsum(adjusted)
+    # Clear the rounding left over at each start
+    drift = totals[start_idx] - values[start_idx]
+    return totals - np.repeat(drift, lengths)
+
+
+def compute_positions(
+    group_starts: np.ndarray,
+    types: np.ndarray,
+    quantities: np.ndarray,
+    prices: np.ndarray,
+    commissions: np.ndarray,
+    totals: np.ndarray,
+) -> dict:
+    """Compute per-group positions from transaction rows.
+
+    Rows must be sorted by group and then chronologically; `group_starts`
+    marks the first row of each group. Returns arrays with one entry per
+    group: quantity, cost_basis, average_cost, realized_pl and dividends.
+    """
+    group_idx = np.flatnonzero(group_starts)
+    if len(group_idx) == 0:
+        empty = np.zeros(0)
+        return {
+            "quantity": empty,
+            "cost_basis": empty,
+            "average_cost": empty,
+            "realized_pl": empty,
+            "dividends": empty,
+        }
+
+    is_buy = types == TransactionType.BUY.value
+    is_sell = types == TransactionType.SELL.value
+    is_dividend = types == TransactionType.DIVIDEND.value
+
+    signed_qty = np.where(is_buy, quantities, np.where(is_sell, -quantities, 0.0))
+    held = segmented_cumsum(signed_qty, group_starts)
+    held[np.abs(held) < EPSILON] = 0.0
+    held_before = held - signed_qty
+
+    # A new cost segment starts whenever the position was flat beforehand
+    # (which includes the first row of every group)
+    segment_starts = group_starts | (held_before <= EPSILON)
+
+    # Fraction of the position each row keeps; a closing sell zeroes the
+    # cost directly below instead of through a zero factor
+    closing = held <= EPSILON
+    keep = np.ones_like(held)
+    partial_sell = is_sell & ~segment_starts & ~closing
+    keep[partial_sell] = held[partial_sell] / held_before[partial_sell]
+
+    # Split long segments into blocks whose scale stays in float range
+    log_keep = np.log(keep)
+    block = np.floor(-segmented_cumsum(log_keep, segment_starts) / SCALE_BLOCK)
+    continued = np.zeros_like(segment_starts)
+    continued[1:] = ~segment_starts[1:] & (block[1:] != block[:-1])
+    block_starts = segment_starts | continued
+
+    scale = np.exp(segmented_cumsum(log_keep, block_starts))
+    buy_cost = np.where(is_buy, quantities * prices + commissions, 0.0)
+    cost = scale * segmented_cumsum(buy_cost / scale, block_starts)
+
+    # A block continuing a segment carries in the cost held before it. Only
+    # very long-lived positions have such blocks, so this loop is short.
+    block_idx = np.flatnonzero(block_starts)
+    block_ends = np.append(block_idx[1:], len(cost))
+    for start in np.flatnonzero(continued):
+        end = block_ends[np.searchsorted(block_idx, start)]
+        cost[start:end] += scale[start:end] * cost[start - 1]
+    cost[closing] = 0.0
+
+    cost_before = np.zeros_like(cost)
+    cost_before[1:] = cost[:-1]
+    cost_before[segment_starts] = 0.0
+    avg_before = np.divide(
+        cost_before,
+        held_before,
+        out=np.zeros_like(cost_before),
+        where=held_before > EPSILON,
+    )
+
+    realized = np.where(is_sell, totals - quantities * avg_before, 0.0)
+    dividends = np.where(is_dividend, totals, 0.0)
+
+    group_last = np.append(group_idx[1:], len(held)) - 1
+    quantity = held[group_last]
+    cost_basis = cost[group_last]
+    return {
+        "quantity": quantity,
+        "cost_basis": cost_basis,
+        "average_cost": np.divide(
+            cost_basis,
+            quantity,
+            out=np.zeros_like(cost_basis),
+            where=quantity > EPSILON,
+        ),
+        "realized_pl": np.add.reduceat(realized, group_idx),
+        "dividends": np.add.reduceat(dividends, group_idx),
+    }
+
+
+# Columns needed to rebuild positions, in the order `positions_from_rows` expects
+POSITION_SOURCE_COLUMNS = (
+    Transaction.account_id,
+    Transaction.symbol,
+    Transaction.currency,
+    Transaction.type,
+    Transaction.quantity,
+    Transaction.price_native,
+    Transaction.commission_native,
+    Transaction.total_native,
+    Transaction.date,
+)
+
+# Chronological order within each (account, symbol) group; the id only
+# makes ties deterministic
+POSITION_SOURCE_ORDER = (
+    Transaction.account_id,
+    Transaction.symbol,
+    Transaction.date,
+    Transaction.created_at,
+    Transaction.id,
+)
+
+
+def positions_from_rows(rows: Sequence[Row]) -> List[dict]:
+    """Build one position dict per (account, symbol) group of sorted rows."""
+    if not rows:
+        return []
+
+    (
+        account_ids,
+        symbols,
+        currencies,
+        types,
+        qty,
+        price,
+        commission,
+        total,
+        dates,
+    ) = zip(*rows)
+    account_keys = np.array([str(a) for a in account_ids])
+    symbol_keys = np.array(symbols)
+
+    group_starts = np.ones(len(rows), dtype=bool)
+    group_starts[1:] = (account_keys[1:] != account_keys[:-1]) | (
+        symbol_keys[1:] != symbol_keys[:-1]
+    )
+
+    positions = compute_positions(
+        group_starts,
+        np.array([t.value for t in types]),
+        np.array(qty, dtype=float),
+        np.array(price, dtype=float),
+        np.array(commission, dtype=float),
+        np.array(total, dtype=float),
+    )
+
+    group_idx = np.flatnonzero(group_starts)
+    group_last = np.append(group_idx[1:], len(rows)) - 1
+    return [
+        {
+            "account_id": account_ids[i],
+            "symbol": symbols[i],
+            "currency": currencies[last],
+            "quantity": float(positions["quantity"][n]),
+            "average_cost": float(positions["average_cost"][n]),
+            "cost_basis": float(positions["cost_basis"][n]),
+            "realized_pl": float(positions["realized_pl"][n]),
+            "dividends": float(positions["dividends"][n]),
+            "last_transaction_date": dates[last],
+        }
+        for n, (i, last) in enumerate(zip(group_idx, group_last))
+    ]
+
+
+async def get_holdings(
+    db: AsyncSession,
+    fx_provider: FxProvider,
+    user_id: UUID,
+    target: Currency,
+    account_id: Optional[UUID] = None,
+) -> List[HoldingResponse]:
+    """Read every (account, symbol) position for a user from the snapshots.
+
+    Book costs are also converted into `target` at today's rate. If no rate
+    can be loaded the converted fields are left empty rather than failing.
+    """
+    query = (
+        select(Position)
+        .join(Account, Position.account_id == Account.id)
+        .where(Account.user_id == user_id)
+    )
+    if account_id:
+        query = query.where(Position.account_id == account_id)
+
+    result = await db.execute(query.order_by(Position.account_id, Position.symbol))
+    positions = result.scalars().all()
+
+    rates = [None] * len(positions)
+    try:
+        today = date.today()
+        rates = (
+            await conversion_rates(
+                db,
+                fx_provider,
+                [position.currency for position in positions],
+                [today] * len(positions),
+                target,
+            )
+        ).tolist()
+    except FxRateError as e:
+        logger.warning(f"Holdings shown without conversion: {str(e)}")
+
+    return [
+        HoldingResponse(
+            account_id=position.account_id,
+            symbol=position.symbol,
+            currency=position.currency.value,
+            quantity=position.quantity,
+            average_cost=(
+                position.cost_basis / position.quantity
+                if position.quantity > EPSILON
+                else 0.0
+            ),
+            cost_basis=position.cost_basis,
+            realized_pl=position.realized_pl,
+            dividends=position.dividends,
+            fx_rate=rate,
+            cost_basis_converted=(
+                position.cost_basis * rate if rate is not None else None
+            ),
+        )
+        for position, rate in zip(positions, rates)
+    ]
@@ -0,0 +1,163 @@
+"""
+Bulk import of transactions from broker CSV exports.
+
+The upload is read incrementally in fixed-size chunks of rows, so memory
+use depends on the chunk size rather than the file size. Each chunk is
+validated against the transaction schema, account ownership is checked
+once per distinct account, and valid rows are inserted with a single
+executemany per chunk. The whole import runs in one database transaction
+and is rolled back if any row is invalid. Rows are stamped with
+consecutive `created_at` times, so trades on the same day keep the order
+they had in the file.
+"""
+
+import codecs
+import csv
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.account import Account
+from app.models.transaction import Transaction, calculate_total_native
+from app.schemas.transaction import TransactionCreate
+from app.services.positions import PositionKey, recompute_positions
+
+# Rows parsed, validated and inserted per round trip
+CHUNK_SIZE = 1000
+
+# Stop collecting row errors after this many; the import fails either way
+MAX_REPORTED_ERRORS = 100
+
+# Columns whose values are case-insensitive enum names
+UPPERCASE_COLUMNS = ("type", "currency")
+
+
+class TransactionImportError(Exception):
+    """Raised when an upload contains invalid rows."""
+
+    def __init__(self, errors: List[dict]):
+        super().__init__(f"{len(errors)} invalid row(s)")
+        self.errors = errors
+
+
+def iter_csv_rows(file: BinaryIO) -> Iterator[Tuple[int, dict]]:
+    """Yield (line number, row) pairs from a CSV file with a header row."""
+    text = codecs.getreader("utf-8-sig")(file)
+    reader = csv.DictReader(text)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def normalize_row(row: dict, default_account_id: Optional[UUID]) -> dict:
+    """Drop blank cells so schema defaults apply and normalize enum columns."""
+    data = {
+        key.strip().lower(): value.strip()
+        for key, value in row.items()
+        if key and value is not None and value.strip()
+    }
+    for column in UPPERCASE_COLUMNS:
+        if column in data:
+            data[column] = data[column].upper()
+    if "account_id" not in data and default_account_id:
+        data["account_id"] = default_account_id
+    return data
+
+
+async def owned_accounts(
+    db: AsyncSession, user_id: UUID, account_ids: Set[UUID]
+) -> Set[UUID]:
+    result = await db.execute(
+        select(Account.id).where(
+            Account.id.in_(account_ids), Account.user_id == user_id
+        )
+    )
+    return set(result.scalars().all())
+
+
+async def import_transactions_csv(
+    db: AsyncSession,
+    user_id: UUID,
+    file: BinaryIO,
+    default_account_id: Optional[UUID] = None,
+) -> int:
+    """Import every row of a CSV upload and return the number of rows inserted.
+
+    Raises `TransactionImportError` with per-row details if any row is
+    invalid; nothing should be committed in that case. The caller commits on
+    success.
+    """
+    rows = iter_csv_rows(file)
+    started_at = datetime.now(timezone.utc)
+    ownership: Dict[UUID, bool] = {}
+    # Earliest imported date per group, for the ACB replay
+    touched: Dict[PositionKey, date] = {}
+    errors: List[dict] = []
+    imported = 0
+
+    while True:
+        # Reading the spooled upload is blocking file I/O
+        chunk = await run_in_threadpool(list, islice(rows, CHUNK_SIZE))
+        if not chunk:
+            break
+
+        valid: List[Tuple[int, TransactionCreate]] = []
+        for line, row in chunk:
+            try:
+                data = TransactionCreate.model_validate(
+                    normalize_row(row, default_account_id)
+                )
+            except ValidationError as e:
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(
+                        {
+                            "line": line,
+                            "errors": [
+                                f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                                for err in e.errors()
+                            ],
+                        }
+                    )
+                continue
+            valid.append((line, data))
+
+        unknown = {data.account_id for _, data in valid} - ownership.keys()
+        if unknown:
+            owned = await owned_accounts(db, user_id, unknown)
+            ownership.update(
+                {account_id: account_id in owned for account_id in unknown}
+            )
+
+        values = []
+        for line, data in valid:
+            if not ownership[data.account_id]:
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line, "errors": ["Account not found"]})
+                continue
+            value = data.model_dump()
+            value["total_native"] = calculate_total_native(
+                data.type, data.quantity, data.price_native, data.commission_native
+            )
+            value["created_at"] = started_at + timedelta(
+                microseconds=imported + len(values)
+            )
+            values.append(value)
+            key = (data.account_id, data.symbol)
+            touched[key] = min(touched.get(key, data.date), data.date)
+
+        # Keep validating after the first error so the report is complete,
+        # but stop writing rows that will be rolled back anyway
+        if values and not errors:
+            await db.execute(insert(Transaction), values)
+            imported += len(values)
+
+    if errors:
+        raise TransactionImportError(errors)
+
+    await recompute_positions(db, touched)
+    return imported
@@ -0,0 +1,36 @@
+from app.core.config import settings
+from app.services.market_data.base import PriceHistoryError, PriceProvider
+from app.services.market_data.cache import PriceCache
+from app.services.market_data.history import backfill, get_close_matrix, get_closes
+from app.services.market_data.yfinance_provider import YFinanceProvider
+
+# Shared per-process provider and cache used by the API
+price_provider = YFinanceProvider()
+price_cache = PriceCache(
+    price_provider,
+    ttl=settings.PRICE_CACHE_TTL_SECONDS,
+    maxsize=settings.PRICE_CACHE_MAX_SYMBOLS,
+)
+
+
+def get_price_provider() -> PriceProvider:
+    return price_provider
+
+
+def get_price_cache() -> PriceCache:
+    return price_cache
+
+
+__all__ = [
+    "PriceHistoryError",
+    "PriceProvider",
+    "PriceCache",
+    "YFinanceProvider",
+    "price_provider",
+    "price_cache",
+    "get_price_provider",
+    "get_price_cache",
+    "backfill",
+    "get_closes",
+    "get_close_matrix",
+]
@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Dict, List, Sequence, Tuple
+
+
+class PriceHistoryError(Exception):
+    """Raised when historical prices cannot be fetched from the provider."""
+
+
+class PriceProvider(ABC):
+    """Source of latest and historical prices for a batch of symbols."""
+
+    @abstractmethod
+    async def fetch_prices(self, symbols: Sequence[str]) -> Dict[str, float]:
+        """Return the latest price for each symbol.
+
+        Symbols the provider has no price for are left out of the result.
+        """
+
+    @abstractmethod
+    async def fetch_history(
+        self, symbols: Sequence[str], start: date, end: date
+    ) -> Dict[str, List[Tuple[date, float]]]:
+        """Return daily (date, close) pairs for each symbol, start and end inclusive.
+
+        Symbols the provider has no data for are left out of the result.
+        """
@@ -0,0 +1,78 @@
+import asyncio
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from app.core.cache import TTLCache
+from app.services.market_data.base import PriceProvider
+
+
+class PriceCache:
+    """TTL + LRU cache in front of a price provider.
+
+    Misses are batched into a single provider call, and symbols already being
+    fetched are awaited rather than requested again (single-flight), so any
+    number of concurrent callers cause at most one upstream fetch per symbol
+    per TTL window.
+    """
+
+    def __init__(self, provider: PriceProvider, ttl: float = 60, maxsize: int = 10000):
+        self.provider = provider
+        # Prices are wrapped in a tuple so a stored (None,), "provider had no
+        # price", is told apart from a miss
+        self._prices: TTLCache[Tuple[Optional[float]]] = TTLCache(maxsize, ttl)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.upstream_calls = 0
+
+    async def _fetch(self, symbols: list, futures: Dict[str, asyncio.Future]) -> None:
+        self.upstream_calls += 1
+        try:
+            prices = await self.provider.fetch_prices(symbols)
+        except Exception as e:
+            for symbol in symbols:
+                self._in_flight.pop(symbol, None)
+                futures[symbol].set_exception(e)
+            return
+
+        for symbol in symbols:
+            price = prices.get(symbol)
+            self._prices.set(symbol, (price,))
+            self._in_flight.pop(symbol, None)
+            futures[symbol].set_result(price)
+
+    async def get_prices(self, symbols: Iterable[str]) -> Dict[str, Optional[float]]:
+        """Latest price per symbol, or None where the provider has none."""
+        prices: Dict[str, Optional[float]] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        missing = []
+
+        for symbol in dict.fromkeys(s.upper() for s in symbols):
+            cached = self._prices.get(symbol)
+            if cached is not None:
+                prices[symbol] = cached[0]
+            elif symbol in self._in_flight:
+                waiting[symbol] = self._in_flight[symbol]
+            else:
+                missing.append(symbol)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            futures = {symbol: loop.create_future() for symbol in missing}
+            self._in_flight.update(futures)
+            waiting.update(futures)
+            # Run the fetch as its own task so a cancelled caller cannot
+            # strand the other requests waiting on the same symbols
+            task = asyncio.create_task(self._fetch(missing, futures))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        for symbol, future in waiting.items():
+            # Shielded: a cancelled caller must not cancel the shared future
+            prices[symbol] = await asyncio.shield(future)
+        return prices
+
+    def stats(self) -> dict:
+        return {
+            **self._prices.stats(),
+            "in_flight": len(self._in_flight),
+            "upstream_calls": self.upstream_calls,
+        }
@@ -0,0 +1,255 @@
+"""
+Historical daily closes backed by the `price_history` table.
+
+`backfill` asks the provider only for dates outside each symbol's recorded
+coverage, batching symbols that share the same gap into one call. Today's
+bar is refetched at most once per price cache TTL. Range
+queries return NumPy arrays built straight from result tuples, so
+valuation code never touches per-row ORM objects.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.price_history import PriceHistory, PriceHistoryCoverage
+from app.services.market_data.base import PriceHistoryError, PriceProvider
+
+logger = logging.getLogger(__name__)
+
+DateRange = Tuple[date, date]
+
+# Rows per INSERT statement when storing fetched history
+INSERT_BATCH_SIZE = 5000
+
+
+def missing_ranges(
+    start: date, end: date, coverage: Optional[PriceHistoryCoverage]
+) -> List[DateRange]:
+    """Ranges to fetch so a symbol's stored history covers [start, end].
+
+    Coverage is a single range, so a request that does not touch it also
+    fetches the days in between rather than leaving a hole.
+    """
+    if coverage is None:
+        return [(start, end)]
+
+    gaps = []
+    if start < coverage.start_date:
+        gaps.append((start, coverage.start_date - timedelta(days=1)))
+    if end > coverage.end_date:
+        gaps.append((coverage.end_date + timedelta(days=1), end))
+    return gaps
+
+
+def last_occurrences(keys: np.ndarray) -> np.ndarray:
+    """Mask selecting the last element of each distinct key."""
+    _, from_end = np.unique(keys[::-1], return_index=True)
+    mask = np.zeros(len(keys), dtype=bool)
+    mask[len(keys) - 1 - from_end] = True
+    return mask
+
+
+async def store_history(
+    db: AsyncSession, history: Dict[str, List[Tuple[date, float]]]
+) -> None:
+    """Upsert fetched closes; a re-fetched day replaces the earlier value."""
+    rows = [
+        {"symbol": symbol, "date": day, "close": close}
+        for symbol, series in history.items()
+        for day, close in series
+    ]
+    for offset in range(0, len(rows), INSERT_BATCH_SIZE):
+        statement = insert(PriceHistory).values(
+            rows[offset : offset + INSERT_BATCH_SIZE]
+        )
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[PriceHistory.symbol, PriceHistory.date],
+                set_={"close": statement.excluded.close},
+            )
+        )
+
+
+async def record_coverage(
+    db: AsyncSession,
+    symbols: Sequence[str],
+    start: date,
+    end: date,
+    fetched_open: bool,
+) -> None:
+    """Widen each symbol's coverage to include [start, end].
+
+    A single upsert, so concurrent backfills of the same symbols only ever
+    grow the range instead of racing to insert or overwrite it.
+    """
+    statement = insert(PriceHistoryCoverage).values(
+        [
+            {
+                "symbol": symbol,
+                "start_date": start,
+                "end_date": end,
+                "open_fetched_at": func.now() if fetched_open else None,
+            }
+            for symbol in symbols
+        ]
+    )
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[PriceHistoryCoverage.symbol],
+            set_={
+                "start_date": func.least(
+                    PriceHistoryCoverage.start_date, statement.excluded.start_date
+                ),
+                "end_date": func.greatest(
+                    PriceHistoryCoverage.end_date, statement.excluded.end_date
+                ),
+                "open_fetched_at": func.coalesce(
+                    statement.excluded.open_fetched_at,
+                    PriceHistoryCoverage.open_fetched_at,
+                ),
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+async def backfill(
+    db: AsyncSession,
+    provider: PriceProvider,
+    symbols: Sequence[str],
+    start: date,
+    end: date,
+) -> None:
+    """Make sure closes for every symbol over [start, end] are stored.
+
+    Only dates outside the recorded coverage are fetched. Today is never
+    marked as covered because its close is not final until the market shuts;
+    instead the time it was fetched is recorded, and it is not asked for
+    again within PRICE_CACHE_TTL_SECONDS. Raises PriceHistoryError if the
+    provider fails.
+    """
+    symbols = sorted({symbol.upper() for symbol in symbols})
+    if not symbols or start > end:
+        return
+
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.PRICE_CACHE_TTL_SECONDS
+    )
+    result = await db.execute(
+        select(
+            PriceHistoryCoverage, PriceHistoryCoverage.open_fetched_at >= cutoff
+        ).where(PriceHistoryCoverage.symbol.in_(symbols))
+    )
+    rows = result.all()
+    coverage = {row.symbol: row for row, _ in rows}
+    open_fresh = {row.symbol for row, fresh in rows if fresh}
+
+    # Symbols missing the same range are fetched together
+    settled = date.today() - timedelta(days=1)
+    gaps: Dict[DateRange, List[str]] = defaultdict(list)
+    for symbol in symbols:
+        for gap in missing_ranges(start, end, coverage.get(symbol)):
+            if gap[0] > settled and symbol in open_fresh:
+                continue
+            gaps[gap].append(symbol)
+
+    for (gap_start, gap_end), gap_symbols in gaps.items():
+        try:
+            history = await provider.fetch_history(gap_symbols, gap_start, gap_end)
+        except Exception as e:
+            raise PriceHistoryError(
+                f"Failed to fetch history for {len(gap_symbols)} symbols: {str(e)}"
+            ) from e
+        await store_history(db, history)
+        logger.info(
+            f"Backfilled {sum(map(len, history.values()))} closes for "
+            f"{len(gap_symbols)} symbols over {gap_start}..{gap_end}"
+        )
+
+        covered_end = min(gap_end, settled)
+        fetched_open = gap_end > settled
+        if covered_end >= gap_start:
+            await record_coverage(db, gap_symbols, gap_start, covered_end, fetched_open)
+        elif fetched_open:
+            # A symbol without settled coverage has nowhere to keep the time
+            await db.execute(
+                update(PriceHistoryCoverage)
+                .where(PriceHistoryCoverage.symbol.in_(gap_symbols))
+                .values(open_fetched_at=func.now())
+            )
+
+
+async def get_closes(
+    db: AsyncSession, symbol: str, start: date, end: date
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Stored closes for one symbol as (datetime64[D] dates, float64 closes)."""
+    result = await db.execute(
+        select(PriceHistory.date, PriceHistory.close)
+        .where(
+            PriceHistory.symbol == symbol.upper(),
+            PriceHistory.date >= start,
+            PriceHistory.date <= end,
+        )
+        .order_by(PriceHistory.date)
+    )
+    rows = result.all()
+    dates = np.array([row[0] for row in rows], dtype="datetime64[D]")
+    closes = np.fromiter((row[1] for row in rows), dtype=float, count=len(rows))
+    return dates, closes
+
+
+async def get_close_matrix(
+    db: AsyncSession, symbols: Sequence[str], start: date, end: date
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Daily closes for many symbols aligned on every calendar day in the range.
+
+    Returns (dates, closes) where `dates` holds each day from start to end
+    and `closes[d, s]` is the last known close of symbols[s] on or before
+    day d (NaN before its first stored close). Weekends and holidays carry
+    the previous trading day's close forward.
+    """
+    dates = np.arange(
+        np.datetime64(start, "D"), np.datetime64(end, "D") + 1, dtype="datetime64[D]"
+    )
+    closes = np.full((len(dates), len(symbols)), np.nan)
+    if not symbols or len(dates) == 0:
+        return dates, closes
+
+    keys = [symbol.upper() for symbol in symbols]
+    columns = {symbol: i for i, symbol in enumerate(keys)}
+
+    # Start from the last close before the range so day 0 can be filled
+    result = await db.execute(
+        select(PriceHistory.symbol, PriceHistory.date, PriceHistory.close)
+        .where(
+            PriceHistory.symbol.in_(keys),
+            PriceHistory.date >= start - timedelta(days=14),
+            PriceHistory.date <= end,
+        )
+        .order_by(PriceHistory.symbol, PriceHistory.date)
+    )
+    rows = result.all()
+    if not rows:
+        return dates, closes
+
+    row_symbols, row_dates, row_closes = zip(*rows)
+    col = np.array([columns[symbol] for symbol in row_symbols])
+    day = np.array(row_dates, dtype="datetime64[D]") - dates[0]
+    day = np.maximum(day.astype(int), 0)
+    # Rows are sorted by date, so the latest of those clamped to day 0 is kept
+    last = last_occurrences(day * len(keys) + col)
+    closes[day[last], col[last]] = np.array(row_closes, dtype=float)[last]
+
+    # Forward-fill down each column
+    filled = np.where(~np.isnan(closes), np.arange(len(dates))[:, None], 0)
+    np.maximum.accumulate(filled, axis=0, out=filled)
+    closes = closes[filled, np.arange(len(keys))]
+    return dates, closes
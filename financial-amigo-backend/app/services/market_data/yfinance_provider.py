@@ -0,0 +1,101 @@
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Sequence, Tuple
+
+import yfinance as yf
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.market_data.base import PriceProvider
+
+logger = logging.getLogger(__name__)
+
+
+class YFinanceProvider(PriceProvider):
+    """Latest prices from Yahoo Finance, one download call per batch."""
+
+    def __init__(self, timeout: int = 10):
+        self.timeout = timeout
+
+    def _download(self, symbols: Sequence[str]) -> Dict[str, float]:
+        frame = yf.download(
+            tickers=list(symbols),
+            period="5d",
+            interval="1d",
+            group_by="column",
+            auto_adjust=False,
+            progress=False,
+            threads=True,
+            timeout=self.timeout,
+        )
+        if frame is None or frame.empty:
+            return {}
+
+        closes = frame["Close"]
+        if closes.ndim == 1:
+            closes = closes.to_frame(name=symbols[0])
+
+        # Today's bar carries the current price while the market is open
+        latest = closes.ffill().iloc[-1]
+        return {
+            symbol: float(price)
+            for symbol, price in latest.items()
+            if symbol in symbols and price == price  # skip NaN
+        }
+
+    def _download_history(
+        self, symbols: Sequence[str], start: date, end: date
+    ) -> Dict[str, List[Tuple[date, float]]]:
+        frame = yf.download(
+            tickers=list(symbols),
+            start=start.isoformat(),
+            # yfinance treats `end` as exclusive
+            end=(end + timedelta(days=1)).isoformat(),
+            interval="1d",
+            group_by="column",
+            auto_adjust=False,
+            progress=False,
+            threads=True,
+            timeout=self.timeout,
+        )
+        if frame is None or frame.empty:
+            return {}
+
+        closes = frame["Close"]
+        if closes.ndim == 1:
+            closes = closes.to_frame(name=symbols[0])
+
+        days = [timestamp.date() for timestamp in closes.index]
+        history = {}
+        for symbol in closes.columns:
+            if symbol not in symbols:
+                continue
+            series = [
+                (day, float(price))
+                for day, price in zip(days, closes[symbol].to_numpy())
+                if price == price  # skip NaN
+            ]
+            if series:
+                history[symbol] = series
+        return history
+
+    async def fetch_prices(self, symbols: Sequence[str]) -> Dict[str, float]:
+        if not symbols:
+            return {}
+        try:
+            return await run_in_threadpool(self._download, list(symbols))
+        except Exception as e:
+            logger.error(f"yfinance download failed for {len(symbols)} symbols: {e}")
+            raise
+
+    async def fetch_history(
+        self, symbols: Sequence[str], start: date, end: date
+    ) -> Dict[str, List[Tuple[date, float]]]:
+        if not symbols or start > end:
+            return {}
+        try:
+            return await run_in_threadpool(
+                self._download_history, list(symbols), start, end
+            )
+        except Exception as e:
+            logger.error(f"yfinance history download failed for {symbols}: {e}")
+            raise
@@ -0,0 +1,252 @@
+"""
+Daily portfolio valuation.
+
+The user's buys and sells become a (days x symbols) matrix of quantity
+changes whose cumulative sum along the day axis is the position held on each
+day. That matrix is multiplied element-wise with the close matrix from the
+price store and a matching exchange-rate matrix from the FX service, then
+summed across symbols, so a decade of history for dozens of symbols is a
+handful of array operations rather than a per-day, per-symbol loop.
+
+Columns are kept per account, which gives the per-account values and cash
+flows the return calculations in `app.services.returns` need in the same
+pass.
+"""
+
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.account import Account, Currency
+from app.models.transaction import Transaction, TransactionType
+from app.services.fx import FxProvider, conversion_rates, rate_matrix
+from app.services.market_data import PriceProvider, backfill, get_close_matrix
+from app.services.market_data.history import last_occurrences
+
+
+def day_index(dates: np.ndarray, start: date) -> np.ndarray:
+    """Offset of each date from `start`; earlier dates map to day 0."""
+    offsets = (dates - np.datetime64(start, "D")).astype(int)
+    return np.maximum(offsets, 0)
+
+
+def position_matrix(
+    n_days: int,
+    n_symbols: int,
+    days: np.ndarray,
+    columns: np.ndarray,
+    deltas: np.ndarray,
+) -> np.ndarray:
+    """Quantity held per (day, symbol) from signed quantity changes."""
+    changes = np.zeros((n_days, n_symbols))
+    np.add.at(changes, (days, columns), deltas)
+    return np.cumsum(changes, axis=0)
+
+
+class AccountHistory:
+    """Daily values and cash flows per account, in one currency.
+
+    `values`, `flows` and `income` are (days x accounts) arrays. `flows` is
+    the net amount put into holdings each day (buy costs including
+    commission, minus sale proceeds) and `income` the dividends received;
+    both are zero unless requested.
+    """
+
+    def __init__(
+        self,
+        dates: np.ndarray,
+        account_ids: List[UUID],
+        values: np.ndarray,
+        flows: np.ndarray,
+        income: np.ndarray,
+    ):
+        self.dates = dates
+        self.account_ids = account_ids
+        self.values = values
+        self.flows = flows
+        self.income = income
+
+
+def empty_history() -> AccountHistory:
+    empty = np.zeros((0, 0))
+    return AccountHistory(np.array([], dtype="datetime64[D]"), [], empty, empty, empty)
+
+
+async def get_account_history(
+    db: AsyncSession,
+    provider: PriceProvider,
+    fx_provider: FxProvider,
+    user_id: UUID,
+    target: Currency,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    include_flows: bool = False,
+) -> AccountHistory:
+    """Daily market value of each of a user's accounts, in `target` currency.
+
+    Covers every calendar day from `start` (default: first trade) to `end`
+    (default: today). With `include_flows`, trades and dividends dated
+    within the range are also converted into daily cash flows; this raises
+    ValueError if one predates the known exchange rates. Missing prices are
+    backfilled into the price store first; the caller commits them.
+    """
+    end = end or date.today()
+    result = await db.execute(
+        select(
+            Transaction.account_id,
+            Transaction.symbol,
+            Transaction.currency,
+            Transaction.type,
+            Transaction.quantity,
+            Transaction.price_native,
+            Transaction.commission_native,
+            Transaction.total_native,
+            Transaction.date,
+        )
+        .join(Account)
+        .where(Account.user_id == user_id, Transaction.date <= end)
+        .order_by(Transaction.date)
+    )
+    rows = result.all()
+    if not rows:
+        return empty_history()
+
+    (
+        account_ids,
+        symbols,
+        currencies,
+        types,
+        quantities,
+        prices_native,
+        commissions,
+        totals,
+        dates,
+    ) = zip(*rows)
+    symbols = np.array(symbols)
+    currencies = np.array([currency.value for currency in currencies])
+    quantities = np.array(quantities, dtype=float)
+    dates = np.array(dates, dtype="datetime64[D]")
+    is_buy = np.array([t == TransactionType.BUY for t in types])
+    is_trade = is_buy | np.array([t == TransactionType.SELL for t in types])
+    if not is_trade.any():
+        return empty_history()
+
+    trade_dates = dates[is_trade]
+    start = start or trade_dates[0].item()
+    if start > end:
+        return empty_history()
+
+    account_names, accounts = np.unique(
+        np.array([str(account_id) for account_id in account_ids]), return_inverse=True
+    )
+    symbol_names, columns = np.unique(symbols[is_trade], return_inverse=True)
+    n_accounts, n_symbols = len(account_names), len(symbol_names)
+    # Currency of each symbol, taken from its most recent transaction
+    latest = last_occurrences(columns)
+    symbol_currencies = np.empty(n_symbols, dtype=object)
+    symbol_currencies[columns[latest]] = currencies[is_trade][latest]
+
+    signs = np.where(is_buy[is_trade], 1.0, -1.0)
+    n_days = (end - start).days + 1
+    positions = position_matrix(
+        n_days,
+        n_accounts * n_symbols,
+        day_index(trade_dates, start),
+        accounts[is_trade] * n_symbols + columns,
+        signs * quantities[is_trade],
+    ).reshape(n_days, n_accounts, n_symbols)
+
+    await backfill(db, provider, symbol_names.tolist(), start, end)
+
+    day_dates, prices = await get_close_matrix(db, symbol_names.tolist(), start, end)
+    fx = await rate_matrix(db, fx_provider, symbol_currencies, target, start, end)
+
+    # Days before a symbol's first close (or without an FX rate) count as 0
+    values = np.nan_to_num(positions * (prices * fx)[:, np.newaxis, :]).sum(axis=2)
+
+    flows = np.zeros((n_days, n_accounts))
+    income = np.zeros((n_days, n_accounts))
+    in_range = dates >= np.datetime64(start, "D")
+    if include_flows and in_range.any():
+        totals = np.array(totals, dtype=float)
+        amounts = np.where(
+            is_buy,
+            quantities * np.array(prices_native, dtype=float)
+            + np.array(commissions, dtype=float),
+            np.where(is_trade, -totals, totals),
+        )[in_range]
+        amounts *= await conversion_rates(
+            db, fx_provider, currencies[in_range], dates[in_range].tolist(), target
+        )
+        days = day_index(dates[in_range], start)
+        trades = is_trade[in_range]
+        np.add.at(flows, (days[trades], accounts[in_range][trades]), amounts[trades])
+        np.add.at(
+            income, (days[~trades], accounts[in_range][~trades]), amounts[~trades]
+        )
+
+    return AccountHistory(
+        day_dates, [UUID(name) for name in account_names], values, flows, income
+    )
+
+
+async def get_period_history(
+    db: AsyncSession,
+    provider: PriceProvider,
+    fx_provider: FxProvider,
+    user_id: UUID,
+    target: Currency,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Tuple[np.ndarray, AccountHistory]:
+    """Account history over [start, end] with flows, and the opening values.
+
+    The opening value of each account is its value at the close of the day
+    before `start`; with no `start`, the period begins at the first trade
+    and opens empty.
+    """
+    # Value the day before the period too: it is the opening balance
+    history = await get_account_history(
+        db,
+        provider,
+        fx_provider,
+        user_id,
+        target,
+        start - timedelta(days=1) if start else None,
+        end,
+        include_flows=True,
+    )
+    if not start or not len(history.dates):
+        return np.zeros(len(history.account_ids)), history
+
+    opening = history.values[0]
+    history.dates, history.values, history.flows, history.income = (
+        column[1:]
+        for column in (history.dates, history.values, history.flows, history.income)
+    )
+    return opening, history
+
+
+async def get_portfolio_history(
+    db: AsyncSession,
+    provider: PriceProvider,
+    fx_provider: FxProvider,
+    user_id: UUID,
+    target: Currency,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Daily market value of all of a user's holdings, in `target` currency.
+
+    Returns (dates, values) covering every calendar day from `start`
+    (default: first transaction) to `end` (default: today). Missing prices
+    are backfilled into the price store first; the caller commits them.
+    """
+    history = await get_account_history(
+        db, provider, fx_provider, user_id, target, start, end
+    )
+    return history.dates, history.values.sum(axis=1)
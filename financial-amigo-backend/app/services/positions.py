@@ -0,0 +1,273 @@
+"""
+Maintenance of the materialized `positions` snapshots.
+
+Every transaction write updates the affected snapshot inside the same
+database transaction, before the caller commits. A write dated on or after
+the snapshot's last transaction is folded in directly; anything that
+rewrites history (back-dated inserts, edits, deletes) recomputes just that
+(account, symbol) group from its transactions. The snapshot row is locked
+first, so concurrent writes to one group queue up instead of each folding
+into the same stale values.
+
+Writes also mark the earliest date whose ACB checkpoints they invalidate
+(`Position.acb_stale_from`); the checkpoints themselves are replayed lazily
+by `app.services.acb` when realized gains are read. The cash-flow index
+in `app.services.cash_flows` is kept in step the same way as the snapshots.
+"""
+
+from datetime import date
+from typing import Iterable, List, Mapping, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.acb_checkpoint import AcbCheckpoint
+from app.models.account import Currency
+from app.models.position import Position
+from app.models.transaction import Transaction, TransactionType
+from app.services.cash_flows import (
+    append_cash_flow,
+    drop_cash_flows,
+    rebuild_cash_flows,
+)
+from app.services.holdings import (
+    EPSILON,
+    POSITION_SOURCE_COLUMNS,
+    POSITION_SOURCE_ORDER,
+    positions_from_rows,
+)
+
+PositionKey = Tuple[UUID, str]
+
+# Snapshot fields compared by the rebuild
+SNAPSHOT_FIELDS = ("quantity", "cost_basis", "realized_pl", "dividends")
+
+
+def position_key(transaction: Transaction) -> PositionKey:
+    return transaction.account_id, transaction.symbol
+
+
+async def get_position(db: AsyncSession, key: PositionKey) -> Optional[Position]:
+    """A group's snapshot, locked until the end of the database transaction."""
+    account_id, symbol = key
+    result = await db.execute(
+        select(Position)
+        .where(Position.account_id == account_id, Position.symbol == symbol)
+        .with_for_update()
+    )
+    return result.scalars().first()
+
+
+async def lock_position(
+    db: AsyncSession, key: PositionKey, currency: Currency, last_transaction_date: date
+) -> Position:
+    """Lock a group's snapshot, first creating it empty if there is none.
+
+    The insert skips an existing row, so writers racing to create the same
+    group all end up holding (in turn) the one row.
+    """
+    account_id, symbol = key
+    await db.execute(
+        insert(Position)
+        .values(
+            account_id=account_id,
+            symbol=symbol,
+            currency=currency,
+            last_transaction_date=last_transaction_date,
+        )
+        .on_conflict_do_nothing(index_elements=[Position.account_id, Position.symbol])
+    )
+    return await get_position(db, key)
+
+
+def mark_acb_stale(position: Position, since: date) -> None:
+    """Record that ACB checkpoints dated on or after `since` need replaying."""
+    if position.acb_stale_from is None or since < position.acb_stale_from:
+        position.acb_stale_from = since
+
+
+def store_snapshot(
+    db: AsyncSession, key: PositionKey, position: Optional[Position], snapshot: dict
+) -> Position:
+    """Write recomputed values onto a snapshot row, creating it if needed."""
+    if position is None:
+        position = Position(account_id=key[0], symbol=key[1])
+        db.add(position)
+    for field in SNAPSHOT_FIELDS + ("currency", "last_transaction_date"):
+        setattr(position, field, snapshot[field])
+    return position
+
+
+async def drop_position(db: AsyncSession, key: PositionKey, position: Position) -> None:
+    """Delete a snapshot whose group has no transactions left, and its indexes."""
+    account_id, symbol = key
+    await drop_cash_flows(db, account_id, symbol)
+    # Checkpoints of transactions moved to another group would linger otherwise
+    await db.execute(
+        delete(AcbCheckpoint).where(
+            AcbCheckpoint.account_id == account_id, AcbCheckpoint.symbol == symbol
+        )
+    )
+    await db.delete(position)
+
+
+def fold_transaction(position: Position, transaction: Transaction) -> None:
+    """Apply one chronologically-latest transaction to a snapshot in place.
+
+    Mirrors the average cost rules in `compute_positions`.
+    """
+    if transaction.type == TransactionType.BUY:
+        position.quantity += transaction.quantity
+        position.cost_basis += (
+            transaction.quantity * transaction.price_native
+            + transaction.commission_native
+        )
+    elif transaction.type == TransactionType.SELL:
+        average_cost = (
+            position.cost_basis / position.quantity
+            if position.quantity > EPSILON
+            else 0.0
+        )
+        position.realized_pl += (
+            transaction.total_native - transaction.quantity * average_cost
+        )
+        position.quantity -= transaction.quantity
+        position.cost_basis -= transaction.quantity * average_cost
+        if abs(position.quantity) < EPSILON:
+            position.quantity = 0.0
+        if position.quantity <= EPSILON:
+            position.cost_basis = 0.0
+    else:
+        position.dividends += transaction.total_native
+
+    position.currency = transaction.currency
+    position.last_transaction_date = transaction.date
+
+
+async def compute_snapshots(
+    db: AsyncSession, keys: Optional[Iterable[PositionKey]] = None
+) -> List[dict]:
+    """Compute positions from transactions, for the given keys or for everything."""
+    query = select(*POSITION_SOURCE_COLUMNS)
+    if keys is not None:
+        keys = list(keys)
+        if not keys:
+            return []
+        query = query.where(
+            tuple_(Transaction.account_id, Transaction.symbol).in_(keys)
+        )
+
+    result = await db.execute(query.order_by(*POSITION_SOURCE_ORDER))
+    return positions_from_rows(result.all())
+
+
+async def recompute_positions(
+    db: AsyncSession, changes: Mapping[PositionKey, date]
+) -> None:
+    """Recompute the snapshots for the given groups from their transactions.
+
+    `changes` maps each group to the earliest date the write touched, from
+    which its ACB checkpoints are marked stale.
+    """
+    # Locks are always taken in the same order, so two writers touching the
+    # same groups cannot deadlock
+    keys = sorted(changes, key=lambda k: (str(k[0]), k[1]))
+    await db.flush()
+    positions = {key: await get_position(db, key) for key in keys}
+
+    snapshots = {
+        (snapshot["account_id"], snapshot["symbol"]): snapshot
+        for snapshot in await compute_snapshots(db, keys)
+    }
+    for key in keys:
+        position = positions[key]
+        snapshot = snapshots.get(key)
+        if snapshot is None:
+            # No transactions left for this symbol in the account
+            if position is not None:
+                await drop_position(db, key, position)
+            continue
+        if position is None:
+            position = await lock_position(
+                db, key, snapshot["currency"], snapshot["last_transaction_date"]
+            )
+        store_snapshot(db, key, position, snapshot)
+        mark_acb_stale(position, changes[key])
+        await rebuild_cash_flows(db, key[0], key[1], changes[key])
+
+
+async def apply_transaction(db: AsyncSession, transaction: Transaction) -> None:
+    """Update the snapshot for a newly added transaction."""
+    key = position_key(transaction)
+    position = await lock_position(db, key, transaction.currency, transaction.date)
+
+    if transaction.date < position.last_transaction_date:
+        # Back-dated: every later sell's cost basis may change
+        await recompute_positions(db, {key: transaction.date})
+        return
+
+    fold_transaction(position, transaction)
+    mark_acb_stale(position, transaction.date)
+    await append_cash_flow(db, transaction)
+
+
+def diff_snapshot(
+    position: Optional[Position], snapshot: Optional[dict], tolerance: float = 1e-6
+) -> List[str]:
+    """Names of the fields where a stored snapshot disagrees with a recomputed one."""
+    if position is None:
+        return ["missing"]
+    if snapshot is None:
+        return ["orphaned"]
+
+    return [
+        field
+        for field in SNAPSHOT_FIELDS
+        if abs(getattr(position, field) - snapshot[field])
+        > tolerance * max(1.0, abs(snapshot[field]))
+    ]
+
+
+async def rebuild_all_positions(
+    db: AsyncSession, dry_run: bool = False
+) -> List[Tuple[PositionKey, List[str]]]:
+    """Recompute every snapshot from scratch and report mismatches.
+
+    Stored snapshots are replaced with the recomputed values unless
+    `dry_run` is set. Returns the (key, mismatched fields) pairs found.
+    """
+    snapshots = {
+        (snapshot["account_id"], snapshot["symbol"]): snapshot
+        for snapshot in await compute_snapshots(db)
+    }
+    result = await db.execute(select(Position))
+    stored = {
+        (position.account_id, position.symbol): position
+        for position in result.scalars().all()
+    }
+
+    mismatches = []
+    for key in sorted(
+        snapshots.keys() | stored.keys(), key=lambda k: (str(k[0]), k[1])
+    ):
+        position, snapshot = stored.get(key), snapshots.get(key)
+        fields = diff_snapshot(position, snapshot)
+        if fields:
+            mismatches.append((key, fields))
+        if dry_run:
+            continue
+
+        if snapshot is None:
+            await drop_position(db, key, position)
+            continue
+        if position is None:
+            # Checkpoints for a recreated snapshot are rebuilt from scratch
+            position = store_snapshot(db, key, position, snapshot)
+            mark_acb_stale(position, date.min)
+            await rebuild_cash_flows(db, key[0], key[1], date.min)
+        else:
+            store_snapshot(db, key, position, snapshot)
+
+    return mismatches
@@ -0,0 +1,198 @@
+"""
+Time-weighted and money-weighted returns.
+
+Both are computed from the per-account daily values and cash flows of
+`get_account_history`, with the portfolio as one extra column, so every
+account and the total come out of the same array operations.
+
+The time-weighted return (TWR) chain-links daily returns. A day's gain is
+its change in value, less the money put in, plus dividends paid out; it is
+divided by the previous close plus that day's inflows, treating purchases
+as made at the start of the day and sales at the end.
+
+The money-weighted return (MWR) is the annualized internal rate of return
+(XIRR) of the investor's cash flows: the opening value and every purchase
+going in, every sale, dividend and the closing value coming out. `xirr`
+solves a whole batch of such problems at once with a Newton iteration
+safeguarded by bisection, one row per problem.
+"""
+
+from datetime import date
+from typing import Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.account import Currency
+from app.schemas.portfolio import AccountReturns, PortfolioReturnsResponse
+from app.services.fx import FxProvider
+from app.services.market_data import PriceProvider
+from app.services.portfolio import get_period_history
+
+DAYS_PER_YEAR = 365.0
+
+# The solver works on x = ln(1 + rate) within +/- this bound, which spans
+# any plausible annualized rate; exponents are clipped to stay finite
+LOG_RATE_BOUND = 50.0
+MAX_EXPONENT = 700.0
+
+XIRR_MAX_ITERATIONS = 100
+# Converged once |NPV| is this small relative to the flows, or the bracket
+# on x is this narrow
+XIRR_TOLERANCE = 1e-10
+
+
+def npv(
+    log_rates: np.ndarray, amounts: np.ndarray, times: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Net present value of each row and its derivative with respect to x."""
+    discount = np.exp(
+        np.clip(-log_rates[:, np.newaxis] * times, -MAX_EXPONENT, MAX_EXPONENT)
+    )
+    present = amounts * discount
+    return present.sum(axis=1), -(present * times).sum(axis=1)
+
+
+def xirr(amounts: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Annualized internal rate of return of each row of cash flows.
+
+    `amounts` and `times` are (problems x flows) arrays, `times` in years
+    from any common origin; rows may be padded with zero amounts. Rows
+    without a root, e.g. whose flows all have the same sign, and rows not
+    converged within `XIRR_MAX_ITERATIONS` are NaN.
+    """
+    n = len(amounts)
+    times = np.broadcast_to(times, amounts.shape)
+    scale = np.maximum(np.abs(amounts).sum(axis=1), 1.0)
+
+    lo, hi = np.full(n, -LOG_RATE_BOUND), np.full(n, LOG_RATE_BOUND)
+    f_lo, _ = npv(lo, amounts, times)
+    f_hi, _ = npv(hi, amounts, times)
+    solvable = np.sign(f_lo) * np.sign(f_hi) < 0
+
+    x = np.full(n, np.log1p(0.1))
+    # Bracket width before the last step; a step that does not halve it
+    # is followed by bisection, so the bracket at least halves every two
+    # iterations whatever Newton does
+    width = hi - lo
+    active = solvable.copy()
+    for _ in range(XIRR_MAX_ITERATIONS):
+        if not active.any():
+            break
+        rows = np.flatnonzero(active)
+        f, df = npv(x[rows], amounts[rows], times[rows])
+
+        done = np.abs(f) <= XIRR_TOLERANCE * scale[rows]
+
+        # Shrink the bracket around the root
+        below = np.sign(f) == np.sign(f_lo[rows])
+        lo[rows] = np.where(below, x[rows], lo[rows])
+        f_lo[rows] = np.where(below, f, f_lo[rows])
+        hi[rows] = np.where(below, hi[rows], x[rows])
+        bracket = hi[rows] - lo[rows]
+        done |= bracket < XIRR_TOLERANCE
+        active[rows[done]] = False
+
+        # Newton step, or bisection where it leaves the bracket or the
+        # last step was too slow
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = x[rows] - f / df
+        newton = (
+            np.isfinite(step)
+            & (step > lo[rows])
+            & (step < hi[rows])
+            & (bracket <= width[rows] / 2)
+        )
+        width[rows] = bracket
+        pending = ~done
+        x[rows[pending]] = np.where(newton, step, (lo[rows] + hi[rows]) / 2)[pending]
+
+    return np.where(solvable & ~active, np.expm1(x), np.nan)
+
+
+def time_weighted_growth(
+    opening: np.ndarray, values: np.ndarray, flows: np.ndarray, income: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Cumulative growth factor per (day, column) from daily chain-linking.
+
+    Returns (growth, invested) where `invested` flags columns that held
+    anything during the period.
+    """
+    previous = np.vstack([opening, values[:-1]])
+    base = previous + np.maximum(flows, 0.0)
+    gains = values - previous - flows + income
+    held = base > 0
+    daily = np.divide(gains, base, out=np.zeros_like(gains), where=held)
+    return np.cumprod(1.0 + daily, axis=0), held.any(axis=0)
+
+
+def money_weighted_returns(
+    opening: np.ndarray, values: np.ndarray, flows: np.ndarray, income: np.ndarray
+) -> np.ndarray:
+    """XIRR per column, with the opening value invested the day before day 0."""
+    amounts = np.vstack([-opening, income - flows])
+    amounts[-1] += values[-1]
+    times = np.arange(len(amounts)) / DAYS_PER_YEAR
+
+    # Days without any flow add nothing to any row
+    busy = np.any(amounts != 0, axis=1)
+    return xirr(amounts[busy].T, times[busy])
+
+
+def optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+async def get_returns(
+    db: AsyncSession,
+    provider: PriceProvider,
+    fx_provider: FxProvider,
+    user_id: UUID,
+    target: Currency,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> PortfolioReturnsResponse:
+    """TWR and MWR of a user's portfolio and each account over [start, end].
+
+    `start` defaults to the first trade. Raises ValueError if a cash flow
+    predates the known exchange rates; prices and rates fetched on the way
+    are left for the caller to commit.
+    """
+    opening, history = await get_period_history(
+        db, provider, fx_provider, user_id, target, start, end
+    )
+    if not len(history.dates):
+        return PortfolioReturnsResponse(
+            currency=target.value, dates=[], cumulative_twr=[], accounts=[]
+        )
+
+    dates = history.dates
+    # Append the portfolio as a last column
+    opening = np.append(opening, opening.sum())
+    values, flows, income = (
+        np.column_stack([column, column.sum(axis=1)])
+        for column in (history.values, history.flows, history.income)
+    )
+
+    growth, invested = time_weighted_growth(opening, values, flows, income)
+    twr = np.where(invested, growth[-1] - 1.0, np.nan)
+    mwr = money_weighted_returns(opening, values, flows, income)
+
+    return PortfolioReturnsResponse(
+        currency=target.value,
+        start=dates[0].item(),
+        end=dates[-1].item(),
+        twr=optional(twr[-1]),
+        mwr=optional(mwr[-1]),
+        dates=dates.tolist(),
+        cumulative_twr=(growth[:, -1] - 1.0).tolist(),
+        accounts=[
+            AccountReturns(
+                account_id=account_id,
+                twr=optional(twr[column]),
+                mwr=optional(mwr[column]),
+            )
+            for column, account_id in enumerate(history.account_ids)
+        ],
+    )
@@ -0,0 +1,29 @@
+"""
+Benchmarks behind the performance work, kept so the numbers reproduce.
+
+Run each one as a module from the backend directory, e.g.
+
+    python -m benchmarks.holdings
+
+Settings are read at import time, so throwaway values are filled in for
+anything the environment does not set.
+"""
+
+import os
+
+for name, value in {
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "bench",
+    "DATABASE_URL": "sqlite+aiosqlite:///:memory:",
+    "JWT_SECRET_KEY": "bench-secret",
+    "JWT_REFRESH_SECRET_KEY": "bench-refresh-secret",
+    "GOOGLE_CLIENT_ID": "bench-client",
+    "GOOGLE_CLIENT_SECRET": "bench-client-secret",
+    "GOOGLE_REDIRECT_URI": "http://localhost/callback",
+    "FRONTEND_URL": "http://localhost:3000",
+    "RATE_LIMIT_ENABLED": "false",
+}.items():
+    os.environ.setdefault(name, value)
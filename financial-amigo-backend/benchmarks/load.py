@@ -0,0 +1,128 @@
+"""
+Requests per second of a route on a blocking session versus an AsyncSession.
+
+Both routes are `async def` and run the same query, which takes a few
+milliseconds in the database. The blocking one goes through a sync engine
+the way every router did before the move to async (the event loop waits on
+each query); the other awaits an AsyncSession, as get_db now provides.
+Many concurrent clients then show the throughput ceiling.
+
+    python -m benchmarks.load [--database-url URL] [--concurrency N]
+
+By default a temporary SQLite file is used, with a registered sleep()
+standing in for the slow query. A postgresql:// URL uses pg_sleep instead.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+
+def drivers(url: str):
+    """(sync URL, async URL, slow query) for a database URL."""
+    if url.startswith("postgres"):
+        rest = url.split("://", 1)[1]
+        return (
+            f"postgresql+psycopg2://{rest}",
+            f"postgresql+asyncpg://{rest}",
+            "SELECT pg_sleep(:seconds)",
+        )
+    return (
+        url,
+        url.replace("sqlite://", "sqlite+aiosqlite://", 1),
+        "SELECT sleep(:seconds)",
+    )
+
+
+def register_sleep(engine) -> None:
+    @event.listens_for(engine, "connect")
+    def connect(connection, _):
+        connection.create_function("sleep", 1, time.sleep)
+
+
+def build_app(url: str, query_seconds: float, pool_size: int) -> FastAPI:
+    sync_url, async_url, slow_query = drivers(url)
+    sync_engine = create_engine(sync_url, pool_size=pool_size)
+    async_engine = create_async_engine(async_url, pool_size=pool_size)
+    if sync_url.startswith("sqlite"):
+        register_sleep(sync_engine)
+        register_sleep(async_engine.sync_engine)
+
+    SyncSession = sessionmaker(bind=sync_engine)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    statement = text(slow_query).bindparams(seconds=query_seconds)
+
+    @app.get("/blocking")
+    async def blocking(db: Session = Depends(get_sync_db)):
+        db.execute(statement)
+        return {"ok": True}
+
+    @app.get("/async")
+    async def non_blocking(db: AsyncSession = Depends(get_async_db)):
+        await db.execute(statement)
+        return {"ok": True}
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, concurrency: int, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        await client.get(path)
+        queue = iter(range(requests))
+
+        async def worker():
+            for _ in queue:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--query-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{os.path.join(directory, 'load.db')}"
+        app = build_app(url, args.query_ms / 1000, pool_size=args.concurrency)
+        print(
+            f"{args.requests} requests, {args.concurrency} concurrent, "
+            f"{args.query_ms:g} ms query"
+        )
+        for path in ("/blocking", "/async"):
+            rate = await measure(app, path, args.concurrency, args.requests)
+            print(f"  {path:<10} {rate:8.1f} requests/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
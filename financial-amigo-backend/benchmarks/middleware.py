@@ -0,0 +1,77 @@
+"""
+Latency of the security headers middleware, old and new.
+
+The old middleware was an `@app.middleware("http")` function, i.e.
+Starlette's BaseHTTPMiddleware; the new one is the pure ASGI
+SecurityHeadersMiddleware. Requests go in process through httpx's ASGI
+transport, for a small JSON response and a 100 KB streamed one.
+
+    python -m benchmarks.middleware
+"""
+
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from app.core.security_headers import SecurityHeadersMiddleware, security_headers
+
+
+def add_base_http_middleware(app: FastAPI) -> None:
+    """The middleware as it was before the pure ASGI rewrite."""
+    headers = {name.decode(): value.decode() for name, value in security_headers()}
+
+    @app.middleware("http")
+    async def add_security_headers(request, call_next):
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
+
+
+def build_app(pure_asgi: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(1000):
+                yield b"x" * 100
+
+        return StreamingResponse(chunks())
+
+    if pure_asgi:
+        app.add_middleware(SecurityHeadersMiddleware)
+    else:
+        add_base_http_middleware(app)
+    return app
+
+
+async def latency(app: FastAPI, path: str, requests: int) -> float:
+    """Mean microseconds per sequential request."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        response = await client.get(path)
+        assert response.headers["x-frame-options"] == "DENY"
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get(path)
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main() -> None:
+    for path, requests in (("/small", 3000), ("/stream", 300)):
+        for name, pure_asgi in (("BaseHTTPMiddleware", False), ("pure ASGI", True)):
+            micros = await latency(build_app(pure_asgi), path, requests)
+            print(f"{path:<8} {name:<19} {micros:9.1f} us/request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
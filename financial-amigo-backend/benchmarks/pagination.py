@@ -0,0 +1,113 @@
+"""
+Page latency of GET /api/transactions by how far back the page is.
+
+Times the keyset query list_transactions runs, a page of 50 after a
+(date, id) cursor, against the same page fetched with OFFSET and against
+the old unpaginated query that read the whole history. All three read
+from a temporary SQLite database with the model's indexes.
+
+    python -m benchmarks.pagination [--rows N]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import event, insert, select, tuple_
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import app.models  # noqa: F401
+from app.api.transactions import RESPONSE_COLUMNS
+from app.core.database import Base
+from app.models.account import Currency
+from app.models.transaction import Transaction, TransactionType
+
+PAGE_SIZE = 50
+DEPTHS = (0, 1_000, 10_000, 50_000, 99_000)
+ORDER = (Transaction.date.desc(), Transaction.id.desc())
+
+
+async def timed(connection, query, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows = (await connection.execute(query)).all()
+    return (time.perf_counter() - start) / repeat, rows
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = create_async_engine(url)
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def connect(connection, _):
+            now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+            connection.create_function("now", 0, lambda: now)
+
+        account_id = uuid4()
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.execute(
+                insert(Transaction),
+                [
+                    {
+                        "id": uuid4(),
+                        "account_id": account_id,
+                        # Several rows a day, so cursors land inside a date
+                        "date": date(2000, 1, 1) + timedelta(days=i // 8),
+                        "symbol": f"S{i % 50}",
+                        "quantity": 10.0,
+                        "price_native": 100.5,
+                        "commission_native": 4.95,
+                        "currency": Currency.CAD,
+                        "type": TransactionType.BUY,
+                        "description": None,
+                        "total_native": 1009.95,
+                    }
+                    for i in range(args.rows)
+                ],
+            )
+
+        base = (
+            select(*RESPONSE_COLUMNS)
+            .where(Transaction.account_id == account_id)
+            .order_by(*ORDER)
+        )
+        async with engine.connect() as connection:
+            everything, rows = await timed(connection, base, 1)
+            print(f"whole history ({len(rows)} rows): {everything * 1000:.1f} ms")
+            print(f"{'depth':>8} {'keyset':>10} {'offset':>10}")
+            for depth in DEPTHS:
+                if depth >= len(rows):
+                    continue
+                if depth:
+                    last = rows[depth - 1]
+                    keyset = base.where(
+                        tuple_(Transaction.date, Transaction.id) < (last.date, last.id)
+                    )
+                else:
+                    keyset = base
+                by_cursor, page = await timed(
+                    connection, keyset.limit(PAGE_SIZE), args.repeat
+                )
+                by_offset, same = await timed(
+                    connection, base.offset(depth).limit(PAGE_SIZE), args.repeat
+                )
+                assert page == same == rows[depth : depth + PAGE_SIZE]
+                print(
+                    f"{depth:>8} {by_cursor * 1000:7.2f} ms {by_offset * 1000:7.2f} ms"
+                )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
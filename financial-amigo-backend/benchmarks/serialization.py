@@ -0,0 +1,128 @@
+"""
+Loading and serializing a page of 10k transactions, end to end.
+
+The old path loaded ORM entities, built TransactionResponse objects with
+from_orm and let FastAPI validate them against the response model and
+encode them with the stdlib JSON encoder. The new path, used by
+list_transactions, selects the response columns as plain rows and renders
+them with FastJSONResponse (orjson). Both routes sit behind the same gzip
+middleware and read from a temporary SQLite database.
+
+    python -m benchmarks.serialization [--rows N]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+
+import httpx
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401
+from app.api.transactions import RESPONSE_COLUMNS
+from app.core.database import Base
+from app.core.responses import FastJSONResponse
+from app.models.account import Currency
+from app.models.transaction import Transaction, TransactionType
+from app.schemas.transaction import TransactionPage, TransactionResponse
+
+ORDER = (Transaction.date.desc(), Transaction.id.desc())
+
+
+async def create_database(url: str, rows: int):
+    engine = create_async_engine(url)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def connect(connection, _):
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+        connection.create_function("now", 0, lambda: now)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        account_id = uuid4()
+        await connection.execute(
+            insert(Transaction),
+            [
+                {
+                    "id": uuid4(),
+                    "account_id": account_id,
+                    "date": date(2020, 1, 1) + timedelta(days=i % 1500),
+                    "symbol": f"S{i % 50}",
+                    "quantity": 10.0,
+                    "price_native": 100.5,
+                    "commission_native": 4.95,
+                    "currency": Currency.CAD,
+                    "type": TransactionType.BUY,
+                    "description": None,
+                    "total_native": 1009.95,
+                }
+                for i in range(rows)
+            ],
+        )
+    return engine
+
+
+def build_app(engine) -> FastAPI:
+    sessions = async_sessionmaker(engine, class_=AsyncSession)
+    api = FastAPI()
+    api.add_middleware(GZipMiddleware, minimum_size=1000)
+
+    @api.get("/before", response_model=TransactionPage)
+    async def before():
+        async with sessions() as db:
+            result = await db.execute(select(Transaction).order_by(*ORDER))
+            items = [TransactionResponse.from_orm(t) for t in result.scalars().all()]
+        return TransactionPage(items=items, next_cursor=None)
+
+    @api.get("/after", response_model=TransactionPage)
+    async def after():
+        async with sessions() as db:
+            result = await db.execute(select(*RESPONSE_COLUMNS).order_by(*ORDER))
+            rows = result.all()
+        return FastJSONResponse(
+            {"items": [row._asdict() for row in rows], "next_cursor": None}
+        )
+
+    return api
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = await create_database(url, args.rows)
+        transport = httpx.ASGITransport(app=build_app(engine))
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://b"
+        ) as client:
+            bodies = {}
+            for path in ("/before", "/after"):
+                response = await client.get(path)
+                bodies[path] = response.json()
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    response = await client.get(path)
+                elapsed = (time.perf_counter() - start) / args.repeat
+                raw = len(response.content)
+                sent = response.num_bytes_downloaded
+                print(
+                    f"{path:<8} {elapsed * 1000:7.1f} ms  "
+                    f"{raw / 1e6:.2f} MB JSON, {sent / 1e6:.2f} MB gzipped"
+                )
+        assert bodies["/before"] == bodies["/after"]
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
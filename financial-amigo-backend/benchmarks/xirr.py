@@ -0,0 +1,57 @@
+"""
+Solve time of the batched XIRR solver by account count.
+
+Each account has 250 cash flows over ten years. The batched time is one
+`xirr` call over every account; the one-at-a-time time calls it per
+account (extrapolated from the first 200 for large counts).
+
+    python -m benchmarks.xirr [--flows N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.services.returns import xirr
+
+ACCOUNT_COUNTS = (1, 10, 100, 1_000, 10_000)
+
+# Accounts solved one at a time before extrapolating
+SCALAR_SAMPLE = 200
+
+
+def cash_flows(rng, accounts: int, flows: int):
+    """Purchases at random times and a final value returning 0.8x to 3x."""
+    times = np.sort(rng.uniform(0, 10, (accounts, flows)), axis=1)
+    times[:, 0] = 0.0
+    amounts = -rng.uniform(10, 100, (accounts, flows))
+    amounts[:, -1] = -amounts[:, :-1].sum(axis=1) * rng.uniform(0.8, 3.0, accounts)
+    return amounts, times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--flows", type=int, default=250)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'accounts':>8} {'batched':>12} {'one at a time':>15}")
+    for accounts in ACCOUNT_COUNTS:
+        amounts, times = cash_flows(rng, accounts, args.flows)
+
+        start = time.perf_counter()
+        rates = xirr(amounts, times)
+        batched = time.perf_counter() - start
+
+        sample = min(accounts, SCALAR_SAMPLE)
+        start = time.perf_counter()
+        single = [xirr(amounts[i : i + 1], times[i : i + 1]) for i in range(sample)]
+        scalar = (time.perf_counter() - start) * accounts / sample
+
+        assert np.allclose(np.concatenate(single), rates[:sample], equal_nan=True)
+        print(f"{accounts:>8} {batched * 1000:9.1f} ms {scalar * 1000:12.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import os
+
+# Settings are read at import time; point them at throwaway values
+os.environ.setdefault("POSTGRES_USER", "test")
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+os.environ.setdefault("POSTGRES_SERVER", "localhost")
+os.environ.setdefault("POSTGRES_PORT", "5432")
+os.environ.setdefault("POSTGRES_DB", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("JWT_REFRESH_SECRET_KEY", "test-refresh-secret")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-client")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("GOOGLE_REDIRECT_URI", "http://localhost/callback")
+os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import pytest  # noqa: E402
+from sqlalchemy import Date  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.sql.expression import Cast  # noqa: E402
+
+
+@compiles(Cast, "sqlite")
+def cast_on_sqlite(element, compiler, **kw):
+    # SQLite casts ISO date text to DATE as a number (2024); leave it as text
+    if isinstance(element.type, Date):
+        return compiler.process(element.clause, **kw)
+    return compiler.visit_cast(element, **kw)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db(tmp_path):
+    """Session on a fresh SQLite database with every table created."""
+    from datetime import datetime, timezone
+
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import (
+        AsyncSession,
+        async_sessionmaker,
+        create_async_engine,
+    )
+
+    import app.models  # noqa: F401
+    from app.core.database import Base
+    from app.services.fx import rate_cache
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    # Postgres fixes now() for a whole transaction; here, for the whole test
+    started_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def register_functions(connection, _):
+        connection.create_function("now", 0, lambda: started_at)
+        # Postgres spellings of SQLite's scalar min() and max()
+        connection.create_function("least", 2, min)
+        connection.create_function("greatest", 2, max)
+        # date_trunc('month', date), for dates stored as ISO text
+        connection.create_function(
+            "date_trunc", 2, lambda unit, value: value[:8] + "01"
+        )
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    # Rate series loaded from another test's database must not leak in
+    rate_cache.clear()
+    async with async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+async def account(db):
+    """A non-registered CAD account owned by a fresh user."""
+    from app.models.account import Account, AccountType, Currency
+    from app.models.user import User
+
+    user = User(email="owner@example.com", name="Owner", google_id="google-owner")
+    db.add(user)
+    await db.flush()
+    account = Account(
+        name="Brokerage",
+        type=AccountType.NON_REGISTERED,
+        currency=Currency.CAD,
+        user_id=user.id,
+    )
+    db.add(account)
+    await db.commit()
+    return account
+
+
+@pytest.fixture
+async def client(db, account):
+    """HTTP client for the app, signed in as the account's owner on `db`."""
+    import httpx
+
+    from app.core.auth import get_current_user
+    from app.core.database import get_db
+    from app.main import app
+    from app.models.user import User
+
+    user = await db.get(User, account.user_id)
+
+    async def session():
+        yield db
+
+    app.dependency_overrides[get_db] = session
+    app.dependency_overrides[get_current_user] = lambda: user
+    # Unhandled errors come back as 500s, as they would from a server
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+        base_url="http://test",
+    ) as client:
+        yield client
+    app.dependency_overrides.clear()
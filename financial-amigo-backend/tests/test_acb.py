@@ -0,0 +1,53 @@
+from datetime import date
+
+import pytest
+
+from app.models.account import Currency
+from app.models.transaction import Transaction, TransactionType
+from app.services.acb import get_dispositions, refresh_acb
+from app.services.fx import FxProvider, FxRateError
+from app.services.positions import apply_transaction
+
+pytestmark = pytest.mark.anyio
+
+
+class FailingFxProvider(FxProvider):
+    async def fetch_rates(self, pair, start, end):
+        raise ConnectionError("provider unreachable")
+
+
+async def add(db, account, day, type, quantity, price, currency=Currency.CAD):
+    transaction = Transaction(
+        account_id=account.id,
+        date=day,
+        symbol="VFV",
+        type=type,
+        quantity=quantity,
+        price_native=price,
+        commission_native=1.0,
+        currency=currency,
+    )
+    db.add(transaction)
+    await apply_transaction(db, transaction)
+    await db.commit()
+
+
+async def test_gains_use_average_cost(db, account):
+    await add(db, account, date(2024, 1, 2), TransactionType.BUY, 10, 100)
+    await add(db, account, date(2024, 2, 1), TransactionType.BUY, 10, 130)
+    await add(db, account, date(2024, 3, 1), TransactionType.SELL, 5, 150)
+    await refresh_acb(db, FailingFxProvider(), account.id)
+    await db.commit()
+
+    (sale,) = await get_dispositions(
+        db, account.id, date(2024, 1, 1), date(2024, 12, 31)
+    )
+    assert sale.cost == pytest.approx(5 * 2302 / 20)
+    assert sale.proceeds == pytest.approx(749.0)
+    assert sale.gain == pytest.approx(749.0 - 5 * 2302 / 20)
+
+
+async def test_provider_failure_is_a_rate_error(db, account):
+    await add(db, account, date(2024, 1, 2), TransactionType.BUY, 10, 100, Currency.USD)
+    with pytest.raises(FxRateError):
+        await refresh_acb(db, FailingFxProvider(), account.id)
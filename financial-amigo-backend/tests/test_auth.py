@@ -0,0 +1,149 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import JWTError
+
+from app.core import auth
+from app.core.auth import create_token, get_current_user, verified_tokens, verify_token
+from app.core.keys import KeySet, load_public_keys
+
+pytestmark = pytest.mark.anyio
+
+
+def rsa_key_pair():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public = (
+        key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+    return private, public
+
+
+def claims(token_type="access", expires_in=timedelta(minutes=5)):
+    return {
+        "sub": "owner@example.com",
+        "exp": datetime.utcnow() + expires_in,
+        "type": token_type,
+    }
+
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    verified_tokens.clear()
+    yield
+    verified_tokens.clear()
+
+
+@pytest.fixture
+def rotated_keys(tmp_path, monkeypatch):
+    """Asymmetric keysets whose public keys live in a directory."""
+    (old_private, old_public), (new_private, new_public) = (
+        rsa_key_pair(),
+        rsa_key_pair(),
+    )
+    (tmp_path / "old.pem").write_text(old_public)
+
+    def install(private, kid):
+        keyset = KeySet("RS256", private, load_public_keys(tmp_path), kid)
+        monkeypatch.setitem(auth.keysets, "access", keyset)
+        monkeypatch.setitem(auth.keysets, "refresh", keyset)
+        return keyset
+
+    install(old_private, "old")
+    return tmp_path, install, (old_private, new_private, new_public)
+
+
+async def test_valid_token():
+    token = create_token("owner@example.com", "access")
+    assert await verify_token(token, "access") == "owner@example.com"
+    # Served from the cache the second time
+    hits = verified_tokens.hits
+    assert await verify_token(token, "access") == "owner@example.com"
+    assert verified_tokens.hits == hits + 1
+
+
+async def test_wrong_key_is_rejected():
+    forged = KeySet("HS256", "not-the-secret", {None: "not-the-secret"})
+    assert await verify_token(forged.sign(claims()), "access") is None
+
+
+async def test_expired_token_is_rejected():
+    token = auth.keysets["access"].sign(claims(expires_in=timedelta(seconds=-1)))
+    assert await verify_token(token, "access") is None
+
+
+async def test_cached_token_stops_validating_at_expiry():
+    expires_at = int(time.time()) + 1
+    token = auth.keysets["access"].sign({**claims(), "exp": expires_at})
+    assert await verify_token(token, "access") == "owner@example.com"
+    assert verified_tokens.get(("access", token)) == "owner@example.com"
+
+    await asyncio.sleep(expires_at - time.time() + 0.05)
+    assert verified_tokens.get(("access", token)) is None
+    # exp is checked to the whole second
+    await asyncio.sleep(1)
+    assert await verify_token(token, "access") is None
+
+
+async def test_token_without_expiry_is_rejected():
+    token = auth.keysets["access"].sign({"sub": "owner@example.com", "type": "access"})
+    assert await verify_token(token, "access") is None
+    with pytest.raises(HTTPException) as error:
+        await get_current_user(token, db=None)
+    assert error.value.status_code == 401
+
+
+async def test_access_token_is_not_a_refresh_token(rotated_keys):
+    # Both types share one key here, so only the type claim tells them apart
+    access = create_token("owner@example.com", "access")
+    refresh = create_token("owner@example.com", "refresh")
+    assert await verify_token(access, "access") == "owner@example.com"
+    assert await verify_token(access, "refresh") is None
+    assert await verify_token(refresh, "refresh") == "owner@example.com"
+    assert await verify_token(refresh, "access") is None
+
+
+async def test_access_token_is_not_a_refresh_token_with_hmac():
+    access = create_token("owner@example.com", "access")
+    assert await verify_token(access, "refresh") is None
+
+
+async def test_unknown_kid_is_rejected(rotated_keys):
+    _, _, (_, new_private, _) = rotated_keys
+    stranger = KeySet("RS256", new_private, {}, "stranger")
+    with pytest.raises(JWTError):
+        auth.keysets["access"].verify(stranger.sign(claims()))
+    assert await verify_token(stranger.sign(claims()), "access") is None
+
+
+async def test_key_rotation(rotated_keys):
+    directory, install, (_, new_private, new_public) = rotated_keys
+    old_token = create_token("owner@example.com", "access")
+
+    # New public key everywhere first, then sign with the new key
+    (directory / "new.pem").write_text(new_public)
+    install(new_private, "new")
+    new_token = create_token("owner@example.com", "access")
+    assert await verify_token(old_token, "access") == "owner@example.com"
+    assert await verify_token(new_token, "access") == "owner@example.com"
+
+    # Retiring the old key stops its tokens from verifying
+    (directory / "old.pem").unlink()
+    install(new_private, "new")
+    verified_tokens.clear()
+    assert await verify_token(old_token, "access") is None
+    assert await verify_token(new_token, "access") == "owner@example.com"
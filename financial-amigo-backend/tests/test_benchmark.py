@@ -0,0 +1,88 @@
+from datetime import date
+
+import pytest
+
+from app.models.account import Currency
+from app.models.transaction import Transaction, TransactionType
+from app.services.benchmark import get_benchmark_comparison
+from app.services.fx.base import FxProvider
+from app.services.market_data.base import PriceProvider
+
+pytestmark = pytest.mark.anyio
+
+# Neither A.TO nor the benchmark has a close on March 6
+CLOSES = {
+    "A.TO": {4: 10.0, 5: 11.0, 7: 12.0, 8: 13.0},
+    "B.TO": {6: 20.0, 7: 21.0, 8: 19.0},
+    "XIU.TO": {4: 100.0, 5: 110.0, 7: 100.0, 8: 125.0},
+}
+
+
+class FixedPriceProvider(PriceProvider):
+    async def fetch_prices(self, symbols):
+        return {}
+
+    async def fetch_history(self, symbols, start, end):
+        return {
+            symbol: [
+                (date(2024, 3, day), close)
+                for day, close in CLOSES[symbol].items()
+                if start <= date(2024, 3, day) <= end
+            ]
+            for symbol in symbols
+        }
+
+
+class UnusedFxProvider(FxProvider):
+    async def fetch_rates(self, pair, start, end):
+        raise AssertionError("everything is in CAD")
+
+
+def trade(account, day, symbol, type, quantity, price):
+    return Transaction(
+        account_id=account.id,
+        date=date(2024, 3, day),
+        symbol=symbol,
+        type=type,
+        quantity=quantity,
+        price_native=price,
+        commission_native=0.0,
+        total_native=quantity * price,
+        currency=account.currency,
+    )
+
+
+async def test_benchmark_replays_flows_at_forward_filled_closes(db, account):
+    db.add_all(
+        [
+            trade(account, 4, "A.TO", TransactionType.BUY, 10, 10.0),
+            trade(account, 6, "B.TO", TransactionType.BUY, 5, 20.0),
+            trade(account, 7, "A.TO", TransactionType.SELL, 4, 12.0),
+        ]
+    )
+    await db.flush()
+
+    comparison = await get_benchmark_comparison(
+        db,
+        FixedPriceProvider(),
+        UnusedFxProvider(),
+        account.user_id,
+        Currency.CAD,
+        "xiu.to",
+        start=date(2024, 3, 5),
+        end=date(2024, 3, 8),
+    )
+
+    assert comparison.symbol == "XIU.TO"
+    assert comparison.dates == [date(2024, 3, day) for day in (5, 6, 7, 8)]
+    # Mar 6 values A.TO at its Mar 5 close of 11
+    assert comparison.portfolio == pytest.approx(
+        [10 * 11, 10 * 11 + 5 * 20, 6 * 12 + 5 * 21, 6 * 13 + 5 * 19]
+    )
+    # The opening 100 buys 1 unit at 100; the 100 spent on Mar 6 buys 10/11
+    # of a unit at the forward-filled 110; the 48 from the sale sells 0.48
+    units = [1.0, 1.0 + 10 / 11, 1.0 + 10 / 11 - 0.48, 1.0 + 10 / 11 - 0.48]
+    closes = [110.0, 110.0, 100.0, 125.0]
+    assert comparison.benchmark == pytest.approx(
+        [unit * close for unit, close in zip(units, closes)]
+    )
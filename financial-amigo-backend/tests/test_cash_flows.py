@@ -0,0 +1,167 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.api import analysis
+from app.main import app
+from app.models.account import Currency
+from app.models.cash_flow import CashFlowDay
+from app.models.transaction import Transaction, TransactionType
+from app.services.cash_flows import (
+    TOTAL_FIELDS,
+    latest_totals,
+    rebuild_cash_flows,
+    transaction_deltas,
+)
+from app.services.market_data import PriceProvider, get_price_provider
+from app.services.positions import (
+    apply_transaction,
+    position_key,
+    recompute_positions,
+)
+
+pytestmark = pytest.mark.anyio
+
+FIRST_DAY = date(2024, 1, 1)
+SYMBOLS = ("VFV", "XEQT", "AAPL")
+
+
+def naive_totals(transactions, symbol, start, end):
+    """Totals of one group over [start, end] from a full scan."""
+    totals = dict.fromkeys(TOTAL_FIELDS, 0.0)
+    for transaction in transactions:
+        if transaction.symbol == symbol and start <= transaction.date <= end:
+            for field, delta in transaction_deltas(transaction).items():
+                totals[field] += delta
+    return totals
+
+
+async def indexed_totals(db, account_id, symbol, start, end):
+    """Totals of one group over [start, end] from two index rows."""
+    through = await latest_totals(db, account_id, symbol, end + timedelta(days=1))
+    before = await latest_totals(db, account_id, symbol, start)
+    return {
+        field: (getattr(through, field) if through else 0.0)
+        - (getattr(before, field) if before else 0.0)
+        for field in TOTAL_FIELDS
+    }
+
+
+async def assert_index_matches(db, account_id, rng):
+    transactions = (await db.execute(select(Transaction))).scalars().all()
+    rows = (await db.execute(select(CashFlowDay))).scalars().all()
+
+    # One row per day with activity, holding the totals through that day
+    active = {(t.symbol, t.date) for t in transactions}
+    assert {(row.symbol, row.date) for row in rows} == active
+    for row in rows:
+        expected = naive_totals(transactions, row.symbol, date.min, row.date)
+        for field in TOTAL_FIELDS:
+            assert getattr(row, field) == pytest.approx(expected[field], abs=1e-6)
+
+    for _ in range(20):
+        start = FIRST_DAY + timedelta(days=rng.randrange(400))
+        end = start + timedelta(days=rng.randrange(200))
+        for symbol in SYMBOLS:
+            expected = naive_totals(transactions, symbol, start, end)
+            actual = await indexed_totals(db, account_id, symbol, start, end)
+            assert actual == pytest.approx(expected, abs=1e-6)
+
+
+def random_trade(rng, account_id):
+    type = rng.choice(list(TransactionType))
+    return Transaction(
+        account_id=account_id,
+        date=FIRST_DAY + timedelta(days=rng.randrange(365)),
+        symbol=rng.choice(SYMBOLS),
+        type=type,
+        quantity=0.0 if type == TransactionType.DIVIDEND else rng.randint(1, 20),
+        price_native=round(rng.uniform(1, 200), 2),
+        commission_native=rng.choice([0.0, 4.95]),
+        currency=Currency.CAD,
+    )
+
+
+async def test_index_follows_every_kind_of_write(db, account):
+    rng = random.Random(24)
+    transactions = []
+    for step in range(120):
+        action = rng.random() if transactions else 0.0
+        if action < 0.5:
+            # Create, often back-dated
+            transaction = random_trade(rng, account.id)
+            db.add(transaction)
+            await apply_transaction(db, transaction)
+            transactions.append(transaction)
+        elif action < 0.85:
+            # Edit the date and amount, sometimes moving it to another symbol
+            transaction = rng.choice(transactions)
+            previous_key, previous_date = position_key(transaction), transaction.date
+            transaction.date = FIRST_DAY + timedelta(days=rng.randrange(365))
+            transaction.price_native = round(rng.uniform(1, 200), 2)
+            if rng.random() < 0.4:
+                transaction.symbol = rng.choice(SYMBOLS)
+            transaction.total_native = transaction.calculated_total_native
+            changes = {previous_key: previous_date}
+            key = position_key(transaction)
+            changes[key] = min(changes.get(key, transaction.date), transaction.date)
+            await recompute_positions(db, changes)
+        else:
+            transaction = transactions.pop(rng.randrange(len(transactions)))
+            await db.delete(transaction)
+            await recompute_positions(db, {position_key(transaction): transaction.date})
+        await db.commit()
+
+        if step % 10 == 9:
+            await assert_index_matches(db, account.id, rng)
+
+
+async def test_rebuild_from_midpoint_matches_full_rebuild(db, account):
+    rng = random.Random(7)
+    for _ in range(60):
+        transaction = random_trade(rng, account.id)
+        db.add(transaction)
+        await apply_transaction(db, transaction)
+    await db.commit()
+
+    for symbol in SYMBOLS:
+        await rebuild_cash_flows(db, account.id, symbol, date(2024, 7, 1))
+    await db.commit()
+    await assert_index_matches(db, account.id, rng)
+
+    for symbol in SYMBOLS:
+        await rebuild_cash_flows(db, account.id, symbol, date.min)
+    await db.commit()
+    await assert_index_matches(db, account.id, rng)
+
+
+class FailingPriceProvider(PriceProvider):
+    async def fetch_prices(self, symbols):
+        raise ConnectionError("provider unreachable")
+
+    async def fetch_history(self, symbols, start, end):
+        raise ConnectionError("provider unreachable")
+
+
+async def test_provider_failure_is_a_bad_gateway(client, db, account):
+    transaction = random_trade(random.Random(1), account.id)
+    transaction.type = TransactionType.BUY
+    transaction.quantity = 5
+    db.add(transaction)
+    await apply_transaction(db, transaction)
+    await db.commit()
+
+    app.dependency_overrides[get_price_provider] = FailingPriceProvider
+    response = await client.get("/api/analysis?start=2024-01-01&end=2024-12-31")
+    assert response.status_code == 502
+
+
+async def test_other_errors_are_not_reported_as_upstream(client, monkeypatch):
+    async def broken(*args, **kwargs):
+        raise RuntimeError("bug")
+
+    monkeypatch.setattr(analysis, "get_analysis", broken)
+    response = await client.get("/api/analysis?start=2024-01-01&end=2024-12-31")
+    assert response.status_code == 500
@@ -0,0 +1,132 @@
+from datetime import date
+
+import pytest
+
+from app.api import dividends
+from app.main import app
+from app.models.account import Account, AccountType, Currency
+from app.models.transaction import Transaction, TransactionType
+from app.models.user import User
+from app.services.dividends import get_dividend_summary
+from app.services.fx import FxProvider, get_fx_provider
+
+pytestmark = pytest.mark.anyio
+
+
+class DailyFxProvider(FxProvider):
+    """USDCAD of 1.30 plus a hundredth per day of the month."""
+
+    async def fetch_rates(self, pair, start, end):
+        days = (end - start).days + 1
+        return [
+            (day, 1.30 + day.day / 100)
+            for day in (date.fromordinal(start.toordinal() + i) for i in range(days))
+        ]
+
+
+class FailingFxProvider(FxProvider):
+    async def fetch_rates(self, pair, start, end):
+        raise ConnectionError("provider unreachable")
+
+
+def dividend(account, day, symbol, amount, currency=Currency.CAD):
+    return Transaction(
+        account_id=account.id,
+        date=day,
+        symbol=symbol,
+        type=TransactionType.DIVIDEND,
+        quantity=0,
+        price_native=amount,
+        commission_native=0.0,
+        currency=currency,
+    )
+
+
+@pytest.fixture
+async def paid(db, account):
+    other_user = User(email="other@example.com", name="Other", google_id="other")
+    db.add(other_user)
+    await db.flush()
+    other = Account(
+        name="Other",
+        type=AccountType.TFSA,
+        currency=Currency.CAD,
+        user_id=other_user.id,
+    )
+    db.add(other)
+    await db.flush()
+    db.add_all(
+        [
+            dividend(account, date(2024, 1, 10), "VFV", 5.0),
+            dividend(account, date(2024, 1, 25), "VFV", 7.0),
+            dividend(account, date(2024, 2, 12), "VFV", 6.0),
+            dividend(account, date(2024, 1, 5), "AAPL", 10.0, Currency.USD),
+            dividend(account, date(2024, 1, 20), "AAPL", 20.0, Currency.USD),
+            dividend(account, date(2025, 3, 3), "AAPL", 4.0, Currency.USD),
+            # Someone else's
+            dividend(other, date(2024, 1, 10), "VFV", 100.0),
+        ]
+    )
+    await db.commit()
+
+
+async def test_grouped_by_symbol_and_month(db, account, paid):
+    summary = await get_dividend_summary(
+        db, DailyFxProvider(), account.user_id, Currency.CAD
+    )
+
+    # Each USD group is converted at its latest payment's rate
+    assert [
+        (row.symbol, row.month, pytest.approx(row.amount), row.payments)
+        for row in summary.history
+    ] == [
+        ("AAPL", date(2024, 1, 1), 30 * 1.50, 2),
+        ("VFV", date(2024, 1, 1), 12.0, 2),
+        ("VFV", date(2024, 2, 1), 6.0, 1),
+        ("AAPL", date(2025, 3, 1), 4 * 1.33, 1),
+    ]
+    assert [(row.symbol, row.payments) for row in summary.by_symbol] == [
+        ("AAPL", 3),
+        ("VFV", 3),
+    ]
+    assert summary.by_symbol[0].amount == pytest.approx(45.0 + 5.32)
+    assert [(row.month, pytest.approx(row.amount)) for row in summary.by_month] == [
+        (date(2024, 1, 1), 57.0),
+        (date(2024, 2, 1), 6.0),
+        (date(2025, 3, 1), 5.32),
+    ]
+    assert [(row.year, pytest.approx(row.amount)) for row in summary.by_year] == [
+        (2024, 63.0),
+        (2025, 5.32),
+    ]
+    assert summary.total == pytest.approx(68.32)
+
+
+async def test_date_range_is_applied_before_grouping(db, account, paid):
+    summary = await get_dividend_summary(
+        db,
+        DailyFxProvider(),
+        account.user_id,
+        Currency.CAD,
+        start=date(2024, 1, 15),
+        end=date(2024, 1, 31),
+    )
+
+    assert [
+        (row.symbol, pytest.approx(row.amount), row.payments) for row in summary.history
+    ] == [("AAPL", 20 * 1.50, 1), ("VFV", 7.0, 1)]
+
+
+async def test_rate_failure_is_a_bad_gateway(client, paid):
+    app.dependency_overrides[get_fx_provider] = FailingFxProvider
+    response = await client.get("/api/dividends/summary")
+    assert response.status_code == 502
+
+
+async def test_other_errors_are_not_reported_as_upstream(client, monkeypatch):
+    async def broken(*args, **kwargs):
+        raise TypeError("bug")
+
+    monkeypatch.setattr(dividends, "get_dividend_summary", broken)
+    response = await client.get("/api/dividends/summary")
+    assert response.status_code == 500
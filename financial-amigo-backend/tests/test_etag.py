@@ -0,0 +1,58 @@
+import pytest
+from fastapi import FastAPI, Request, Response
+from starlette.testclient import TestClient
+
+from app.core.compression import setup_compression
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/items")
+    async def items(request: Request, response: Response):
+        etag = make_etag("items", 1)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        return {"items": ["x" * 100] * 100}
+
+    setup_compression(app)
+    return TestClient(app)
+
+
+def test_tags_are_weak():
+    etag = make_etag("items", 1)
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert make_etag("items", 1) == etag != make_etag("items", 2)
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+def test_same_weak_tag_for_every_coding(client, encoding):
+    response = client.get("/items", headers={"Accept-Encoding": encoding})
+    assert response.headers.get("content-encoding", "identity") == encoding
+    assert response.headers["etag"] == make_etag("items", 1)
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    [
+        'W/"{digest}"',
+        '"{digest}"',
+        '"other", W/"{digest}"',
+        "*",
+    ],
+)
+def test_revalidation(client, if_none_match):
+    digest = make_etag("items", 1)[3:-1]
+    response = client.get(
+        "/items", headers={"If-None-Match": if_none_match.format(digest=digest)}
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == make_etag("items", 1)
+
+
+def test_changed_resource_is_sent(client):
+    response = client.get("/items", headers={"If-None-Match": 'W/"stale"'})
+    assert response.status_code == 200
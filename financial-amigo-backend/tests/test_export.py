@@ -0,0 +1,142 @@
+import csv
+import io
+from datetime import date, timedelta
+
+import orjson
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.transactions import RESPONSE_COLUMNS
+from app.models.account import Account, AccountType, Currency
+from app.models.transaction import Transaction, TransactionType
+from app.models.user import User
+from app.services import export
+from app.services.export import stream_export
+
+pytestmark = pytest.mark.anyio
+
+BATCH_SIZE = 4
+HEADER = (",".join(column.key for column in RESPONSE_COLUMNS) + "\r\n").encode()
+
+
+@pytest.fixture(autouse=True)
+def export_sessions(db, monkeypatch):
+    """Export sessions on the test database, in small batches."""
+    monkeypatch.setattr(
+        export, "SessionLocal", async_sessionmaker(db.bind, class_=AsyncSession)
+    )
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", BATCH_SIZE)
+
+
+def buy(account, i):
+    return Transaction(
+        account_id=account.id,
+        date=date(2024, 1, 1) + timedelta(days=i),
+        symbol=f"S{i}",
+        type=TransactionType.BUY,
+        quantity=i + 1,
+        price_native=10.0 * (i + 1),
+        commission_native=0.0,
+        currency=Currency.CAD,
+        description=f'note, "{i}"',
+    )
+
+
+@pytest.fixture
+async def transactions(db, account):
+    """Ten of the user's transactions over two accounts, and a stranger's."""
+    second = Account(
+        name="TFSA",
+        type=AccountType.TFSA,
+        currency=Currency.CAD,
+        user_id=account.user_id,
+    )
+    stranger = User(email="stranger@example.com", name="Stranger", google_id="s")
+    db.add_all([second, stranger])
+    await db.flush()
+    theirs = Account(
+        name="Theirs",
+        type=AccountType.TFSA,
+        currency=Currency.CAD,
+        user_id=stranger.id,
+    )
+    db.add(theirs)
+    await db.flush()
+
+    mine = [buy(account, i) for i in range(7)] + [buy(second, i) for i in range(7, 10)]
+    db.add_all(mine + [buy(theirs, 20)])
+    await db.commit()
+    return sorted(mine, key=lambda t: (t.date, t.id)), second
+
+
+async def chunks(query, format):
+    return [chunk async for chunk in stream_export(query, format)]
+
+
+async def test_csv_spans_several_batches(transactions):
+    mine, _ = transactions
+    query = (
+        select(*RESPONSE_COLUMNS)
+        .where(Transaction.id.in_([t.id for t in mine]))
+        .order_by(Transaction.date, Transaction.id)
+    )
+
+    parts = await chunks(query, "csv")
+
+    assert len(parts) == 3
+    # Only the first chunk carries the header
+    assert parts[0].startswith(HEADER)
+    assert not any(HEADER in part for part in parts[1:])
+    rows = list(csv.DictReader(io.StringIO(b"".join(parts).decode())))
+    assert [row["id"] for row in rows] == [str(t.id) for t in mine]
+    assert rows[0]["description"] == 'note, "0"'
+
+
+async def test_ndjson_spans_several_batches(transactions):
+    mine, _ = transactions
+    query = (
+        select(*RESPONSE_COLUMNS)
+        .where(Transaction.id.in_([t.id for t in mine]))
+        .order_by(Transaction.date, Transaction.id)
+    )
+
+    parts = await chunks(query, "ndjson")
+
+    assert len(parts) == 3
+    lines = b"".join(parts).splitlines()
+    records = [orjson.loads(line) for line in lines]
+    assert [record["id"] for record in records] == [str(t.id) for t in mine]
+    assert records[-1]["quantity"] == mine[-1].quantity
+
+
+async def test_empty_csv_has_a_header(db):
+    query = select(*RESPONSE_COLUMNS).where(Transaction.symbol == "NONE")
+    assert (
+        b"".join(await chunks(query, "csv"))
+        == (",".join(column.key for column in RESPONSE_COLUMNS) + "\r\n").encode()
+    )
+    assert await chunks(query, "ndjson") == []
+
+
+@pytest.mark.parametrize("format", ["csv", "ndjson"])
+async def test_route_exports_only_the_users_transactions(client, transactions, format):
+    mine, second = transactions
+
+    response = await client.get("/api/transactions/export", params={"format": format})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(
+        export.EXPORT_MEDIA_TYPES[format]
+    )
+    if format == "csv":
+        ids = [row["id"] for row in csv.DictReader(io.StringIO(response.text))]
+    else:
+        ids = [orjson.loads(line)["id"] for line in response.text.splitlines()]
+    assert ids == [str(t.id) for t in mine]
+
+    response = await client.get(
+        "/api/transactions/export",
+        params={"format": format, "account_id": str(second.id)},
+    )
+    assert response.text.count("S7") == 1
+    assert "S0" not in response.text and "S20" not in response.text
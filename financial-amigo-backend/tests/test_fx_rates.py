@@ -0,0 +1,79 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import update
+
+from app.models.fx_rate import FxRateCoverage
+from app.services.fx.base import FxProvider
+from app.services.fx.rates import backfill_rates, load_series, store_rates
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeFxProvider(FxProvider):
+    """A rate of 1.35 on every weekday, recording each request."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def fetch_rates(self, pair, start, end):
+        self.calls.append((pair, start, end))
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        return [(day, 1.35) for day in days if day.weekday() < 5]
+
+
+async def test_backfill_widens_existing_coverage(db):
+    provider = FakeFxProvider()
+    await backfill_rates(db, provider, "USDCAD", date(2024, 3, 1), date(2024, 3, 31))
+    await backfill_rates(db, provider, "USDCAD", date(2024, 3, 10), date(2024, 3, 20))
+    await backfill_rates(db, provider, "USDCAD", date(2024, 2, 1), date(2024, 4, 30))
+    assert provider.calls == [
+        ("USDCAD", date(2024, 3, 1), date(2024, 3, 31)),
+        ("USDCAD", date(2024, 2, 1), date(2024, 2, 29)),
+        ("USDCAD", date(2024, 4, 1), date(2024, 4, 30)),
+    ]
+
+    coverage = await db.get(FxRateCoverage, "USDCAD")
+    await db.refresh(coverage)
+    assert (coverage.start_date, coverage.end_date) == (
+        date(2024, 2, 1),
+        date(2024, 4, 30),
+    )
+
+
+async def test_open_day_refetched_only_after_ttl(db):
+    provider = FakeFxProvider()
+    today = date.today()
+    start = today - timedelta(days=10)
+
+    await backfill_rates(db, provider, "USDCAD", start, today)
+    assert provider.calls == [("USDCAD", start, today)]
+    coverage = await db.get(FxRateCoverage, "USDCAD")
+    assert coverage.end_date == today - timedelta(days=1)
+    assert coverage.open_fetched_at is not None
+
+    # Within the TTL nothing is fetched again
+    await backfill_rates(db, provider, "USDCAD", start, today)
+    assert len(provider.calls) == 1
+
+    # Once the fetch is older than the TTL only today is asked for
+    await db.execute(
+        update(FxRateCoverage).values(open_fetched_at=datetime(2000, 1, 1))
+    )
+    await backfill_rates(db, provider, "USDCAD", start, today)
+    assert provider.calls[1:] == [("USDCAD", today, today)]
+    await backfill_rates(db, provider, "USDCAD", start, today)
+    assert len(provider.calls) == 2
+
+
+async def test_load_series_starts_from_latest_earlier_rate(db):
+    await store_rates(
+        db,
+        "USDCAD",
+        [(date(2024, 3, 1), 1.30), (date(2024, 3, 4), 1.31), (date(2024, 3, 8), 1.32)],
+    )
+
+    series = await load_series(db, "USDCAD", date(2024, 3, 6), date(2024, 3, 9))
+
+    np.testing.assert_array_equal(series.rates, [1.31, 1.31, 1.32, 1.32])
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+from app.core import google_certs
+from app.core.google_certs import CachingRequest, max_age
+
+CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+
+
+class StubResponse:
+    def __init__(self, data, cache_control="public, max-age=300", status=200):
+        self.status = status
+        self.headers = {"Cache-Control": cache_control}
+        self.data = data
+
+
+class StubTransport:
+    """Answers every request with the next body, counting calls."""
+
+    def __init__(self, cache_control="public, max-age=300", delay=0.0):
+        self.cache_control = cache_control
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None):
+        with self.lock:
+            self.calls += 1
+            data = f"certs-{self.calls}".encode()
+        time.sleep(self.delay)
+        return StubResponse(data, self.cache_control)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(google_certs.time, "monotonic", lambda: now[0])
+    return now
+
+
+def caching_request(transport, refresh_margin=60):
+    request = CachingRequest(refresh_margin=refresh_margin)
+    request._request = transport
+    return request
+
+
+@pytest.mark.parametrize(
+    "cache_control, expected",
+    [
+        ("public, max-age=19282, must-revalidate, no-transform", 19282),
+        ("MAX-AGE=5", 0),
+        ("max-age=60, no-cache", 0),
+        ("no-store", 0),
+        ("", 0),
+    ],
+)
+def test_max_age(cache_control, expected):
+    assert max_age({"cache-control": cache_control}) == expected
+
+
+def test_served_from_memory_until_max_age(clock):
+    transport = StubTransport(cache_control="max-age=300")
+    request = caching_request(transport, refresh_margin=0)
+
+    assert request(CERTS_URL).data == b"certs-1"
+    clock[0] += 299
+    assert request(CERTS_URL).data == b"certs-1"
+    clock[0] += 1
+    assert request(CERTS_URL).data == b"certs-2"
+    assert transport.calls == 2
+
+
+def test_uncacheable_responses_are_refetched():
+    transport = StubTransport(cache_control="no-cache")
+    request = caching_request(transport)
+    request(CERTS_URL)
+    request(CERTS_URL)
+    assert transport.calls == 2
+
+
+def test_concurrent_cold_misses_share_one_fetch():
+    transport = StubTransport(delay=0.05)
+    request = caching_request(transport)
+    results = []
+
+    def verify():
+        results.append(request(CERTS_URL).data)
+
+    threads = [threading.Thread(target=verify) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert transport.calls == 1
+    assert results == [b"certs-1"] * 20
+
+
+def test_refreshes_in_background_near_expiry(clock):
+    transport = StubTransport(cache_control="max-age=300")
+    request = caching_request(transport, refresh_margin=60)
+    assert request(CERTS_URL).data == b"certs-1"
+
+    # Inside the margin the current entry is served while a refresh runs
+    clock[0] += 250
+    assert request(CERTS_URL).data == b"certs-1"
+    deadline = time.time() + 5
+    while transport.calls < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    while request._refreshing and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert transport.calls == 2
+    assert request(CERTS_URL).data == b"certs-2"
+    # The refreshed entry's lifetime starts from the refresh
+    clock[0] += 200
+    assert request(CERTS_URL).data == b"certs-2"
+    assert transport.calls == 2
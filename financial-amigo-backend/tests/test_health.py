@@ -0,0 +1,28 @@
+import httpx
+import pytest
+
+from app.core.auth import user_cache
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_cache_stats_are_reported():
+    user_cache.get("nobody@example.com")
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/health/caches")
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert set(stats) == {"user_cache", "verified_tokens", "price_cache", "fx_rates"}
+    assert stats["user_cache"]["misses"] >= 1
+    assert set(stats["verified_tokens"]) == {"size", "hits", "misses"}
+    assert set(stats["price_cache"]) == {
+        "size",
+        "hits",
+        "misses",
+        "in_flight",
+        "upstream_calls",
+    }
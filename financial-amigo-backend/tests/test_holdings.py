@@ -0,0 +1,163 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.models.account import Currency
+from app.models.position import Position
+from app.models.transaction import TransactionType
+from app.services import holdings
+from app.services.fx.base import FxProvider
+from app.services.holdings import EPSILON, compute_positions, get_holdings
+
+BUY, SELL, DIVIDEND = (
+    TransactionType.BUY.value,
+    TransactionType.SELL.value,
+    TransactionType.DIVIDEND.value,
+)
+
+
+def reference_positions(groups):
+    """Average-cost positions folded one row at a time."""
+    results = []
+    for rows in groups:
+        quantity = cost = realized = dividends = 0.0
+        for kind, qty, price, commission, total in rows:
+            if kind == BUY:
+                quantity += qty
+                cost += qty * price + commission
+            elif kind == SELL:
+                average = cost / quantity if quantity > EPSILON else 0.0
+                realized += total - qty * average
+                quantity -= qty
+                cost -= qty * average
+                if abs(quantity) < EPSILON:
+                    quantity = 0.0
+                if quantity <= EPSILON:
+                    cost = 0.0
+            else:
+                dividends += total
+        results.append((quantity, cost, realized, dividends))
+    return results
+
+
+def vectorized_positions(groups):
+    rows = [row for group in groups for row in group]
+    group_starts = np.zeros(len(rows), dtype=bool)
+    group_starts[np.cumsum([0] + [len(group) for group in groups[:-1]])] = True
+    kinds, qty, price, commission, total = zip(*rows)
+    positions = compute_positions(
+        group_starts,
+        np.array(kinds),
+        np.array(qty, dtype=float),
+        np.array(price, dtype=float),
+        np.array(commission, dtype=float),
+        np.array(total, dtype=float),
+    )
+    return list(
+        zip(
+            positions["quantity"],
+            positions["cost_basis"],
+            positions["realized_pl"],
+            positions["dividends"],
+        )
+    )
+
+
+def round_trips(count):
+    """One share held throughout while 100 more are bought and sold `count` times."""
+    rows = [(BUY, 1.0, 10.0, 0.0, 10.0)]
+    for _ in range(count):
+        rows.append((BUY, 100.0, 10.0, 0.0, 1000.0))
+        rows.append((SELL, 100.0, 11.0, 0.0, 1100.0))
+    return rows
+
+
+def assert_matches_reference(groups):
+    expected = reference_positions(groups)
+    actual = vectorized_positions(groups)
+    assert np.all(np.isfinite(actual))
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-6)
+
+
+@pytest.mark.parametrize("count", [1, 160, 200, 1000])
+def test_position_never_flat(count):
+    assert_matches_reference([round_trips(count)])
+    quantity, cost, realized, _ = vectorized_positions([round_trips(count)])[0]
+    assert quantity == pytest.approx(1.0)
+    assert cost == pytest.approx(10.0)
+    assert realized == pytest.approx(100.0 * count)
+
+
+def test_long_lived_position_beside_others():
+    closed = [(BUY, 10.0, 5.0, 1.0, 51.0), (SELL, 10.0, 6.0, 1.0, 59.0)]
+    reopened = closed + [(BUY, 3.0, 7.0, 0.0, 21.0), (DIVIDEND, 0.0, 0.0, 0.0, 2.5)]
+    assert_matches_reference([closed, round_trips(300), reopened, round_trips(2)])
+
+
+def test_random_histories():
+    rng = np.random.default_rng(5)
+    groups = []
+    for _ in range(200):
+        rows, held = [], 0.0
+        for _ in range(rng.integers(1, 60)):
+            price = float(rng.uniform(1, 100))
+            commission = float(rng.choice([0.0, 4.95]))
+            roll = rng.random()
+            if held > 0 and roll < 0.4:
+                # Sell part or all of the position
+                qty = held if roll < 0.1 else float(rng.uniform(0, held))
+                rows.append((SELL, qty, price, commission, qty * price - commission))
+                held -= qty
+            elif roll < 0.5:
+                rows.append((DIVIDEND, 0.0, 0.0, 0.0, float(rng.uniform(0, 20))))
+            else:
+                qty = float(rng.integers(1, 100))
+                rows.append((BUY, qty, price, commission, qty * price + commission))
+                held += qty
+        groups.append(rows)
+    assert_matches_reference(groups)
+
+
+class FailingFxProvider(FxProvider):
+    async def fetch_rates(self, pair, start, end):
+        raise ConnectionError("provider unreachable")
+
+
+@pytest.fixture
+async def usd_position(db, account):
+    db.add(
+        Position(
+            account_id=account.id,
+            symbol="VOO",
+            currency=Currency.USD,
+            quantity=4.0,
+            cost_basis=1000.0,
+            last_transaction_date=date(2024, 3, 1),
+        )
+    )
+    await db.flush()
+
+
+@pytest.mark.anyio
+async def test_holdings_shown_without_conversion_when_rates_fail(
+    db, account, usd_position
+):
+    [holding] = await get_holdings(
+        db, FailingFxProvider(), account.user_id, Currency.CAD
+    )
+    assert (holding.symbol, holding.average_cost) == ("VOO", 250.0)
+    assert holding.fx_rate is None
+    assert holding.cost_basis_converted is None
+
+
+@pytest.mark.anyio
+async def test_holdings_do_not_hide_other_errors(
+    db, account, usd_position, monkeypatch
+):
+    async def broken(*args, **kwargs):
+        raise RuntimeError("bug")
+
+    monkeypatch.setattr(holdings, "conversion_rates", broken)
+    with pytest.raises(RuntimeError):
+        await get_holdings(db, FailingFxProvider(), account.user_id, Currency.CAD)
@@ -0,0 +1,33 @@
+import io
+
+import pytest
+from sqlalchemy import select
+
+from app.models.position import Position
+from app.services.importer import import_transactions_csv
+
+pytestmark = pytest.mark.anyio
+
+
+async def import_csv(db, account, lines):
+    content = "date,symbol,type,quantity,price_native,currency\n" + "\n".join(lines)
+    imported = await import_transactions_csv(
+        db, account.user_id, io.BytesIO(content.encode()), account.id
+    )
+    await db.commit()
+    return imported
+
+
+async def test_same_day_rows_keep_file_order(db, account):
+    # Each sell closes the position, so any other order changes the result
+    lines = []
+    for i in range(50):
+        lines.append(f"2024-03-01,VFV,BUY,10,{100 + i},CAD")
+        lines.append(f"2024-03-01,VFV,SELL,10,{110 + i},CAD")
+    lines.append("2024-03-01,VFV,BUY,5,300,CAD")
+    assert await import_csv(db, account, lines) == 101
+
+    position = (await db.execute(select(Position))).scalar_one()
+    assert position.quantity == pytest.approx(5.0)
+    assert position.cost_basis == pytest.approx(1500.0)
+    assert position.realized_pl == pytest.approx(50 * 100.0)
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.auth import pop_oauth_state, save_oauth_state
+from app.core.config import settings
+from app.models.oauth_state import OAuthState
+
+pytestmark = pytest.mark.anyio
+
+
+async def age(db, state, seconds):
+    """Backdate a pending login by the given number of seconds."""
+    await db.execute(
+        update(OAuthState)
+        .where(OAuthState.state == state)
+        .values(created_at=datetime.now(timezone.utc) - timedelta(seconds=seconds))
+    )
+    await db.commit()
+
+
+async def test_state_can_be_used_once(db):
+    await save_oauth_state(db, "state-1", "verifier-1")
+    await save_oauth_state(db, "state-2", "verifier-2")
+
+    assert await pop_oauth_state(db, "state-1") == "verifier-1"
+    assert await pop_oauth_state(db, "state-1") is None
+    assert await pop_oauth_state(db, "state-2") == "verifier-2"
+
+
+async def test_unknown_state_is_rejected(db):
+    assert await pop_oauth_state(db, "never-issued") is None
+
+
+async def test_expired_state_is_rejected(db):
+    await save_oauth_state(db, "stale", "verifier")
+    await age(db, "stale", settings.OAUTH_STATE_TTL_SECONDS + 5)
+    assert await pop_oauth_state(db, "stale") is None
+
+    await save_oauth_state(db, "fresh", "verifier")
+    await age(db, "fresh", settings.OAUTH_STATE_TTL_SECONDS - 60)
+    assert await pop_oauth_state(db, "fresh") == "verifier"
+
+
+async def test_saving_clears_abandoned_logins(db):
+    await save_oauth_state(db, "abandoned", "verifier")
+    await age(db, "abandoned", settings.OAUTH_STATE_TTL_SECONDS + 5)
+    await save_oauth_state(db, "next", "verifier")
+
+    states = (await db.execute(select(OAuthState.state))).scalars().all()
+    assert states == ["next"]
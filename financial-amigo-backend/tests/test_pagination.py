@@ -0,0 +1,93 @@
+import base64
+from datetime import date, timedelta
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.account import Currency
+from app.models.transaction import Transaction, TransactionType
+
+pytestmark = pytest.mark.anyio
+
+
+def raw_cursor(text):
+    return base64.urlsafe_b64encode(text).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "row_date", [date(2024, 1, 2), date(1999, 12, 31), date(2024, 2, 29)]
+)
+async def test_cursor_round_trip(row_date):
+    row_id = uuid4()
+    cursor = encode_cursor(row_date, row_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (row_date, row_id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        raw_cursor(b"2024-01-02"),
+        raw_cursor(b"2024-13-01|" + str(uuid4()).encode()),
+        raw_cursor(b"2024-01-02|not-a-uuid"),
+        raw_cursor(b"2024-01-02|a|b"),
+        raw_cursor(b"\xff\xfe|\xff"),
+    ],
+)
+async def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+@pytest.fixture
+async def history(db, account):
+    """Thirty transactions, many sharing a date."""
+    transactions = [
+        Transaction(
+            account_id=account.id,
+            date=date(2024, 1, 1) + timedelta(days=i // 7),
+            symbol="VFV",
+            type=TransactionType.BUY,
+            quantity=1,
+            price_native=100.0,
+            commission_native=0.0,
+            currency=Currency.CAD,
+        )
+        for i in range(30)
+    ]
+    db.add_all(transactions)
+    await db.commit()
+    return sorted(transactions, key=lambda t: (t.date, t.id), reverse=True)
+
+
+@pytest.mark.parametrize("limit", [1, 3, 7, 29, 30, 200])
+async def test_pages_cover_every_row_once(client, history, limit):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/api/transactions", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= limit
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # Rows sharing a date straddle page boundaries without gaps or repeats
+    assert seen == [str(transaction.id) for transaction in history]
+
+
+async def test_malformed_cursor_is_a_bad_request(client, history):
+    response = await client.get("/api/transactions", params={"cursor": "garbage!"})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("limit", [0, 201])
+async def test_limit_is_bounded(client, history, limit):
+    response = await client.get("/api/transactions", params={"limit": limit})
+    assert response.status_code == 422
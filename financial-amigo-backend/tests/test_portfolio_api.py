@@ -0,0 +1,87 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.api import portfolio
+from app.core.config import settings
+from app.main import app
+from app.models.transaction import Transaction, TransactionType
+from app.services.market_data import PriceProvider, get_price_provider
+
+pytestmark = pytest.mark.anyio
+
+ENDPOINTS = ("history", "returns", "benchmark?symbol=^GSPTSE")
+
+
+class FailingPriceProvider(PriceProvider):
+    async def fetch_prices(self, symbols):
+        raise ConnectionError("provider unreachable")
+
+    async def fetch_history(self, symbols, start, end):
+        raise ConnectionError("provider unreachable")
+
+
+@pytest.fixture
+async def holding(db, account):
+    db.add(
+        Transaction(
+            account_id=account.id,
+            date=date(2024, 1, 2),
+            symbol="VFV",
+            type=TransactionType.BUY,
+            quantity=10,
+            price_native=100.0,
+            commission_native=0.0,
+            currency=account.currency,
+        )
+    )
+    await db.commit()
+
+
+def url(endpoint, **params):
+    query = "&".join(f"{key}={value}" for key, value in params.items())
+    separator = "&" if "?" in endpoint else "?"
+    return f"/api/portfolio/{endpoint}" + (separator + query if query else "")
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+async def test_provider_failure_is_a_bad_gateway(client, holding, endpoint):
+    app.dependency_overrides[get_price_provider] = FailingPriceProvider
+    response = await client.get(url(endpoint, start="2024-01-01", end="2024-01-31"))
+    assert response.status_code == 502
+
+
+@pytest.mark.parametrize(
+    "endpoint, service",
+    [
+        ("history", "get_portfolio_history"),
+        ("returns", "get_returns"),
+        ("benchmark?symbol=^GSPTSE", "get_benchmark_comparison"),
+    ],
+)
+async def test_other_errors_are_not_reported_as_upstream(
+    client, monkeypatch, endpoint, service
+):
+    async def broken(*args, **kwargs):
+        raise RuntimeError("bug")
+
+    monkeypatch.setattr(portfolio, service, broken)
+    response = await client.get(url(endpoint))
+    assert response.status_code == 500
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+async def test_range_is_bounded(client, endpoint):
+    today = date.today()
+    too_long = today - timedelta(days=settings.HISTORY_MAX_DAYS)
+    for params in (
+        {"start": too_long},
+        {"start": too_long, "end": today},
+        {"end": today + timedelta(days=1)},
+        {"start": "2024-02-01", "end": "2024-01-01"},
+    ):
+        response = await client.get(url(endpoint, **params))
+        assert response.status_code == 400, params
+
+    response = await client.get(url(endpoint, start=too_long + timedelta(days=1)))
+    assert response.status_code == 200
@@ -0,0 +1,115 @@
+import importlib.util
+from datetime import date
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.account import Currency
+from app.models.position import Position
+from app.models.transaction import Transaction, TransactionType
+from app.services.positions import (
+    SNAPSHOT_FIELDS,
+    apply_transaction,
+    compute_snapshots,
+    lock_position,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def trade(account_id, day, type, quantity, price, symbol="VFV"):
+    return Transaction(
+        account_id=account_id,
+        date=day,
+        symbol=symbol,
+        type=type,
+        quantity=quantity,
+        price_native=price,
+        commission_native=0.0,
+        currency=Currency.CAD,
+    )
+
+
+async def add(db, transaction):
+    db.add(transaction)
+    await apply_transaction(db, transaction)
+    await db.commit()
+
+
+async def assert_snapshots_match(db):
+    expected = await compute_snapshots(db)
+    result = await db.execute(select(Position))
+    stored = {
+        (position.account_id, position.symbol): position
+        for position in result.scalars().all()
+    }
+    assert len(stored) == len(expected)
+    for snapshot in expected:
+        position = stored[(snapshot["account_id"], snapshot["symbol"])]
+        for field in SNAPSHOT_FIELDS:
+            assert getattr(position, field) == pytest.approx(snapshot[field])
+
+
+async def test_lock_position_creates_one_row(db):
+    key = (uuid4(), "VFV")
+    first = await lock_position(db, key, Currency.CAD, date(2024, 1, 2))
+    again = await lock_position(db, key, Currency.USD, date(2024, 5, 1))
+    assert again is first
+    assert (first.quantity, first.last_transaction_date) == (0.0, date(2024, 1, 2))
+    assert await db.scalar(select(func.count()).select_from(Position)) == 1
+
+
+async def test_appended_and_back_dated_trades(db):
+    account_id = uuid4()
+    await add(db, trade(account_id, date(2024, 1, 2), TransactionType.BUY, 10, 100))
+    await add(db, trade(account_id, date(2024, 2, 1), TransactionType.BUY, 10, 120))
+    await add(db, trade(account_id, date(2024, 3, 1), TransactionType.SELL, 5, 130))
+    await assert_snapshots_match(db)
+
+    # Back-dated buy changes the cost of the later sell
+    await add(db, trade(account_id, date(2024, 1, 15), TransactionType.BUY, 20, 90))
+    await add(
+        db, trade(account_id, date(2024, 1, 20), TransactionType.BUY, 3, 50, "XEQT")
+    )
+    await assert_snapshots_match(db)
+
+
+def load_migration(name):
+    path = Path(__file__).parents[1] / "alembic" / "versions" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def test_migration_builds_snapshots_from_existing_transactions(db, account):
+    # Transactions written before positions existed
+    db.add_all(
+        [
+            trade(account.id, date(2024, 1, 2), TransactionType.BUY, 10, 100),
+            trade(account.id, date(2024, 2, 1), TransactionType.BUY, 10, 130),
+            trade(account.id, date(2024, 3, 1), TransactionType.SELL, 5, 150),
+            trade(account.id, date(2024, 1, 5), TransactionType.BUY, 3, 40, "XEQT"),
+            trade(account.id, date(2024, 1, 9), TransactionType.SELL, 3, 45, "XEQT"),
+        ]
+    )
+    await db.commit()
+
+    migration = load_migration("8b2d5e7f1a6c_create_positions_table")
+    await db.run_sync(
+        lambda session: migration.backfill_positions(session.connection())
+    )
+    await db.commit()
+
+    await assert_snapshots_match(db)
+    position = await db.scalar(select(Position).where(Position.symbol == "VFV"))
+    assert (position.quantity, position.last_transaction_date) == (
+        15,
+        date(2024, 3, 1),
+    )
+
+    # The next write folds into the backfilled snapshot
+    await add(db, trade(account.id, date(2024, 4, 1), TransactionType.BUY, 5, 160))
+    await assert_snapshots_match(db)
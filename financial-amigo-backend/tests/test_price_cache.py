@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from app.services.market_data.base import PriceProvider
+from app.services.market_data.cache import PriceCache
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeProvider(PriceProvider):
+    """Prices released only when the test says so, counting calls."""
+
+    def __init__(self, prices=None, error=None):
+        self.prices = prices if prices is not None else {"VFV": 100.0}
+        self.error = error
+        self.calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def fetch_prices(self, symbols):
+        self.calls.append(list(symbols))
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return {s: self.prices[s] for s in symbols if s in self.prices}
+
+    async def fetch_history(self, symbols, start, end):
+        return {}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable stand-in for time.monotonic in the TTL cache."""
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    return now
+
+
+async def test_concurrent_callers_share_one_fetch():
+    provider = FakeProvider()
+    provider.release.clear()
+    cache = PriceCache(provider, ttl=60)
+
+    callers = [asyncio.create_task(cache.get_prices(["vfv"])) for _ in range(50)]
+    await asyncio.sleep(0)
+    provider.release.set()
+    results = await asyncio.gather(*callers)
+
+    assert results == [{"VFV": 100.0}] * 50
+    assert provider.calls == [["VFV"]]
+    assert cache.stats() == {
+        "size": 1,
+        "hits": 0,
+        "misses": 50,
+        "in_flight": 0,
+        "upstream_calls": 1,
+    }
+
+
+async def test_entries_expire_after_ttl(clock):
+    provider = FakeProvider()
+    cache = PriceCache(provider, ttl=60)
+
+    await cache.get_prices(["VFV"])
+    clock[0] += 59
+    await cache.get_prices(["VFV"])
+    assert len(provider.calls) == 1
+
+    provider.prices["VFV"] = 101.0
+    clock[0] += 1
+    assert await cache.get_prices(["VFV"]) == {"VFV": 101.0}
+    assert len(provider.calls) == 2
+
+
+async def test_missing_prices_are_cached():
+    provider = FakeProvider(prices={})
+    cache = PriceCache(provider, ttl=60)
+
+    assert await cache.get_prices(["NOPE"]) == {"NOPE": None}
+    assert await cache.get_prices(["NOPE"]) == {"NOPE": None}
+    assert provider.calls == [["NOPE"]]
+
+
+async def test_errors_reach_every_waiter_and_are_not_cached():
+    provider = FakeProvider(error=ConnectionError("upstream down"))
+    provider.release.clear()
+    cache = PriceCache(provider, ttl=60)
+
+    callers = [asyncio.create_task(cache.get_prices(["VFV"])) for _ in range(5)]
+    await asyncio.sleep(0)
+    provider.release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert len(provider.calls) == 1
+
+    # The next call asks again
+    provider.error = None
+    assert await cache.get_prices(["VFV"]) == {"VFV": 100.0}
+    assert len(provider.calls) == 2
+
+
+async def test_cancelled_caller_does_not_strand_others():
+    provider = FakeProvider()
+    provider.release.clear()
+    cache = PriceCache(provider, ttl=60)
+
+    first = asyncio.create_task(cache.get_prices(["VFV"]))
+    second = asyncio.create_task(cache.get_prices(["VFV"]))
+    await asyncio.sleep(0)
+    first.cancel()
+    provider.release.set()
+
+    assert await second == {"VFV": 100.0}
+    assert len(provider.calls) == 1
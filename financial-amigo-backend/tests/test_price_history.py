@@ -0,0 +1,154 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import select, update
+
+from app.models.price_history import PriceHistoryCoverage
+from app.services.market_data.base import PriceProvider
+from app.services.market_data.history import (
+    backfill,
+    get_close_matrix,
+    get_closes,
+    last_occurrences,
+    missing_ranges,
+    record_coverage,
+    store_history,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeProvider(PriceProvider):
+    """Closes of 10.0 on every weekday, recording each history request."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def fetch_prices(self, symbols):
+        return {symbol: 10.0 for symbol in symbols}
+
+    async def fetch_history(self, symbols, start, end):
+        self.calls.append((tuple(symbols), start, end))
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        return {
+            symbol: [(day, 10.0) for day in days if day.weekday() < 5]
+            for symbol in symbols
+        }
+
+
+async def coverage(db, symbol):
+    return (
+        await db.execute(
+            select(PriceHistoryCoverage).where(PriceHistoryCoverage.symbol == symbol)
+        )
+    ).scalar_one()
+
+
+async def test_open_day_refetched_only_after_ttl(db):
+    provider = FakeProvider()
+    today = date.today()
+    start = today - timedelta(days=10)
+
+    await backfill(db, provider, ["VFV"], start, today)
+    assert provider.calls == [(("VFV",), start, today)]
+    stored = await coverage(db, "VFV")
+    assert stored.end_date == today - timedelta(days=1)
+    assert stored.open_fetched_at is not None
+
+    # Within the TTL nothing is fetched again
+    await backfill(db, provider, ["VFV"], start, today)
+    assert len(provider.calls) == 1
+
+    # Once the fetch is older than the TTL only today is asked for
+    await db.execute(
+        update(PriceHistoryCoverage).values(open_fetched_at=datetime(2000, 1, 1))
+    )
+    await backfill(db, provider, ["VFV"], start, today)
+    assert provider.calls[1:] == [(("VFV",), today, today)]
+
+
+async def test_coverage_only_grows(db):
+    provider = FakeProvider()
+    await backfill(db, provider, ["VFV", "XEQT"], date(2024, 3, 1), date(2024, 3, 31))
+    # Another request that already read no coverage records a narrower range
+    await record_coverage(db, ["VFV"], date(2024, 3, 10), date(2024, 3, 20), False)
+
+    stored = await coverage(db, "VFV")
+    await db.refresh(stored)
+    assert (stored.start_date, stored.end_date) == (date(2024, 3, 1), date(2024, 3, 31))
+
+
+@pytest.mark.parametrize(
+    "start, end, expected",
+    [
+        # Inside the coverage
+        (date(2024, 3, 5), date(2024, 3, 25), []),
+        # Overlapping either end, or both
+        (date(2024, 2, 20), date(2024, 3, 5), [(date(2024, 2, 20), date(2024, 2, 29))]),
+        (date(2024, 3, 25), date(2024, 4, 5), [(date(2024, 4, 1), date(2024, 4, 5))]),
+        (
+            date(2024, 2, 20),
+            date(2024, 4, 5),
+            [
+                (date(2024, 2, 20), date(2024, 2, 29)),
+                (date(2024, 4, 1), date(2024, 4, 5)),
+            ],
+        ),
+        # Disjoint windows reach back to the coverage instead of leaving a hole
+        (date(2024, 1, 1), date(2024, 1, 31), [(date(2024, 1, 1), date(2024, 2, 29))]),
+        (date(2024, 6, 1), date(2024, 6, 30), [(date(2024, 4, 1), date(2024, 6, 30))]),
+    ],
+)
+def test_missing_ranges(start, end, expected):
+    coverage = PriceHistoryCoverage(
+        symbol="VFV", start_date=date(2024, 3, 1), end_date=date(2024, 3, 31)
+    )
+    assert missing_ranges(start, end, coverage) == expected
+    assert missing_ranges(start, end, None) == [(start, end)]
+
+
+async def test_disjoint_ranges_leave_no_hole(db):
+    provider = FakeProvider()
+    first = (date(2024, 1, 1), date(2024, 1, 31))
+    later = (date(2024, 6, 1), date(2024, 6, 30))
+
+    await backfill(db, provider, ["VFV"], *first)
+    await backfill(db, provider, ["VFV"], *later)
+    # The gap between the two windows is fetched with the later one
+    assert provider.calls[1] == (("VFV",), date(2024, 2, 1), date(2024, 6, 30))
+
+    stored = await coverage(db, "VFV")
+    assert (stored.start_date, stored.end_date) == (first[0], later[1])
+    dates, _ = await get_closes(db, "VFV", date(2024, 3, 1), date(2024, 3, 31))
+    assert len(dates) == 21
+
+    # An earlier window bridges back to the start of the coverage too
+    await backfill(db, provider, ["VFV"], date(2023, 10, 1), date(2023, 10, 31))
+    assert provider.calls[2] == (("VFV",), date(2023, 10, 1), date(2023, 12, 31))
+
+
+def test_last_occurrences():
+    keys = np.array([3, 1, 3, 2, 1, 3])
+    assert last_occurrences(keys).tolist() == [False, False, False, True, True, True]
+    assert last_occurrences(np.array([], dtype=int)).tolist() == []
+
+
+async def test_close_matrix_starts_from_latest_earlier_close(db):
+    await store_history(
+        db,
+        {
+            # Several closes before the range all land on its first day
+            "VFV": [(date(2024, 3, 4), 1.0), (date(2024, 3, 6), 2.0)],
+            "XEQT": [(date(2024, 3, 5), 5.0), (date(2024, 3, 11), 6.0)],
+        },
+    )
+
+    dates, closes = await get_close_matrix(
+        db, ["XEQT", "VFV", "ZAG"], date(2024, 3, 9), date(2024, 3, 11)
+    )
+
+    assert dates.tolist() == [date(2024, 3, 9), date(2024, 3, 10), date(2024, 3, 11)]
+    np.testing.assert_array_equal(
+        closes, [[5.0, 2.0, np.nan], [5.0, 2.0, np.nan], [6.0, 2.0, np.nan]]
+    )
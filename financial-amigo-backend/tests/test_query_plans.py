@@ -0,0 +1,201 @@
+"""
+Query plans of the transaction endpoints on a real Postgres.
+
+Set TEST_DATABASE_URL to a Postgres database to run the plan checks; the
+tables are created in a throwaway schema and dropped afterwards. Sequential
+scans are disabled so a plan only avoids an index if no usable one exists.
+The tables there come from the models, so the migrations are checked on
+every run to create the same indexes.
+"""
+
+import io
+import json
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, insert, select, text, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from alembic.config import Config
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from app.api.transactions import RESPONSE_COLUMNS, scope_to_user
+from app.models.account import Account, AccountType
+from app.models.transaction import Transaction, TransactionType
+from app.models.user import User
+
+BACKEND_DIR = Path(__file__).parents[1]
+
+requires_postgres = pytest.mark.skipif(
+    not os.environ.get("TEST_DATABASE_URL", "").startswith("postgres"),
+    reason="TEST_DATABASE_URL does not point at Postgres",
+)
+
+
+def migration_sql() -> str:
+    """Postgres DDL of every migration, as `alembic upgrade head --sql` emits."""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    output = io.StringIO()
+    context = MigrationContext.configure(
+        dialect_name="postgresql", opts={"as_sql": True, "output_buffer": output}
+    )
+    with Operations.context(context):
+        for revision in reversed(
+            list(ScriptDirectory.from_config(config).walk_revisions())
+        ):
+            revision.module.upgrade()
+    return output.getvalue()
+
+
+def test_migrations_create_model_indexes():
+    statements = {line.rstrip(";") for line in migration_sql().splitlines()}
+    for table in (Account.__table__, Transaction.__table__):
+        assert table.indexes
+        for index in table.indexes:
+            ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+            assert ddl.strip() in statements, index.name
+
+
+@pytest.fixture
+async def postgres():
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    import app.models  # noqa: F401
+    from app.core.database import Base
+
+    url = os.environ["TEST_DATABASE_URL"]
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            url = "postgresql+asyncpg://" + url[len(prefix) :]
+    schema = f"plans_{uuid4().hex}"
+
+    admin = create_async_engine(url)
+    async with admin.begin() as connection:
+        await connection.execute(text(f'CREATE SCHEMA "{schema}"'))
+    engine = create_async_engine(
+        url, connect_args={"server_settings": {"search_path": schema}}
+    )
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        yield engine
+    finally:
+        await engine.dispose()
+        async with admin.begin() as connection:
+            await connection.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+        await admin.dispose()
+
+
+async def seed(connection):
+    """A few users with a few accounts each, and a history in every account."""
+    users = [
+        {
+            "id": uuid4(),
+            "email": f"user{i}@example.com",
+            "name": "",
+            "google_id": str(i),
+        }
+        for i in range(20)
+    ]
+    accounts = [
+        {
+            "id": uuid4(),
+            "user_id": user["id"],
+            "name": "Account",
+            "type": AccountType.TFSA,
+        }
+        for user in users
+        for _ in range(3)
+    ]
+    transactions = [
+        {
+            "id": uuid4(),
+            "account_id": account["id"],
+            "date": date(2020, 1, 1) + timedelta(days=i),
+            "symbol": "VFV",
+            "type": TransactionType.BUY,
+            "quantity": 1.0,
+            "price_native": 100.0,
+            "total_native": 100.0,
+        }
+        for account in accounts
+        for i in range(200)
+    ]
+    await connection.execute(insert(User), users)
+    await connection.execute(insert(Account), accounts)
+    await connection.execute(insert(Transaction), transactions)
+    await connection.execute(text("ANALYZE"))
+    return User(id=users[0]["id"]), accounts[0]["id"], transactions[0]["id"]
+
+
+def plan_indexes(plan: dict) -> tuple:
+    """(index names used, relations read by sequential scan) in a plan tree."""
+    indexes, scanned = set(), set()
+    nodes = [plan]
+    while nodes:
+        node = nodes.pop()
+        if "Index Name" in node:
+            indexes.add(node["Index Name"])
+        if node["Node Type"] == "Seq Scan":
+            scanned.add(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return indexes, scanned
+
+
+async def explain(connection, statement) -> tuple:
+    sql = statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    result = await connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan_indexes(plan[0]["Plan"])
+
+
+@requires_postgres
+@pytest.mark.anyio
+async def test_transaction_endpoints_use_indexes(postgres):
+    async with postgres.connect() as connection:
+        user, account_id, transaction_id = await seed(connection)
+        await connection.execute(text("SET enable_seqscan = off"))
+
+        def listing(account_id=None):
+            return (
+                scope_to_user(select(*RESPONSE_COLUMNS), user, account_id)
+                .order_by(Transaction.date.desc(), Transaction.id.desc())
+                .limit(51)
+            )
+
+        # List pages find the user's accounts by index, and walk the keyset
+        # index within one account
+        indexes, scanned = await explain(connection, listing())
+        assert "ix_accounts_user_id" in indexes
+        assert not scanned
+        indexes, scanned = await explain(connection, listing(account_id))
+        assert "ix_transactions_account_id_date" in indexes
+        assert not scanned
+
+        # Get, update and delete load the row through get_user_transaction,
+        # then write it by primary key
+        lookup = (
+            select(Transaction)
+            .join(Account)
+            .where(Transaction.id == transaction_id, Account.user_id == user.id)
+        )
+        writes = [
+            update(Transaction)
+            .where(Transaction.id == transaction_id)
+            .values(quantity=2.0),
+            delete(Transaction).where(Transaction.id == transaction_id),
+        ]
+        for statement in [lookup, *writes]:
+            indexes, scanned = await explain(connection, statement)
+            assert "transactions_pkey" in indexes
+            assert not scanned
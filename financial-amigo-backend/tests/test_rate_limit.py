@@ -0,0 +1,166 @@
+import math
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core import rate_limit
+from app.core.rate_limit import (
+    TOKEN_BUCKET_SCRIPT,
+    MemoryBackend,
+    RateLimitBackend,
+    RateLimitMiddleware,
+    RateLimitPolicy,
+    RedisBackend,
+)
+
+
+@pytest.fixture
+def middleware():
+    return RateLimitMiddleware(app=None, backend=MemoryBackend())
+
+
+@pytest.mark.parametrize(
+    "method, path, policy",
+    [
+        ("GET", "/api/auth/google", "auth"),
+        ("GET", "/api/auth/google/callback", "auth"),
+        ("POST", "/api/auth/refresh", "auth-refresh"),
+        ("GET", "/api/auth/me", None),
+        ("POST", "/api/transactions/bulk", "transactions-bulk"),
+        ("PATCH", "/api/transactions/1", "transactions-write"),
+        ("GET", "/api/transactions", None),
+    ],
+)
+def test_policy_for(middleware, method, path, policy):
+    matched = middleware.policy_for(method, path)
+    assert (matched.name if matched else None) == policy
+
+
+class Clock:
+    """Stand-in for the `time` module with a hand-driven monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeRedis:
+    """In-memory stand-in for `redis.asyncio.Redis` running the bucket script.
+
+    Mirrors TOKEN_BUCKET_SCRIPT step by step, and answers in the shape
+    redis-py does: an integer and a bulk string.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.hashes = {}
+        self.expires = {}
+        self.calls = []
+
+    async def eval(self, script, numkeys, key, rate, burst):
+        self.calls.append((script, numkeys, key))
+        now = self.clock.now
+        if self.expires.get(key, now + 1) <= now:
+            self.hashes.pop(key, None)
+        state = self.hashes.get(key, {})
+        tokens = state.get("tokens", burst)
+        updated = state.get("updated", now)
+        tokens = min(burst, tokens + max(0, now - updated) * rate)
+        allowed, retry_after = 0, 0
+        if tokens >= 1:
+            tokens -= 1
+            allowed = 1
+        else:
+            retry_after = (1 - tokens) / rate
+        self.hashes[key] = {"tokens": tokens, "updated": now}
+        self.expires[key] = now + math.ceil(burst / rate * 1000) / 1000
+        return [allowed, str(retry_after).encode()]
+
+
+class BrokenBackend(RateLimitBackend):
+    async def consume(self, key, rate, burst):
+        raise ConnectionError("limiter unreachable")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request, clock):
+    if request.param == "memory":
+        return MemoryBackend()
+    return RedisBackend(FakeRedis(clock))
+
+
+@pytest.mark.anyio
+async def test_bucket_spends_burst_then_refills(backend, clock):
+    for _ in range(3):
+        assert await backend.consume("k", rate=2, burst=3) == (True, 0.0)
+    assert await backend.consume("k", rate=2, burst=3) == (False, 0.5)
+
+    clock.now += 0.25
+    allowed, retry_after = await backend.consume("k", rate=2, burst=3)
+    assert not allowed and retry_after == pytest.approx(0.25)
+
+    clock.now += 0.25
+    assert (await backend.consume("k", rate=2, burst=3))[0]
+    assert not (await backend.consume("k", rate=2, burst=3))[0]
+
+    # Refills up to the burst, never beyond it
+    clock.now += 60
+    results = [(await backend.consume("k", rate=2, burst=3))[0] for _ in range(4)]
+    assert results == [True, True, True, False]
+
+    # Buckets are independent
+    assert (await backend.consume("other", rate=2, burst=3))[0]
+
+
+@pytest.mark.anyio
+async def test_redis_backend_sends_one_script_per_request(clock):
+    client = FakeRedis(clock)
+    backend = RedisBackend(client, prefix="test:")
+    await backend.consume("auth:1.2.3.4", rate=1, burst=5)
+    assert client.calls == [(TOKEN_BUCKET_SCRIPT, 1, "test:auth:1.2.3.4")]
+
+
+def limited_app(backend):
+    async def hello(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/api/auth/google", hello)])
+    policy = RateLimitPolicy("auth", "/api/auth/google", rate=0.4, burst=2)
+    return RateLimitMiddleware(app, backend=backend, policies=[policy])
+
+
+async def request(app, path="/api/auth/google"):
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        return await client.get(path)
+
+
+@pytest.mark.anyio
+async def test_exhausted_bucket_is_a_429_with_retry_after(backend):
+    app = limited_app(backend)
+    assert [(await request(app)).status_code for _ in range(2)] == [200, 200]
+
+    response = await request(app)
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many requests"}
+    # 2.5 s until the next token, rounded up
+    assert response.headers["retry-after"] == "3"
+
+
+@pytest.mark.anyio
+async def test_backend_failure_fails_open():
+    app = limited_app(BrokenBackend())
+    assert [(await request(app)).status_code for _ in range(5)] == [200] * 5
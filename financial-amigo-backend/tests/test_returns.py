@@ -0,0 +1,167 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.services import returns
+from app.services.returns import (
+    DAYS_PER_YEAR,
+    money_weighted_returns,
+    npv,
+    time_weighted_growth,
+    xirr,
+)
+
+
+def reference_xirr(amounts, times):
+    """Root of one row's NPV by plain bisection over the solver's range."""
+
+    def value(x):
+        return sum(a * math.exp(-x * t) for a, t in zip(amounts, times))
+
+    lo, hi = -returns.LOG_RATE_BOUND, returns.LOG_RATE_BOUND
+    f_lo = value(lo)
+    if f_lo * value(hi) >= 0:
+        return math.nan
+    for _ in range(200):
+        middle = (lo + hi) / 2
+        f_middle = value(middle)
+        if (f_middle > 0) == (f_lo > 0):
+            lo, f_lo = middle, f_middle
+        else:
+            hi = middle
+    return math.expm1((lo + hi) / 2)
+
+
+def reference_twr(opening, values, flows, income):
+    """Cumulative growth of one column chain-linked a day at a time."""
+    growth, previous, series = 1.0, opening, []
+    for value, flow, paid in zip(values, flows, income):
+        base = previous + max(flow, 0.0)
+        if base > 0:
+            growth *= 1.0 + (value - previous - flow + paid) / base
+        series.append(growth)
+        previous = value
+    return series
+
+
+def purchases_then_value(rng, problems, flows):
+    """Purchases at random times and a final value: one sign change per row."""
+    times = np.sort(rng.uniform(0, 5, (problems, flows)), axis=1)
+    times[:, 0] = 0.0
+    amounts = -rng.uniform(10, 100, (problems, flows))
+    amounts[:, -1] = -amounts[:, :-1].sum(axis=1) * rng.uniform(0.1, 3.0, problems)
+    return amounts, times
+
+
+def test_xirr_matches_reference_on_conventional_flows():
+    rng = np.random.default_rng(0)
+    amounts, times = purchases_then_value(rng, 500, 12)
+
+    rates = xirr(amounts, times)
+
+    expected = [reference_xirr(a, t) for a, t in zip(amounts, times)]
+    np.testing.assert_allclose(rates, expected, rtol=1e-8, atol=1e-10)
+
+
+def test_xirr_returns_roots_with_mid_stream_withdrawals():
+    rng = np.random.default_rng(1)
+    amounts, times = purchases_then_value(rng, 2000, 12)
+    # One withdrawal of up to three times what went in so far
+    rows = np.arange(len(amounts))
+    columns = rng.integers(1, amounts.shape[1] - 1, len(amounts))
+    paid_in = -np.cumsum(amounts, axis=1)[rows, columns - 1]
+    amounts[rows, columns] = paid_in * rng.uniform(0.0, 3.0, len(amounts))
+
+    rates = xirr(amounts, times)
+
+    expected = np.array([reference_xirr(a, t) for a, t in zip(amounts, times)])
+    np.testing.assert_array_equal(np.isnan(rates), np.isnan(expected))
+    # Rows may have several roots; whichever is returned must be one
+    solved = ~np.isnan(rates)
+    x = np.log1p(rates[solved])
+    step = 1e-8 * np.maximum(np.abs(x), 1.0)
+    below, _ = npv(x - step, amounts[solved], times[solved])
+    above, _ = npv(x + step, amounts[solved], times[solved])
+    at, _ = npv(x, amounts[solved], times[solved])
+    scale = np.abs(amounts[solved]).sum(axis=1)
+    assert np.all((np.sign(below) != np.sign(above)) | (np.abs(at) <= 1e-8 * scale))
+
+
+def test_xirr_hand_computed():
+    # 100 in, 121 out two years later: 10% a year
+    rates = xirr(np.array([[-100.0, 121.0], [-100.0, -50.0]]), np.array([0.0, 2.0]))
+    assert rates[0] == pytest.approx(0.1)
+    # Flows all of one sign have no rate
+    assert np.isnan(rates[1])
+
+
+def test_xirr_gives_up_on_unconverged_rows(monkeypatch):
+    monkeypatch.setattr(returns, "XIRR_MAX_ITERATIONS", 2)
+    rng = np.random.default_rng(2)
+    amounts, times = purchases_then_value(rng, 50, 12)
+
+    assert np.isnan(xirr(amounts, times)).all()
+
+
+def test_time_weighted_growth_matches_reference():
+    rng = np.random.default_rng(3)
+    days, columns = 60, 5
+    values = rng.uniform(50, 150, (days, columns))
+    values[10:20, 1] = 0.0  # sold out and bought back
+    flows = np.where(
+        rng.random((days, columns)) < 0.2, rng.normal(0, 40, (days, columns)), 0
+    )
+    income = np.where(
+        rng.random((days, columns)) < 0.05, rng.uniform(0, 5, (days, columns)), 0
+    )
+    opening = np.array([100.0, 80.0, 0.0, 120.0, 0.0])
+    values[:, 4] = flows[:, 4] = income[:, 4] = 0.0  # never held
+
+    growth, invested = time_weighted_growth(opening, values, flows, income)
+
+    for column in range(columns):
+        np.testing.assert_allclose(
+            growth[:, column],
+            reference_twr(
+                opening[column], values[:, column], flows[:, column], income[:, column]
+            ),
+            rtol=1e-12,
+        )
+    assert invested.tolist() == [True, True, True, True, False]
+
+
+def test_money_weighted_returns_match_reference():
+    rng = np.random.default_rng(4)
+    days, columns = 400, 4
+    values = np.cumsum(rng.normal(0.5, 3, (days, columns)), axis=0) + 200
+    flows = np.where(
+        rng.random((days, columns)) < 0.03, rng.uniform(10, 50, (days, columns)), 0
+    )
+    income = np.where(
+        rng.random((days, columns)) < 0.02, rng.uniform(0, 5, (days, columns)), 0
+    )
+    opening = np.full(columns, 200.0)
+
+    rates = money_weighted_returns(opening, values, flows, income)
+
+    times = np.arange(days + 1) / DAYS_PER_YEAR
+    for column in range(columns):
+        amounts = np.concatenate(
+            [[-opening[column]], income[:, column] - flows[:, column]]
+        )
+        amounts[-1] += values[-1, column]
+        assert rates[column] == pytest.approx(reference_xirr(amounts, times), rel=1e-8)
+
+
+def test_returns_hand_computed():
+    # 100 growing steadily to 110 over a year, with no flows: 10% both ways
+    values = np.linspace(100, 110, 366)[1:, np.newaxis]
+    flows = income = np.zeros_like(values)
+    opening = np.array([100.0])
+
+    growth, _ = time_weighted_growth(opening, values, flows, income)
+    assert growth[-1, 0] == pytest.approx(1.1)
+    assert money_weighted_returns(opening, values, flows, income)[0] == pytest.approx(
+        0.1
+    )
@@ -51,6 +51,7 @@ export default function Transactions() {
   const { user, isLoading: authLoading } = useAuth();
   const router = useRouter();
   const [transactionList, setTransactionList] = useState<Transaction[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [accounts, setAccounts] = useState<Account[]>([]);
   const [selectedAccount, setSelectedAccount] = useState<string>("");
   const [editingTransaction, setEditingTransaction] =
@@ -111,7 +112,8 @@ export default function Transactions() {
     setIsLoading(true);
     try {
       const { data } = await transactionsApi.list(selectedAccount);
-      setTransactionList(data);
+      setTransactionList(data.items);
+      setNextCursor(data.next_cursor);
     } catch (error) {
       toast.error("Failed to fetch transactions");
     } finally {
@@ -119,6 +121,17 @@ export default function Transactions() {
     }
   };
 
+  const fetchMoreTransactions = async () => {
+    if (!nextCursor) return;
+    try {
+      const { data } = await transactionsApi.list(selectedAccount, nextCursor);
+      setTransactionList((prev) => [...prev, ...data.items]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      toast.error("Failed to fetch transactions");
+    }
+  };
+
   const handleInputChange = (
     e: React.ChangeEvent<HTMLInputElement | HTMLTextAreaElement>
   ) => {
@@ -468,6 +481,13 @@ export default function Transactions() {
                     </TableBody>
                   </Table>
                 )}
+                {!isLoading && nextCursor && (
+                  <div className="flex justify-center pt-4">
+                    <Button variant="outline" onClick={fetchMoreTransactions}>
+                      Load more
+                    </Button>
+                  </div>
+                )}
               </CardContent>
             </Card>
           </div>
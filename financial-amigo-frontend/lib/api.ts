@@ -49,6 +49,11 @@ export interface Transaction {
   account_id: string;
 }
 
+export interface TransactionPage {
+  items: Transaction[];
+  next_cursor: string | null;
+}
+
 // API endpoints
 export const users = {
   me: () => api.get<User>("/api/users/me"),
@@ -67,12 +72,10 @@ export const accounts = {
 };
 
 export const transactions = {
-  list: (accountId?: string) =>
-    api.get<Transaction[]>(
-      accountId
-        ? `/api/transactions?account_id=${accountId}`
-        : "/api/transactions"
-    ),
+  list: (accountId?: string, cursor?: string) =>
+    api.get<TransactionPage>("/api/transactions", {
+      params: { account_id: accountId || undefined, cursor },
+    }),
   create: (data: Omit<Transaction, "id" | "total_native">) =>
     api.post<Transaction>("/api/transactions", data),
   update: (